@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterable, Optional, Set
+
+from app.adapters.driven.gateways.product_catalog_gateway import (
+    AsyncProductCatalogGateway,
+    ProductCatalogGateway,
+)
+from app.shared.cache.ttl_lru import Freshness, TTLCache
+from app.shared.exceptions.catalog import ProductNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+def _cacheable(product: Dict) -> Dict:
+    # nome e preço mudam raramente; estoque muda a cada pedido e não é guardado
+    return {k: v for k, v in product.items() if k != "stock"}
+
+
+def _entries(products: Iterable[Dict]):
+    return ((str(p["id"]), _cacheable(p)) for p in products)
+
+
+class _CacheCounters:
+    def __init__(self, cache: TTLCache):
+        self.cache = cache
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "refreshes": self.refreshes, "refresh_errors": self.refresh_errors}
+
+
+class CachedProductCatalogGateway(_CacheCounters):
+    """
+    Cache de ``get_product`` na frente do catálogo. Entradas vencidas continuam
+    sendo servidas enquanto são renovadas em segundo plano no ``executor`` (sem
+    executor, vencida conta como ausente). 404 fica em cache negativo por pouco
+    tempo. Reservas e devoluções sempre vão direto ao catálogo.
+    """
+
+    def __init__(self, inner: ProductCatalogGateway, cache: TTLCache, executor: Optional[Executor] = None):
+        super().__init__(cache)
+        self.inner = inner
+        self.executor = executor
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def get_product(self, product_id: str) -> Dict:
+        key = str(product_id)
+        freshness, value, negative = self.cache.lookup(key)
+        if freshness is Freshness.FRESH:
+            if negative:
+                raise ProductNotFoundError(value)
+            return dict(value)
+        if freshness is Freshness.STALE and self.executor is not None:
+            self._refresh_later(key)
+            return dict(value)
+        return self._fetch(key)
+
+    def reserve_stock(self, product_id: str, qty: int) -> None:
+        self.inner.reserve_stock(product_id, qty)
+
+    def release_stock(self, product_id: str, qty: int) -> None:
+        self.inner.release_stock(product_id, qty)
+
+    def reserve_many(self, lines) -> None:
+        self.inner.reserve_many(lines)
+
+    def release_many(self, lines) -> None:
+        self.inner.release_many(lines)
+
+    def warm_up(self) -> int:
+        return self.cache.put_many(_entries(self.inner.list_products()))
+
+    def _fetch(self, key: str) -> Dict:
+        try:
+            product = self.inner.get_product(key)
+        except ProductNotFoundError as exc:
+            self.cache.put_negative(key, str(exc))
+            raise
+        self.cache.put(key, _cacheable(product))
+        return product
+
+    def _refresh_later(self, key: str) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self.executor.submit(self._refresh, key)
+
+    def _refresh(self, key: str) -> None:
+        try:
+            self._fetch(key)
+            self.refreshes += 1
+        except ProductNotFoundError:
+            self.refreshes += 1
+        except Exception:
+            # mantém a entrada vencida até o fim da janela de stale
+            self.refresh_errors += 1
+            logger.exception("Falha ao renovar o produto %s no cache", key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+class AsyncCachedProductCatalogGateway(_CacheCounters):
+    def __init__(self, inner: AsyncProductCatalogGateway, cache: TTLCache):
+        super().__init__(cache)
+        self.inner = inner
+        self._refreshing: Dict[str, asyncio.Task] = {}
+
+    async def get_product(self, product_id: str) -> Dict:
+        key = str(product_id)
+        freshness, value, negative = self.cache.lookup(key)
+        if freshness is Freshness.FRESH:
+            if negative:
+                raise ProductNotFoundError(value)
+            return dict(value)
+        if freshness is Freshness.STALE:
+            if key not in self._refreshing:
+                self._refreshing[key] = asyncio.create_task(self._refresh(key))
+            return dict(value)
+        return await self._fetch(key)
+
+    async def reserve_stock(self, product_id: str, qty: int) -> None:
+        await self.inner.reserve_stock(product_id, qty)
+
+    async def release_stock(self, product_id: str, qty: int) -> None:
+        await self.inner.release_stock(product_id, qty)
+
+    async def reserve_many(self, lines) -> None:
+        await self.inner.reserve_many(lines)
+
+    async def release_many(self, lines) -> None:
+        await self.inner.release_many(lines)
+
+    async def warm_up(self) -> int:
+        return self.cache.put_many(_entries(await self.inner.list_products()))
+
+    async def _fetch(self, key: str) -> Dict:
+        try:
+            product = await self.inner.get_product(key)
+        except ProductNotFoundError as exc:
+            self.cache.put_negative(key, str(exc))
+            raise
+        self.cache.put(key, _cacheable(product))
+        return product
+
+    async def _refresh(self, key: str) -> None:
+        try:
+            await self._fetch(key)
+            self.refreshes += 1
+        except ProductNotFoundError:
+            self.refreshes += 1
+        except Exception:
+            self.refresh_errors += 1
+            logger.exception("Falha ao renovar o produto %s no cache", key)
+        finally:
+            self._refreshing.pop(key, None)
@@ -1,17 +1,56 @@
 import os, httpx
-from app.domain.ports.customer_auth_port import CustomerAuthPort
+from app.domain.ports.customer_auth_port import AsyncCustomerAuthPort, CustomerAuthPort
+from app.shared.exceptions.customer import InvalidTokenError
+from app.shared.exceptions.resilience import DependencyUnavailableError
+from app.shared.resilience import Resilience
 
 class CustomerAuthHttp(CustomerAuthPort):
-    def __init__(self, base_url: str | None = None, client: httpx.Client | None = None):
-        self.base_url = (base_url or os.getenv("CUSTOMER_SERVICE_URL")).rstrip("/")
+    def __init__(
+        self,
+        base_url: str | None = None,
+        client: httpx.Client | None = None,
+        policy: Resilience | None = None,
+    ):
+        self.base_url = (base_url or os.getenv("CUSTOMER_SERVICE_URL") or "").rstrip("/")
         self.client = client or httpx.Client(timeout=5)
+        self.policy = policy or Resilience("customer")
 
     def verify_token(self, token: str) -> int:
-        resp = self.client.post(f"{self.base_url}/api/auth", json={"token": token})
-        if resp.status_code == 200:
-            data = resp.json()
-            return data["id"]
-        elif resp.status_code in (400, 401):
-            raise ValueError("Token inválido")
-        else:
-            raise ValueError("Cliente não encontrado ou inativo")
\ No newline at end of file
+        # POST só por causa do corpo: validar o token não altera nada, pode repetir
+        url = f"{self.base_url}/api/auth"
+        resp = self.policy.call(
+            lambda t: self.client.post(url, json={"token": token}, timeout=t), idempotent=True
+        )
+        return _client_id(resp)
+
+
+class AsyncCustomerAuthHttp(AsyncCustomerAuthPort):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        policy: Resilience | None = None,
+    ):
+        self.base_url = (base_url or os.getenv("CUSTOMER_SERVICE_URL") or "").rstrip("/")
+        self.client = client or httpx.AsyncClient(timeout=5)
+        self.policy = policy or Resilience("customer")
+
+    async def verify_token(self, token: str) -> int:
+        url = f"{self.base_url}/api/auth"
+        resp = await self.policy.acall(
+            lambda t: self.client.post(url, json={"token": token}, timeout=t), idempotent=True
+        )
+        return _client_id(resp)
+
+
+def _client_id(resp: httpx.Response) -> int:
+    if resp.status_code == 200:
+        data = resp.json()
+        return data["id"]
+    elif resp.status_code in (400, 401):
+        raise InvalidTokenError("Token inválido")
+    elif resp.status_code >= 500:
+        # falha do serviço, não do token: nada de cache negativo
+        raise DependencyUnavailableError("customer", "Serviço de clientes indisponível")
+    else:
+        raise ValueError("Cliente não encontrado ou inativo")
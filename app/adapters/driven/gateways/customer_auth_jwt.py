@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.domain.ports.customer_auth_port import AsyncCustomerAuthPort, CustomerAuthPort
+from app.shared.cache.ttl_lru import Freshness, TTLCache
+from app.shared.exceptions.customer import InvalidTokenError
+from app.shared.handlers.jwt_user import JwtVerifier, looks_like_jwt
+
+
+def _cache_key(token: str) -> str:
+    # o token em si nunca fica em memória como chave
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class _AuthCache:
+    """
+    Resultado da validação (ID do cliente) em cache pelo hash do token. JWTs
+    valem até o ``exp`` (no máximo ``max_ttl``); tokens opacos, validados pelo
+    serviço de clientes, pelo TTL padrão do cache. Só as recusas definitivas do
+    token (400/401) ficam em cache negativo.
+    """
+
+    def __init__(
+        self,
+        verifier: JwtVerifier,
+        cache: TTLCache,
+        claim: str = "id",
+        max_ttl: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.verifier = verifier
+        self.cache = cache
+        self.claim = claim
+        self.max_ttl = max_ttl
+        self._clock = clock
+        self.local = 0
+        self.remote = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "local": self.local, "remote": self.remote}
+
+    def _cached(self, key: str) -> Optional[int]:
+        freshness, value, negative = self.cache.lookup(key)
+        if freshness is not Freshness.FRESH:
+            return None
+        if negative:
+            raise ValueError(value)
+        return value
+
+    def _client_id(self, key: str, payload: Dict[str, Any]) -> int:
+        client_id = payload.get(self.claim)
+        if client_id is None:
+            raise ValueError("Token inválido: ID do cliente ausente")
+        self.local += 1
+        ttl = self.max_ttl
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - self._clock())
+        if ttl > 0:
+            self.cache.put(key, client_id, ttl=ttl)
+        return client_id
+
+    def _remote_result(self, key: str, client_id: Optional[int], exc: Optional[ValueError]) -> int:
+        self.remote += 1
+        if exc is not None:
+            if isinstance(exc, InvalidTokenError):
+                self.cache.put_negative(key, str(exc))
+            raise exc
+        self.cache.put(key, client_id)
+        return client_id
+
+
+class LocalJwtCustomerAuth(_AuthCache, CustomerAuthPort):
+    """
+    Valida JWTs localmente (assinatura, exp/nbf) e só chama o serviço de
+    clientes (``fallback``) para tokens opacos.
+    """
+
+    def __init__(self, verifier: JwtVerifier, fallback: CustomerAuthPort, cache: TTLCache, **kwargs):
+        super().__init__(verifier, cache, **kwargs)
+        self.fallback = fallback
+
+    def verify_token(self, token: str) -> int:
+        key = _cache_key(token)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        if looks_like_jwt(token):
+            return self._client_id(key, self.verifier.verify(token))
+        try:
+            client_id = self.fallback.verify_token(token)
+        except ValueError as exc:
+            return self._remote_result(key, None, exc)
+        return self._remote_result(key, client_id, None)
+
+
+class AsyncLocalJwtCustomerAuth(_AuthCache, AsyncCustomerAuthPort):
+    def __init__(self, verifier: JwtVerifier, fallback: AsyncCustomerAuthPort, cache: TTLCache, **kwargs):
+        super().__init__(verifier, cache, **kwargs)
+        self.fallback = fallback
+
+    async def verify_token(self, token: str) -> int:
+        key = _cache_key(token)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+        if looks_like_jwt(token):
+            if self.verifier.can_verify_now(token):
+                payload = self.verifier.verify(token)
+            else:
+                # kid novo (rotação) ou JWKS vencido: a recarga é I/O bloqueante
+                payload = await asyncio.to_thread(self.verifier.verify, token)
+            return self._client_id(key, payload)
+        try:
+            client_id = await self.fallback.verify_token(token)
+        except ValueError as exc:
+            return self._remote_result(key, None, exc)
+        return self._remote_result(key, client_id, None)
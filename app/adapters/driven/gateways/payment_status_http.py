@@ -1,26 +1,98 @@
 import httpx
 from typing import Optional, Tuple
 
-from app.domain.ports.payment_status_port import PaymentGatewayPort
+from app.domain.ports.payment_status_port import AsyncPaymentGatewayPort, PaymentGatewayPort
 from app.shared.enums.payment_status import PaymentStatus
+from app.shared.resilience import Resilience
+from app.shared.singleflight import AsyncSingleFlight, SingleFlight
+
+# o outbox pode reenviar a mesma cobrança (lease vencido, queda antes de marcar
+# como enviada): o gateway deduplica pela chave do pedido
+IDEMPOTENCY_HEADER = "Idempotency-Key"
 
 
 class PaymentGatewayHttp(PaymentGatewayPort):
-    def __init__(self, base_url: str, client: Optional[httpx.Client] = None):
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.Client] = None,
+        policy: Optional[Resilience] = None,
+        flights: Optional[SingleFlight] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.client = client or httpx.Client(timeout=5)
+        self.policy = policy or Resilience("payment")
+        # consultas simultâneas do mesmo pedido viram uma única chamada
+        self.flights = flights or SingleFlight()
 
     def get_status(self, order_id: int) -> PaymentStatus:  # noqa: D401
-        resp = self.client.get(f"{self.base_url}/api/payment/{order_id}")
-        resp.raise_for_status()
-        data = resp.json()
-        return PaymentStatus(data["status"])
+        return self.flights.do(("status", order_id), lambda: self._get_status(order_id))
+
+    def _get_status(self, order_id: int) -> PaymentStatus:
+        url = f"{self.base_url}/api/payment/{order_id}"
+        resp = self.policy.call(lambda t: self.client.get(url, timeout=t), idempotent=True, hedge=True)
+        return _status(resp)
 
     def create_payment(self, order_id: int, amount: float) -> Tuple[str, PaymentStatus]:
-        resp = self.client.post(
-            f"{self.base_url}/api/payment",
-            json={"order_id": order_id, "amount": amount},
+        # cria uma cobrança: não é repetido automaticamente
+        resp = self.policy.call(
+            lambda t: self.client.post(
+                f"{self.base_url}/api/payment",
+                json={"order_id": order_id, "amount": amount},
+                headers=_payment_key(order_id),
+                timeout=t,
+            )
+        )
+        return _qr_code(resp)
+
+
+class AsyncPaymentGatewayHttp(AsyncPaymentGatewayPort):
+    def __init__(
+        self,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None,
+        policy: Optional[Resilience] = None,
+        flights: Optional[AsyncSingleFlight] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.client = client or httpx.AsyncClient(timeout=5)
+        self.policy = policy or Resilience("payment")
+        self.flights = flights or AsyncSingleFlight()
+
+    async def get_status(self, order_id: int) -> PaymentStatus:
+        return await self.flights.do(("status", order_id), lambda: self._get_status(order_id))
+
+    async def _get_status(self, order_id: int) -> PaymentStatus:
+        url = f"{self.base_url}/api/payment/{order_id}"
+        resp = await self.policy.acall(
+            lambda t: self.client.get(url, timeout=t), idempotent=True, hedge=True
         )
-        resp.raise_for_status()
-        data = resp.json()
-        return data["qr_data"], PaymentStatus.PENDING
+        return _status(resp)
+
+    async def create_payment(self, order_id: int, amount: float) -> Tuple[str, PaymentStatus]:
+        resp = await self.policy.acall(
+            lambda t: self.client.post(
+                f"{self.base_url}/api/payment",
+                json={"order_id": order_id, "amount": amount},
+                headers=_payment_key(order_id),
+                timeout=t,
+            )
+        )
+        return _qr_code(resp)
+
+
+def _payment_key(order_id: int) -> dict:
+    # uma cobrança por pedido: a chave é o próprio pedido
+    return {IDEMPOTENCY_HEADER: f"order-{order_id}"}
+
+
+def _status(resp: httpx.Response) -> PaymentStatus:
+    resp.raise_for_status()
+    data = resp.json()
+    return PaymentStatus(data["status"])
+
+
+def _qr_code(resp: httpx.Response) -> Tuple[str, PaymentStatus]:
+    resp.raise_for_status()
+    data = resp.json()
+    return data["qr_data"], PaymentStatus.PENDING
@@ -1,27 +1,229 @@
+import logging
 import os
+import httpx
 import requests
-from typing import Dict
+from concurrent.futures import Executor
+from functools import partial
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
+from app.shared.concurrency import Outcome, raise_first, settle, settle_async
+from app.shared.exceptions.catalog import ProductNotFoundError
+from app.shared.resilience import Resilience
+from app.shared.singleflight import AsyncSingleFlight, SingleFlight
+
 load_dotenv()
 CATALOG_BASE_URL = os.getenv("CATALOG_URL", "http://catalog-api:8000")
 
+# respostas do endpoint em lote que indicam um catálogo sem suporte a ele
+BULK_UNSUPPORTED = (404, 405, 501)
+
+logger = logging.getLogger(__name__)
+
+Lines = Iterable[Tuple[str, int]]
+
 
 class ProductCatalogGateway:
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: float = 5,
+        executor: Optional[Executor] = None,
+        policy: Optional[Resilience] = None,
+        flights: Optional[SingleFlight] = None,
+    ):
+        # a Session mantém as conexões abertas (keep-alive) entre as chamadas
+        self.session = session or requests.Session()
+        # timeout, deadline, retries, breaker e bulkhead das chamadas ao catálogo
+        self.policy = policy or Resilience("catalog", timeout=timeout)
+        # pedidos simultâneos pelo mesmo produto viram uma única chamada
+        self.flights = flights or SingleFlight()
+        # usado só no fallback item a item de reserve_many/release_many
+        self.executor = executor
+        # None até a primeira resposta do endpoint em lote
+        self.bulk_supported: Optional[bool] = None
+
     def get_product(self, product_id: str) -> Dict:
-        resp = requests.get(f"{CATALOG_BASE_URL}/products/{product_id}", timeout=5)
-        if resp.status_code == 404:
-            raise ValueError(f"Produto {product_id} não encontrado")
+        return self.flights.do(("product", str(product_id)), partial(self._get_product, product_id))
+
+    def _get_product(self, product_id: str) -> Dict:
+        url = f"{CATALOG_BASE_URL}/products/{product_id}"
+        resp = self.policy.call(lambda t: self.session.get(url, timeout=t), idempotent=True, hedge=True)
+        return _product(resp, product_id)
+
+    def list_products(self) -> List[Dict]:
+        """Listagem completa do catálogo, usada para aquecer o cache na subida."""
+        url = f"{CATALOG_BASE_URL}/products"
+        resp = self.policy.call(lambda t: self.session.get(url, timeout=t), idempotent=True)
         resp.raise_for_status()
         return resp.json()
 
     def reserve_stock(self, product_id: str, qty: int) -> None:
-        resp = requests.post(
-            f"{CATALOG_BASE_URL}/products/{product_id}/reserve",
-            json={"qty": qty},
-            timeout=5,
+        resp = self._post(f"{CATALOG_BASE_URL}/products/{product_id}/reserve", {"qty": qty})
+        _reserved(resp, product_id)
+
+    def release_stock(self, product_id: str, qty: int) -> None:
+        """Devolve uma reserva feita por ``reserve_stock`` (compensação)."""
+        resp = self._post(f"{CATALOG_BASE_URL}/products/{product_id}/release", {"qty": qty})
+        resp.raise_for_status()
+
+    def reserve_many(self, lines: Lines) -> None:
+        """
+        Reserva todas as linhas (somadas por produto) em uma única chamada ao
+        catálogo. Se ele não tiver o endpoint em lote, reserva item a item e
+        devolve o que já tinha sido reservado quando alguma linha falha.
+        """
+        merged = merge_lines(lines)
+        if merged and not self._bulk("reserve", merged):
+            outcomes = settle(self.executor, [partial(self.reserve_stock, p, q) for p, q in merged.items()])
+            reserved = _succeeded(merged, outcomes)
+            if len(reserved) < len(merged):
+                _log_failures(reserved, self._release_each(reserved))
+                raise_first(outcomes)
+
+    def release_many(self, lines: Lines) -> None:
+        merged = merge_lines(lines)
+        if merged and not self._bulk("release", merged):
+            raise_first(self._release_each(merged))
+
+    def _bulk(self, action: str, merged: Dict[str, int]) -> bool:
+        if self.bulk_supported is False:
+            return False
+        resp = self._post(f"{CATALOG_BASE_URL}/products/{action}", _bulk_body(merged))
+        self.bulk_supported = _bulk_result(resp, self.bulk_supported)
+        return self.bulk_supported
+
+    def _release_each(self, merged: Dict[str, int]) -> List[Outcome]:
+        calls = [partial(self.release_stock, p, q) for p, q in merged.items()]
+        return settle(self.executor, calls, stop_on_error=False)
+
+    def _post(self, url: str, body: Dict):
+        # reservas e devoluções não são idempotentes: nunca repetidas
+        return self.policy.call(lambda t: self.session.post(url, json=body, timeout=t))
+
+
+class AsyncProductCatalogGateway:
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        policy: Optional[Resilience] = None,
+        flights: Optional[AsyncSingleFlight] = None,
+    ):
+        self.client = client or httpx.AsyncClient(timeout=5)
+        self.policy = policy or Resilience("catalog")
+        self.flights = flights or AsyncSingleFlight()
+        self.bulk_supported: Optional[bool] = None
+
+    async def get_product(self, product_id: str) -> Dict:
+        return await self.flights.do(("product", str(product_id)), partial(self._get_product, product_id))
+
+    async def _get_product(self, product_id: str) -> Dict:
+        url = f"{CATALOG_BASE_URL}/products/{product_id}"
+        resp = await self.policy.acall(
+            lambda t: self.client.get(url, timeout=t), idempotent=True, hedge=True
         )
-        if resp.status_code == 409:
-            raise ValueError(f"Estoque insuficiente para {product_id}")
+        return _product(resp, product_id)
+
+    async def list_products(self) -> List[Dict]:
+        url = f"{CATALOG_BASE_URL}/products"
+        resp = await self.policy.acall(lambda t: self.client.get(url, timeout=t), idempotent=True)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def reserve_stock(self, product_id: str, qty: int) -> None:
+        resp = await self._post(f"{CATALOG_BASE_URL}/products/{product_id}/reserve", {"qty": qty})
+        _reserved(resp, product_id)
+
+    async def release_stock(self, product_id: str, qty: int) -> None:
+        resp = await self._post(f"{CATALOG_BASE_URL}/products/{product_id}/release", {"qty": qty})
         resp.raise_for_status()
+
+    async def reserve_many(self, lines: Lines) -> None:
+        merged = merge_lines(lines)
+        if merged and not await self._bulk("reserve", merged):
+            outcomes = await settle_async([self.reserve_stock(p, q) for p, q in merged.items()])
+            reserved = _succeeded(merged, outcomes)
+            if len(reserved) < len(merged):
+                _log_failures(reserved, await self._release_each(reserved))
+                raise_first(outcomes)
+
+    async def release_many(self, lines: Lines) -> None:
+        merged = merge_lines(lines)
+        if merged and not await self._bulk("release", merged):
+            raise_first(await self._release_each(merged))
+
+    async def _bulk(self, action: str, merged: Dict[str, int]) -> bool:
+        if self.bulk_supported is False:
+            return False
+        resp = await self._post(f"{CATALOG_BASE_URL}/products/{action}", _bulk_body(merged))
+        self.bulk_supported = _bulk_result(resp, self.bulk_supported)
+        return self.bulk_supported
+
+    async def _release_each(self, merged: Dict[str, int]) -> List[Outcome]:
+        return await settle_async([self.release_stock(p, q) for p, q in merged.items()])
+
+    async def _post(self, url: str, body: Dict):
+        return await self.policy.acall(lambda t: self.client.post(url, json=body, timeout=t))
+
+
+def merge_lines(lines: Lines) -> Dict[str, int]:
+    """Soma as quantidades de linhas repetidas do mesmo produto, mantendo a ordem."""
+    merged: Dict[str, int] = {}
+    for product_id, qty in lines:
+        merged[product_id] = merged.get(product_id, 0) + qty
+    return merged
+
+
+# requests.Response e httpx.Response expõem a mesma interface usada aqui
+def _product(resp, product_id: str) -> Dict:
+    if resp.status_code == 404:
+        raise ProductNotFoundError(f"Produto {product_id} não encontrado")
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _reserved(resp, product_id: str) -> None:
+    if resp.status_code == 409:
+        raise ValueError(f"Estoque insuficiente para {product_id}")
+    resp.raise_for_status()
+
+
+def _bulk_body(merged: Dict[str, int]) -> Dict:
+    return {"items": [{"product_id": p, "qty": q} for p, q in merged.items()]}
+
+
+def _bulk_result(resp, supported: Optional[bool]) -> bool:
+    """
+    True se o lote foi aplicado, False se o catálogo não tem o endpoint. Depois
+    de um lote aceito, 404 passa a ser erro de verdade e não falta de suporte.
+    """
+    if resp.status_code in BULK_UNSUPPORTED and supported is not True:
+        return False
+    if resp.status_code == 409:
+        # o lote é atômico no catálogo: nada foi reservado
+        product_id = _json(resp).get("product_id")
+        raise ValueError(
+            f"Estoque insuficiente para {product_id}" if product_id else "Estoque insuficiente"
+        )
+    resp.raise_for_status()
+    return True
+
+
+def _json(resp) -> Dict:
+    try:
+        body = resp.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _succeeded(merged: Dict[str, int], outcomes: List[Outcome]) -> Dict[str, int]:
+    return {p: q for (p, q), (_, exc) in zip(merged.items(), outcomes) if exc is None}
+
+
+def _log_failures(merged: Dict[str, int], outcomes: List[Outcome]) -> None:
+    # a devolução é best effort: a falha que importa é a da reserva
+    for (product_id, qty), (_, exc) in zip(merged.items(), outcomes):
+        if exc is not None:
+            logger.error("Falha ao devolver %s unidade(s) de %s ao catálogo: %s", qty, product_id, exc)
@@ -1,3 +1,5 @@
 from app.adapters.driven.models.order import OrderModel
 from app.adapters.driven.models.item import OrderItemModel
-
+from app.adapters.driven.models.payment import OrderPaymentModel
+from app.adapters.driven.models.idempotency import IdempotencyKeyModel
+from app.adapters.driven.models.payment_outbox import PaymentOutboxModel
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Enum, Integer, LargeBinary, String
+
+from app.adapters.driven.models.base_model import BaseModel
+from app.shared.enums.idempotency_status import IdempotencyStatus
+
+
+class IdempotencyKeyModel(BaseModel):
+    """Resposta guardada por Idempotency-Key, com lock da execução em andamento."""
+
+    __tablename__ = "idempotency_keys"
+
+    # sha256 do escopo (token) + chave enviada pelo cliente
+    key = Column(String(64), primary_key=True)
+    # sha256 do corpo: a mesma chave com outro corpo é recusada
+    fingerprint = Column(String(64), nullable=False)
+    status = Column(Enum(IdempotencyStatus), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response = Column(LargeBinary, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=False)
+    # pedido criado pela execução, gravado no mesmo commit do pedido: uma reserva
+    # abandonada com pedido é respondida a partir dele, sem executar de novo
+    order_id = Column(Integer, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKeyModel(key={self.key}, status={self.status})>"
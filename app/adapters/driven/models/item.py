@@ -8,7 +8,7 @@ class OrderItemModel(BaseModel):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"))
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), index=True)
     product_id = Column(String(50), nullable=False)
     product_name = Column(String, nullable=False)
     quantity = Column(Integer, nullable=False, default=1)
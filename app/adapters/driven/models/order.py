@@ -1,23 +1,58 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum, Float
+from sqlalchemy import Column, Integer, ForeignKey, Enum, Float, Index, and_, case, literal, true
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import Grouping
 
 from app.adapters.driven.models.base_model import BaseModel
-from app.shared.enums.order_status import OrderStatus
+from app.shared.enums.order_status import (
+    ACTIVE_QUEUE_PRIORITY,
+    DEFAULT_QUEUE_PRIORITY,
+    OrderStatus,
+)
 
 
 class OrderModel(BaseModel):
     __tablename__ = "orders"
+    # updated_at (onupdate) volta no RETURNING do flush: sem lazy load depois do update
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
 
-    client_id = Column(Integer, nullable=True)
+    client_id = Column(Integer, nullable=True, index=True)
     status = Column(Enum(OrderStatus), default=OrderStatus.RECEIVED)
 
     # coupon_id = Column(Integer, ForeignKey("coupons.id"), nullable=True)
     amount = Column(Float, nullable=False)
 
-    items = relationship("OrderItemModel", back_populates="order")
+    items = relationship("OrderItemModel", back_populates="order", order_by="OrderItemModel.id")
     # coupon = relationship("CouponModel")
 
     def __repr__(self):
-        return f"<OrderModel(customer_id={self.client_id}, status={self.status})>"
\ No newline at end of file
+        return f"<OrderModel(customer_id={self.client_id}, status={self.status})>"
+
+
+# Expressões da fila da cozinha. As constantes são renderizadas inline (e não como
+# bind params) para que o planner do Postgres case a consulta com o índice parcial
+# ix_orders_active_queue mesmo com drivers que usam prepared statements (asyncpg).
+def _inline(value, type_=None):
+    return literal(value, type_, literal_execute=True)
+
+
+status_priority = case(
+    *[
+        (OrderModel.status == _inline(s, OrderModel.status.type), _inline(p))
+        for s, p in ACTIVE_QUEUE_PRIORITY.items()
+    ],
+    else_=_inline(DEFAULT_QUEUE_PRIORITY),
+)
+
+active_queue_filter = and_(
+    OrderModel.active == true(),
+    OrderModel.status != _inline(OrderStatus.COMPLETED, OrderModel.status.type),
+)
+
+Index(
+    "ix_orders_active_queue",
+    Grouping(status_priority),
+    OrderModel.id,
+    postgresql_where=active_queue_filter,
+)
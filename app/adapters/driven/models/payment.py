@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer
+
+from app.adapters.driven.models.base_model import BaseModel
+from app.shared.enums.payment_source import PaymentSource
+from app.shared.enums.payment_status import PaymentStatus
+
+
+class OrderPaymentModel(BaseModel):
+    """Projeção local do status de pagamento, alimentada pelo webhook e pelo reconciliador."""
+
+    __tablename__ = "order_payments"
+
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(Enum(PaymentStatus), nullable=False)
+    # ordem dos eventos: um webhook atrasado não sobrescreve um mais novo.
+    # updated_at (do mixin) marca a última sincronização.
+    event_at = Column(DateTime(timezone=True), nullable=True)
+    # event_at de webhook e de consulta não são comparáveis (relógios diferentes)
+    source = Column(
+        Enum(PaymentSource), nullable=False, default=PaymentSource.WEBHOOK, server_default="WEBHOOK"
+    )
+
+    def __repr__(self):
+        return f"<OrderPaymentModel(order_id={self.order_id}, status={self.status})>"
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Integer, String
+
+from app.adapters.driven.models.base_model import BaseModel
+from app.shared.enums.outbox_status import OutboxStatus
+
+
+class PaymentOutboxModel(BaseModel):
+    """Cobrança pendente de criação, gravada na mesma transação do pedido."""
+
+    __tablename__ = "payment_outbox"
+
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True)
+    amount = Column(Float, nullable=False)
+    status = Column(Enum(OutboxStatus), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    # próxima tentativa; enquanto uma tentativa está em curso, fim do lease
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    qr_code = Column(String, nullable=True)
+    last_error = Column(String(255), nullable=True)
+
+    def __repr__(self):
+        return f"<PaymentOutboxModel(order_id={self.order_id}, status={self.status})>"
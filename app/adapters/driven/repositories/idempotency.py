@@ -0,0 +1,182 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Select, and_, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.adapters.driven.models.idempotency import IdempotencyKeyModel
+from app.domain.entities.idempotency import IdempotencyRecord, StoredResponse
+from app.domain.entities.payment import as_utc
+from app.domain.ports.idempotency_port import IdempotencyStorePort
+from app.shared.enums.idempotency_status import IdempotencyStatus
+
+
+class IdempotencyRepository(IdempotencyStorePort):
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def claim(
+        self,
+        key: str,
+        fingerprint: str,
+        now: datetime,
+        locked_until: datetime,
+        expires_at: datetime,
+    ) -> Optional[IdempotencyRecord]:
+        while True:
+            try:
+                self.db.execute(insert_stmt(key, fingerprint, locked_until, expires_at))
+                self.db.commit()
+                return None
+            except IntegrityError:
+                # chave já existe: pode estar vencida ou abandonada
+                self.db.rollback()
+            if self.db.execute(takeover_stmt(key, fingerprint, now, locked_until, expires_at)).rowcount:
+                self.db.commit()
+                return None
+            record = self.find(key)
+            if record is not None:
+                return record
+            # liberada entre o INSERT e a leitura: tenta reservar de novo
+
+    def find(self, key: str) -> Optional[IdempotencyRecord]:
+        row = self.db.execute(find_stmt(key)).one_or_none()
+        # encerra a transação: a próxima leitura (polling) enxerga o que mudou
+        self.db.commit()
+        return to_record(row) if row else None
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        self.db.execute(complete_stmt(key, response))
+        self.db.commit()
+
+    def release(self, key: str) -> None:
+        self.db.execute(release_stmt(key))
+        self.db.commit()
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        deleted = self.db.execute(purge_stmt(now, limit)).rowcount
+        self.db.commit()
+        return deleted
+
+
+# ---------------------------------------------------------------------------
+# SQL compartilhado com AsyncIdempotencyRepository
+
+IDEMPOTENCY_COLUMNS = (
+    IdempotencyKeyModel.key,
+    IdempotencyKeyModel.fingerprint,
+    IdempotencyKeyModel.status,
+    IdempotencyKeyModel.status_code,
+    IdempotencyKeyModel.response,
+    IdempotencyKeyModel.locked_until,
+    IdempotencyKeyModel.expires_at,
+    IdempotencyKeyModel.order_id,
+)
+
+
+def insert_stmt(key: str, fingerprint: str, locked_until: datetime, expires_at: datetime):
+    return insert(IdempotencyKeyModel).values(
+        key=key,
+        fingerprint=fingerprint,
+        status=IdempotencyStatus.IN_PROGRESS,
+        locked_until=locked_until,
+        expires_at=expires_at,
+    )
+
+
+def takeover_stmt(
+    key: str,
+    fingerprint: str,
+    now: datetime,
+    locked_until: datetime,
+    expires_at: datetime,
+):
+    return (
+        update(IdempotencyKeyModel)
+        .where(
+            IdempotencyKeyModel.key == key,
+            or_(
+                IdempotencyKeyModel.expires_at < now,
+                and_(
+                    IdempotencyKeyModel.status == IdempotencyStatus.IN_PROGRESS,
+                    IdempotencyKeyModel.locked_until < now,
+                    IdempotencyKeyModel.fingerprint == fingerprint,
+                    # o pedido já existe: executar de novo o duplicaria
+                    IdempotencyKeyModel.order_id.is_(None),
+                ),
+            ),
+        )
+        .values(
+            fingerprint=fingerprint,
+            status=IdempotencyStatus.IN_PROGRESS,
+            status_code=None,
+            response=None,
+            order_id=None,
+            locked_until=locked_until,
+            expires_at=expires_at,
+            updated_at=func.now(),
+        )
+    )
+
+
+def find_stmt(key: str) -> Select:
+    return select(*IDEMPOTENCY_COLUMNS).where(IdempotencyKeyModel.key == key)
+
+
+def complete_stmt(key: str, response: StoredResponse):
+    return (
+        update(IdempotencyKeyModel)
+        .where(IdempotencyKeyModel.key == key)
+        .values(
+            status=IdempotencyStatus.COMPLETED,
+            status_code=response.status_code,
+            response=response.body,
+            updated_at=func.now(),
+        )
+    )
+
+
+def attach_order_stmt(key: str, order_id: int):
+    """Executado pelo repositório de pedidos, na transação do INSERT do pedido."""
+    return (
+        update(IdempotencyKeyModel)
+        .where(
+            IdempotencyKeyModel.key == key,
+            IdempotencyKeyModel.status == IdempotencyStatus.IN_PROGRESS,
+        )
+        .values(order_id=order_id)
+    )
+
+
+def release_stmt(key: str):
+    return delete(IdempotencyKeyModel).where(
+        IdempotencyKeyModel.key == key,
+        IdempotencyKeyModel.status == IdempotencyStatus.IN_PROGRESS,
+        IdempotencyKeyModel.order_id.is_(None),
+    )
+
+
+def purge_stmt(now: datetime, limit: int):
+    expired = (
+        select(IdempotencyKeyModel.key)
+        .where(IdempotencyKeyModel.expires_at < now)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    return delete(IdempotencyKeyModel).where(IdempotencyKeyModel.key.in_(expired))
+
+
+def to_record(row) -> IdempotencyRecord:
+    response = None
+    if row.response is not None:
+        response = StoredResponse(status_code=row.status_code, body=bytes(row.response))
+    return IdempotencyRecord(
+        key=row.key,
+        fingerprint=row.fingerprint,
+        status=row.status,
+        locked_until=as_utc(row.locked_until),
+        expires_at=as_utc(row.expires_at),
+        response=response,
+        order_id=row.order_id,
+    )
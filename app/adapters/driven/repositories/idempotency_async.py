@@ -0,0 +1,65 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.driven.repositories.idempotency import (
+    complete_stmt,
+    find_stmt,
+    insert_stmt,
+    purge_stmt,
+    release_stmt,
+    takeover_stmt,
+    to_record,
+)
+from app.domain.entities.idempotency import IdempotencyRecord, StoredResponse
+from app.domain.ports.idempotency_port import AsyncIdempotencyStorePort
+
+
+class AsyncIdempotencyRepository(AsyncIdempotencyStorePort):
+    """Mesmas consultas do IdempotencyRepository, executadas sobre AsyncSession."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def claim(
+        self,
+        key: str,
+        fingerprint: str,
+        now: datetime,
+        locked_until: datetime,
+        expires_at: datetime,
+    ) -> Optional[IdempotencyRecord]:
+        while True:
+            try:
+                await self.db.execute(insert_stmt(key, fingerprint, locked_until, expires_at))
+                await self.db.commit()
+                return None
+            except IntegrityError:
+                await self.db.rollback()
+            taken = await self.db.execute(takeover_stmt(key, fingerprint, now, locked_until, expires_at))
+            if taken.rowcount:
+                await self.db.commit()
+                return None
+            record = await self.find(key)
+            if record is not None:
+                return record
+
+    async def find(self, key: str) -> Optional[IdempotencyRecord]:
+        row = (await self.db.execute(find_stmt(key))).one_or_none()
+        await self.db.commit()
+        return to_record(row) if row else None
+
+    async def complete(self, key: str, response: StoredResponse) -> None:
+        await self.db.execute(complete_stmt(key, response))
+        await self.db.commit()
+
+    async def release(self, key: str) -> None:
+        await self.db.execute(release_stmt(key))
+        await self.db.commit()
+
+    async def purge_expired(self, now: datetime, limit: int) -> int:
+        deleted = (await self.db.execute(purge_stmt(now, limit))).rowcount
+        await self.db.commit()
+        return deleted
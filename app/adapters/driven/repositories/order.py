@@ -1,101 +1,141 @@
-from typing import List, Optional
+from collections import defaultdict
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
-from sqlalchemy import case
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, and_, func, insert, or_, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.adapters.driven.models.order import OrderModel
+from app.adapters.driven.models.order import OrderModel, active_queue_filter, status_priority
 from app.adapters.driven.models.item import OrderItemModel
+from app.adapters.driven.repositories.idempotency import attach_order_stmt
+from app.adapters.driven.repositories.payment_outbox import insert_stmt as outbox_insert_stmt
 from app.domain.entities.item import OrderItem
 from app.domain.entities.order import Order
-from app.domain.ports.order_repository_port import OrderRepositoryPort
-from app.shared.enums.order_status import OrderStatus
+from app.domain.entities.page import Page
+from app.domain.ports.order_repository_port import OrderRepositoryPort, page_from_rows
+from app.shared.enums.order_status import OrderStatus, queue_priority
+from app.shared.handlers.cursor import decode_cursor
+
+
+class ItemLoading(str, Enum):
+    """Estratégia de carga dos itens nas consultas de listagem."""
+
+    LAZY = "lazy"          # 1 SELECT por pedido (N+1), mantido só para comparação
+    SELECTIN = "selectin"  # 1 SELECT extra com order_id IN (...)
+    JOINED = "joined"      # LEFT OUTER JOIN em um único SELECT
+    BATCH = "batch"        # 1 SELECT extra agrupado em Python, sem tocar no relacionamento
+    CORE = "core"          # como BATCH, mas só colunas: linhas viram dataclasses sem objetos ORM
+
+
+# mesmo limite usado pelo selectinload do SQLAlchemy
+IN_CHUNK_SIZE = 500
+# linhas buscadas por vez do cursor no servidor durante a exportação
+STREAM_BATCH_SIZE = 500
 
 
 class OrderRepository(OrderRepositoryPort):
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, loading: ItemLoading = ItemLoading.CORE):
         self.db = db_session
+        self.loading = loading
 
-    def create(self, order: Order) -> Order:
-        order_model = OrderModel(
-            client_id=order.client_id,
-            status=order.status,
-            amount=order.amount,
-        )
-        self.db.add(order_model)
-        self.db.flush()
+    def create(
+        self, order: Order, with_payment: bool = False, idempotency_key: Optional[str] = None
+    ) -> Order:
+        # 1 INSERT ... RETURNING para o pedido + 1 INSERT multi-linha para os itens;
+        # a entidade é montada com os ids devolvidos, sem refresh após o commit
+        order_id, created_at, updated_at = self.db.execute(insert_order_stmt(order)).one()
 
-        item_models: list[OrderItemModel] = []
-        for item in order.items:
-            im = OrderItemModel(
-                order_id=order_model.id,
-                product_id=item.product_id,
-                product_name=item.name,
-                quantity=item.quantity,
-                price=item.price,
-            )
-            self.db.add(im)
-            item_models.append(im)
+        item_ids: List[int] = []
+        if order.items:
+            item_ids = list(self.db.scalars(insert_items_stmt(), item_rows(order_id, order.items)))
+        if with_payment:
+            # outbox: a cobrança fica registrada no mesmo commit do pedido
+            self.db.execute(outbox_insert_stmt(order_id, order.amount, datetime.now(timezone.utc)))
+        if idempotency_key is not None:
+            # a Idempotency-Key aponta para o pedido no mesmo commit: se o processo
+            # cair antes de guardar a resposta, a repetição responde com este pedido
+            self.db.execute(attach_order_stmt(idempotency_key, order_id))
 
         self.db.commit()
-        self.db.refresh(order_model)
-
-        return self._to_entity(order_model, item_models)
+        return created_entity(order, order_id, item_ids, created_at, updated_at)
 
     def find_by_id(self, order_id: int) -> Optional[Order]:
-        model = self.db.get(OrderModel, order_id)
+        model = self.db.scalar(by_id_stmt(order_id))
         return self._to_entity(model) if model else None
 
-    def find_all(self, status: Optional[OrderStatus] = None) -> List[Order]:
-        q = self.db.query(OrderModel)
-        if status is not None:
-            q = q.filter(OrderModel.status == status)
-        return [self._to_entity(m) for m in q.all()]
-
-    def find_active_sorted_orders(self) -> List[Order]:
-        status_priority = case(
-            (OrderModel.status == OrderStatus.READY, 1),
-            (OrderModel.status == OrderStatus.IN_PROGRESS, 2),
-            (OrderModel.status == OrderStatus.RECEIVED, 3),
-            else_=9999
-        )
+    def find_header(self, order_id: int) -> Optional[Order]:
+        row = self.db.connection().execute(header_stmt(order_id)).one_or_none()
+        return to_entity(row, []) if row else None
 
-        order_models = (
-            self.db.query(OrderModel)
-            .filter(OrderModel.status != OrderStatus.COMPLETED)
-            .filter(OrderModel.active == True)
-            .order_by(status_priority, OrderModel.id.asc())
-            .all()
-        )
-        return [self._to_entity(o) for o in order_models]
+    def find_all(
+        self,
+        status: Optional[OrderStatus] = None,
+        loading: Optional[ItemLoading] = None,
+        with_items: bool = True,
+    ) -> List[Order]:
+        return self._load(list_stmt(status), loading, with_items)
+
+    def find_active_sorted_orders(
+        self,
+        loading: Optional[ItemLoading] = None,
+        with_items: bool = True,
+    ) -> List[Order]:
+        return self._load(active_stmt(), loading, with_items)
+
+    def find_page(
+        self,
+        status: Optional[OrderStatus],
+        limit: int,
+        after: Optional[str] = None,
+        loading: Optional[ItemLoading] = None,
+        with_items: bool = True,
+    ) -> Page:
+        rows = self._load(page_stmt(status, limit, after), loading, with_items)
+        return page_from_rows(rows, limit, order_key)
 
-    def find_by_client(self, client_id: int) -> List[Order]:
-        q = self.db.query(OrderModel).filter(OrderModel.client_id == client_id)
-        return [self._to_entity(m) for m in q.all()]
+    def find_active_sorted_page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        loading: Optional[ItemLoading] = None,
+        with_items: bool = True,
+    ) -> Page:
+        rows = self._load(active_page_stmt(limit, after), loading, with_items)
+        return page_from_rows(rows, limit, queue_key)
+
+    def find_by_client(self, client_id: int, loading: Optional[ItemLoading] = None) -> List[Order]:
+        return self._load(client_stmt(client_id), loading)
 
     def update(self, order: Order) -> Order:
-        model = self.db.get(OrderModel, order.id)
+        model = self.db.scalar(by_id_stmt(order.id))
         if not model:
             raise ValueError("Order not found")
 
-        model.status = order.status or model.status
-        # model.coupon_id = order.coupon_id or model.coupon_id
-        model.amount = order.amount or model.amount
-
-        self.db.query(OrderItemModel).filter(OrderItemModel.order_id == model.id).delete()
-        for item in order.items:
-            self.db.add(
-                OrderItemModel(
-                    order_id=model.id,
-                    product_id=item.product_id,
-                    product_name=item.name,
-                    quantity=item.quantity,
-                    price=item.price,
-                )
-            )
+        apply_update(model, order)
+        for im in diff_items(model, order.items):
+            self.db.delete(im)
 
+        self.db.flush()
+        entity = self._to_entity(model)
+        self.db.commit()
+        return entity
+
+    def update_status(
+        self,
+        order_id: int,
+        expected_status: OrderStatus,
+        new_status: OrderStatus,
+    ) -> Optional[Order]:
+        # UPDATE condicional: só troca o status se ninguém mexeu no pedido desde a leitura
+        row = self.db.execute(update_status_stmt(order_id, expected_status, new_status)).one_or_none()
+        if row is None:
+            self.db.rollback()
+            return None
+
+        order = self._to_entity(row, self._items_by_order([row.id]).get(row.id, []))
         self.db.commit()
-        self.db.refresh(model)
-        return self._to_entity(model)
+        return order
 
     def delete(self, order_id: int) -> None:
         model = self.db.get(OrderModel, order_id)
@@ -103,26 +143,316 @@ class OrderRepository(OrderRepositoryPort):
             self.db.delete(model)
             self.db.commit()
 
+    def stream(
+        self,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> Iterator[Order]:
+        """
+        Percorre os pedidos por um cursor no servidor, ``batch_size`` linhas por vez.
+        Seleciona colunas (não entidades ORM), então nada se acumula no identity map
+        e a memória fica constante qualquer que seja o tamanho da tabela.
+        """
+        stmt = export_stmt(status, created_from, created_to).execution_options(yield_per=batch_size)
+        for rows in self.db.execute(stmt).partitions():
+            items = self._item_rows_by_order(r.id for r in rows)
+            for row in rows:
+                yield to_entity(row, items.get(row.id, []))
+
+    # ------------------------------------------------------------------ helpers
+    def _load(self, stmt: Select, loading: Optional[ItemLoading], with_items: bool = True) -> List[Order]:
+        """Executa a consulta de pedidos carregando os itens com número fixo de SELECTs."""
+        if not with_items:
+            # resumo: só as colunas de orders, um único SELECT
+            rows = self.db.connection().execute(core_stmt(stmt)).all()
+            return [to_entity(r, []) for r in rows]
+
+        loading = ItemLoading(loading or self.loading)
+
+        if loading is ItemLoading.CORE:
+            # direto na Connection: sem identity map, instrumentação nem OrderModel
+            conn = self.db.connection()
+            rows = conn.execute(core_stmt(stmt)).all()
+            items = self._item_rows_by_order(r.id for r in rows)
+            return [to_entity(r, items.get(r.id, [])) for r in rows]
+
+        if loading is ItemLoading.BATCH:
+            models = self.db.scalars(stmt).all()
+            by_order = self._items_by_order(m.id for m in models)
+            return [self._to_entity(m, by_order.get(m.id, [])) for m in models]
+
+        models = self.db.scalars(with_loading(stmt, loading)).unique().all()
+        return [self._to_entity(m) for m in models]
+
+    def _items_by_order(self, order_ids: Iterable[int]) -> Dict[int, List[OrderItemModel]]:
+        grouped: Dict[int, List[OrderItemModel]] = defaultdict(list)
+        for stmt in items_stmts(order_ids):
+            for im in self.db.scalars(stmt):
+                grouped[im.order_id].append(im)
+        return grouped
+
+    def _item_rows_by_order(self, order_ids: Iterable[int]) -> Dict[int, list]:
+        conn = self.db.connection()
+        grouped: Dict[int, list] = defaultdict(list)
+        for stmt in item_rows_stmts(order_ids):
+            for row in conn.execute(stmt):
+                grouped[row.order_id].append(row)
+        return grouped
+
     def _to_entity(
         self,
         model: OrderModel,
         eager_items: Optional[List[OrderItemModel]] = None,
     ) -> Order:
-        items_models = eager_items if eager_items is not None else model.items
-        return Order(
-            id=model.id,
-            client_id=model.client_id,
-            status=model.status,
-            # coupon_id=model.coupon_id,
-            amount=model.amount,
-            items=[
-                OrderItem(
-                    id=im.id,
-                    product_id=im.product_id,
-                    name=im.product_name,
-                    quantity=im.quantity,
-                    price=im.price,
-                )
-                for im in items_models
-            ],
+        return to_entity(model, eager_items)
+
+
+# ---------------------------------------------------------------------------
+# SQL e mapeamento compartilhados entre OrderRepository e AsyncOrderRepository
+
+ORDER_COLUMNS = (
+    OrderModel.id,
+    OrderModel.client_id,
+    OrderModel.status,
+    OrderModel.amount,
+    OrderModel.created_at,
+    OrderModel.updated_at,
+)
+ITEM_COLUMNS = (
+    OrderItemModel.id,
+    OrderItemModel.order_id,
+    OrderItemModel.product_id,
+    OrderItemModel.product_name,
+    OrderItemModel.quantity,
+    OrderItemModel.price,
+)
+
+
+def order_key(order: Order) -> Tuple:
+    return (order.id,)
+
+
+def queue_key(order: Order) -> Tuple:
+    return (queue_priority(order.status), order.id)
+
+
+def with_loading(stmt: Select, loading: ItemLoading) -> Select:
+    if loading is ItemLoading.SELECTIN:
+        return stmt.options(selectinload(OrderModel.items))
+    if loading is ItemLoading.JOINED:
+        return stmt.options(joinedload(OrderModel.items))
+    return stmt
+
+
+def by_id_stmt(order_id: int) -> Select:
+    return select(OrderModel).where(OrderModel.id == order_id).options(selectinload(OrderModel.items))
+
+
+def header_stmt(order_id: int) -> Select:
+    return select(*ORDER_COLUMNS).where(OrderModel.id == order_id)
+
+
+def list_stmt(status: Optional[OrderStatus]) -> Select:
+    stmt = select(OrderModel)
+    if status is not None:
+        stmt = stmt.where(OrderModel.status == status)
+    return stmt
+
+
+def client_stmt(client_id: int) -> Select:
+    return select(OrderModel).where(OrderModel.client_id == client_id)
+
+
+def active_stmt() -> Select:
+    return (
+        select(OrderModel)
+        .where(active_queue_filter)
+        .order_by(status_priority, OrderModel.id.asc())
+    )
+
+
+def page_stmt(status: Optional[OrderStatus], limit: int, after: Optional[str]) -> Select:
+    stmt = list_stmt(status)
+    if after is not None:
+        (last_id,) = decode_cursor(after, 1)
+        stmt = stmt.where(OrderModel.id > last_id)
+    return stmt.order_by(OrderModel.id.asc()).limit(limit + 1)
+
+
+def active_page_stmt(limit: int, after: Optional[str]) -> Select:
+    stmt = active_stmt()
+    if after is not None:
+        last_priority, last_id = decode_cursor(after, 2)
+        stmt = stmt.where(
+            or_(
+                status_priority > last_priority,
+                and_(status_priority == last_priority, OrderModel.id > last_id),
+            )
         )
+    return stmt.limit(limit + 1)
+
+
+def export_stmt(
+    status: Optional[OrderStatus],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+) -> Select:
+    stmt = select(*ORDER_COLUMNS)
+    if status is not None:
+        stmt = stmt.where(OrderModel.status == status)
+    if created_from is not None:
+        stmt = stmt.where(OrderModel.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(OrderModel.created_at < created_to)
+    return stmt.order_by(OrderModel.id.asc())
+
+
+def core_stmt(stmt: Select) -> Select:
+    """Mesma consulta (filtros, ordem, limite), trocando a entidade pelas colunas de ORDER_COLUMNS."""
+    return stmt.with_only_columns(*ORDER_COLUMNS)
+
+
+def item_rows_stmts(order_ids: Iterable[int]) -> List[Select]:
+    ids = list(order_ids)
+    return [
+        select(*ITEM_COLUMNS)
+        .where(OrderItemModel.order_id.in_(ids[start:start + IN_CHUNK_SIZE]))
+        .order_by(OrderItemModel.id)
+        for start in range(0, len(ids), IN_CHUNK_SIZE)
+    ]
+
+
+def items_stmts(order_ids: Iterable[int]) -> List[Select]:
+    ids = list(order_ids)
+    return [
+        select(OrderItemModel)
+        .where(OrderItemModel.order_id.in_(ids[start:start + IN_CHUNK_SIZE]))
+        .order_by(OrderItemModel.id)
+        for start in range(0, len(ids), IN_CHUNK_SIZE)
+    ]
+
+
+def insert_order_stmt(order: Order):
+    return (
+        insert(OrderModel)
+        .values(client_id=order.client_id, status=order.status, amount=order.amount)
+        .returning(OrderModel.id, OrderModel.created_at, OrderModel.updated_at)
+    )
+
+
+def insert_items_stmt():
+    return insert(OrderItemModel).returning(OrderItemModel.id, sort_by_parameter_order=True)
+
+
+def item_rows(order_id: int, items: Sequence[OrderItem]) -> List[dict]:
+    return [
+        {
+            "order_id": order_id,
+            "product_id": item.product_id,
+            "product_name": item.name,
+            "quantity": item.quantity,
+            "price": item.price,
+        }
+        for item in items
+    ]
+
+
+def update_status_stmt(order_id: int, expected_status: OrderStatus, new_status: OrderStatus):
+    return (
+        update(OrderModel)
+        .where(OrderModel.id == order_id, OrderModel.status == expected_status)
+        .values(status=new_status)
+        .returning(*ORDER_COLUMNS)
+    )
+
+
+def apply_update(model: OrderModel, order: Order) -> None:
+    model.status = order.status or model.status
+    # model.coupon_id = order.coupon_id or model.coupon_id
+    model.amount = order.amount or model.amount
+
+
+def diff_items(model: OrderModel, items: List[OrderItem]) -> List[OrderItemModel]:
+    """
+    Aplica em ``model.items`` apenas a diferença (por id) em relação a ``items``:
+    altera as linhas que mudaram e anexa as novas. Devolve as linhas removidas,
+    que o chamador deve apagar da sessão.
+    """
+    current = {im.id: im for im in model.items}
+    kept = set()
+    changed = False
+
+    for item in items:
+        values = item_rows(model.id, [item])[0]
+        im = current.get(item.id) if item.id is not None else None
+        if im is None:
+            model.items.append(OrderItemModel(**values))
+            changed = True
+            continue
+
+        kept.add(im.id)
+        for attr, value in values.items():
+            if getattr(im, attr) != value:
+                setattr(im, attr, value)
+                changed = True
+
+    removed = [im for item_id, im in current.items() if item_id not in kept]
+    for im in removed:
+        model.items.remove(im)
+
+    if changed or removed:
+        model.updated_at = func.now()
+    return removed
+
+
+def created_entity(
+    order: Order,
+    order_id: int,
+    item_ids: Sequence[int],
+    created_at: Optional[datetime] = None,
+    updated_at: Optional[datetime] = None,
+) -> Order:
+    return Order(
+        id=order_id,
+        client_id=order.client_id,
+        status=order.status,
+        amount=order.amount,
+        created_at=created_at,
+        updated_at=updated_at,
+        items=[
+            OrderItem(
+                id=item_id,
+                product_id=item.product_id,
+                name=item.name,
+                quantity=item.quantity,
+                price=item.price,
+            )
+            for item_id, item in zip(item_ids, order.items)
+        ],
+    )
+
+
+def to_entity(model: OrderModel, eager_items: Optional[List[OrderItemModel]] = None) -> Order:
+    # aceita tanto instâncias ORM quanto Rows com as colunas de ORDER_COLUMNS/ITEM_COLUMNS
+    items_models = eager_items if eager_items is not None else model.items
+    return Order(
+        id=model.id,
+        client_id=model.client_id,
+        status=model.status,
+        # coupon_id=model.coupon_id,
+        amount=model.amount,
+        created_at=model.created_at,
+        updated_at=model.updated_at,
+        items=[
+            OrderItem(
+                id=im.id,
+                product_id=im.product_id,
+                name=im.product_name,
+                quantity=im.quantity,
+                price=im.price,
+            )
+            for im in items_models
+        ],
+    )
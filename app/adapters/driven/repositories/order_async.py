@@ -0,0 +1,208 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.driven.models.item import OrderItemModel
+from app.adapters.driven.models.order import OrderModel
+from app.adapters.driven.repositories.order import (
+    STREAM_BATCH_SIZE,
+    ItemLoading,
+    active_page_stmt,
+    active_stmt,
+    apply_update,
+    by_id_stmt,
+    client_stmt,
+    created_entity,
+    core_stmt,
+    diff_items,
+    export_stmt,
+    header_stmt,
+    insert_items_stmt,
+    insert_order_stmt,
+    item_rows,
+    item_rows_stmts,
+    items_stmts,
+    list_stmt,
+    order_key,
+    page_stmt,
+    queue_key,
+    to_entity,
+    update_status_stmt,
+    with_loading,
+)
+from app.adapters.driven.repositories.idempotency import attach_order_stmt
+from app.adapters.driven.repositories.payment_outbox import insert_stmt as outbox_insert_stmt
+from app.domain.entities.order import Order
+from app.domain.entities.page import Page
+from app.domain.ports.order_repository_port import AsyncOrderRepositoryPort, page_from_rows
+from app.shared.enums.order_status import OrderStatus
+
+
+class AsyncOrderRepository(AsyncOrderRepositoryPort):
+    """Mesmas consultas do OrderRepository, executadas sobre AsyncSession (asyncpg)."""
+
+    def __init__(self, db_session: AsyncSession, loading: ItemLoading = ItemLoading.CORE):
+        if loading is ItemLoading.LAZY:
+            raise ValueError("AsyncSession não suporta lazy load dos itens")
+        self.db = db_session
+        self.loading = loading
+
+    async def create(
+        self, order: Order, with_payment: bool = False, idempotency_key: Optional[str] = None
+    ) -> Order:
+        order_id, created_at, updated_at = (await self.db.execute(insert_order_stmt(order))).one()
+
+        item_ids: List[int] = []
+        if order.items:
+            result = await self.db.scalars(insert_items_stmt(), item_rows(order_id, order.items))
+            item_ids = list(result)
+        if with_payment:
+            await self.db.execute(outbox_insert_stmt(order_id, order.amount, datetime.now(timezone.utc)))
+        if idempotency_key is not None:
+            await self.db.execute(attach_order_stmt(idempotency_key, order_id))
+
+        await self.db.commit()
+        return created_entity(order, order_id, item_ids, created_at, updated_at)
+
+    async def find_by_id(self, order_id: int) -> Optional[Order]:
+        model = await self.db.scalar(by_id_stmt(order_id))
+        return to_entity(model) if model else None
+
+    async def find_header(self, order_id: int) -> Optional[Order]:
+        row = (await self.db.execute(header_stmt(order_id))).one_or_none()
+        return to_entity(row, []) if row else None
+
+    async def find_all(
+        self,
+        status: Optional[OrderStatus] = None,
+        loading: Optional[ItemLoading] = None,
+        with_items: bool = True,
+    ) -> List[Order]:
+        return await self._load(list_stmt(status), loading, with_items)
+
+    async def find_active_sorted_orders(
+        self,
+        loading: Optional[ItemLoading] = None,
+        with_items: bool = True,
+    ) -> List[Order]:
+        return await self._load(active_stmt(), loading, with_items)
+
+    async def find_page(
+        self,
+        status: Optional[OrderStatus],
+        limit: int,
+        after: Optional[str] = None,
+        loading: Optional[ItemLoading] = None,
+        with_items: bool = True,
+    ) -> Page:
+        rows = await self._load(page_stmt(status, limit, after), loading, with_items)
+        return page_from_rows(rows, limit, order_key)
+
+    async def find_active_sorted_page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        loading: Optional[ItemLoading] = None,
+        with_items: bool = True,
+    ) -> Page:
+        rows = await self._load(active_page_stmt(limit, after), loading, with_items)
+        return page_from_rows(rows, limit, queue_key)
+
+    async def find_by_client(self, client_id: int, loading: Optional[ItemLoading] = None) -> List[Order]:
+        return await self._load(client_stmt(client_id), loading)
+
+    async def update(self, order: Order) -> Order:
+        model = await self.db.scalar(by_id_stmt(order.id))
+        if not model:
+            raise ValueError("Order not found")
+
+        apply_update(model, order)
+        for im in diff_items(model, order.items):
+            await self.db.delete(im)
+
+        await self.db.flush()
+        entity = to_entity(model)
+        await self.db.commit()
+        return entity
+
+    async def update_status(
+        self,
+        order_id: int,
+        expected_status: OrderStatus,
+        new_status: OrderStatus,
+    ) -> Optional[Order]:
+        result = await self.db.execute(update_status_stmt(order_id, expected_status, new_status))
+        row = result.one_or_none()
+        if row is None:
+            await self.db.rollback()
+            return None
+
+        items = (await self._items_by_order([row.id])).get(row.id, [])
+        order = to_entity(row, items)
+        await self.db.commit()
+        return order
+
+    async def delete(self, order_id: int) -> None:
+        model = await self.db.get(OrderModel, order_id)
+        if model:
+            await self.db.delete(model)
+            await self.db.commit()
+
+    async def stream(
+        self,
+        status: Optional[OrderStatus] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[Order]:
+        stmt = export_stmt(status, created_from, created_to).execution_options(yield_per=batch_size)
+        result = await self.db.stream(stmt)
+        async for rows in result.partitions():
+            items = await self._item_rows_by_order(r.id for r in rows)
+            for row in rows:
+                yield to_entity(row, items.get(row.id, []))
+
+    # ------------------------------------------------------------------ helpers
+    async def _load(
+        self,
+        stmt: Select,
+        loading: Optional[ItemLoading],
+        with_items: bool = True,
+    ) -> List[Order]:
+        if not with_items:
+            conn = await self.db.connection()
+            return [to_entity(r, []) for r in (await conn.execute(core_stmt(stmt))).all()]
+
+        loading = ItemLoading(loading or self.loading)
+
+        if loading is ItemLoading.CORE:
+            conn = await self.db.connection()
+            rows = (await conn.execute(core_stmt(stmt))).all()
+            items = await self._item_rows_by_order(r.id for r in rows)
+            return [to_entity(r, items.get(r.id, [])) for r in rows]
+
+        if loading is ItemLoading.BATCH:
+            models = (await self.db.scalars(stmt)).all()
+            by_order = await self._items_by_order(m.id for m in models)
+            return [to_entity(m, by_order.get(m.id, [])) for m in models]
+
+        models = (await self.db.scalars(with_loading(stmt, loading))).unique().all()
+        return [to_entity(m) for m in models]
+
+    async def _item_rows_by_order(self, order_ids: Iterable[int]) -> Dict[int, list]:
+        conn = await self.db.connection()
+        grouped: Dict[int, list] = defaultdict(list)
+        for stmt in item_rows_stmts(order_ids):
+            for row in await conn.execute(stmt):
+                grouped[row.order_id].append(row)
+        return grouped
+
+    async def _items_by_order(self, order_ids: Iterable[int]) -> Dict[int, List[OrderItemModel]]:
+        grouped: Dict[int, List[OrderItemModel]] = defaultdict(list)
+        for stmt in items_stmts(order_ids):
+            for im in await self.db.scalars(stmt):
+                grouped[im.order_id].append(im)
+        return grouped
@@ -0,0 +1,124 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Select, and_, func, insert, or_, select, true, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.adapters.driven.models.order import OrderModel
+from app.adapters.driven.models.payment import OrderPaymentModel
+from app.domain.entities.payment import PaymentProjection
+from app.domain.ports.payment_projection_port import PaymentProjectionPort
+from app.shared.enums.order_status import OrderStatus
+from app.shared.enums.payment_source import PaymentSource
+from app.shared.enums.payment_status import PaymentStatus
+
+
+class OrderPaymentRepository(PaymentProjectionPort):
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def find(self, order_id: int) -> Optional[PaymentProjection]:
+        row = self.db.execute(find_stmt(order_id)).one_or_none()
+        return to_projection(row) if row else None
+
+    def record(
+        self,
+        order_id: int,
+        status: PaymentStatus,
+        event_at: datetime,
+        source: PaymentSource = PaymentSource.WEBHOOK,
+    ) -> bool:
+        # caminho comum: a linha já existe e o evento é mais novo -> 1 UPDATE
+        if self.db.execute(advance_stmt(order_id, status, event_at, source)).rowcount:
+            self.db.commit()
+            return True
+        if self.db.scalar(order_exists_stmt(order_id)) is None:
+            self.db.rollback()
+            raise ValueError("Pedido não encontrado")
+        try:
+            self.db.execute(insert_stmt(order_id, status, event_at, source))
+            self.db.commit()
+            return True
+        except IntegrityError:
+            # a linha já existia com evento mais novo, ou outra requisição a criou agora
+            self.db.rollback()
+        applied = self.db.execute(advance_stmt(order_id, status, event_at, source)).rowcount > 0
+        self.db.commit()
+        return applied
+
+    def pending_order_ids(self, limit: int, stale_before: datetime) -> List[int]:
+        return list(self.db.scalars(pending_stmt(limit, stale_before)))
+
+
+# ---------------------------------------------------------------------------
+# SQL compartilhado com AsyncOrderPaymentRepository
+
+PAYMENT_COLUMNS = (
+    OrderPaymentModel.order_id,
+    OrderPaymentModel.status,
+    OrderPaymentModel.event_at,
+    OrderPaymentModel.updated_at,
+)
+
+
+def find_stmt(order_id: int) -> Select:
+    return select(*PAYMENT_COLUMNS).where(OrderPaymentModel.order_id == order_id)
+
+
+def advance_stmt(order_id: int, status: PaymentStatus, event_at: datetime, source: PaymentSource):
+    # event_at só se compara entre eventos da mesma origem
+    newer = and_(
+        OrderPaymentModel.source == source,
+        or_(OrderPaymentModel.event_at.is_(None), OrderPaymentModel.event_at <= event_at),
+    )
+    if source is PaymentSource.WEBHOOK:
+        # o webhook traz o horário do serviço de pagamento: vence qualquer consulta
+        applies = or_(OrderPaymentModel.source == PaymentSource.POLL, newer)
+    else:
+        # a consulta só passa por cima de um webhook que ainda diz PENDING
+        applies = or_(newer, OrderPaymentModel.status == PaymentStatus.PENDING)
+    return (
+        update(OrderPaymentModel)
+        .where(OrderPaymentModel.order_id == order_id, applies)
+        .values(status=status, event_at=event_at, source=source, updated_at=func.now())
+    )
+
+
+def insert_stmt(order_id: int, status: PaymentStatus, event_at: datetime, source: PaymentSource):
+    return insert(OrderPaymentModel).values(
+        order_id=order_id, status=status, event_at=event_at, source=source
+    )
+
+
+def order_exists_stmt(order_id: int) -> Select:
+    return select(OrderModel.id).where(OrderModel.id == order_id)
+
+
+def pending_stmt(limit: int, stale_before: datetime) -> Select:
+    return (
+        select(OrderModel.id)
+        .outerjoin(OrderPaymentModel, OrderPaymentModel.order_id == OrderModel.id)
+        .where(
+            OrderModel.active == true(),
+            OrderModel.status == OrderStatus.RECEIVED,
+            or_(
+                OrderPaymentModel.order_id.is_(None),
+                and_(
+                    OrderPaymentModel.status == PaymentStatus.PENDING,
+                    OrderPaymentModel.updated_at < stale_before,
+                ),
+            ),
+        )
+        .order_by(OrderModel.id.asc())
+        .limit(limit)
+    )
+
+
+def to_projection(row) -> PaymentProjection:
+    return PaymentProjection(
+        order_id=row.order_id,
+        status=row.status,
+        event_at=row.event_at,
+        synced_at=row.updated_at,
+    )
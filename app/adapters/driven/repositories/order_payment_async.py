@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.driven.repositories.order_payment import (
+    advance_stmt,
+    find_stmt,
+    insert_stmt,
+    order_exists_stmt,
+    pending_stmt,
+    to_projection,
+)
+from app.domain.entities.payment import PaymentProjection
+from app.domain.ports.payment_projection_port import AsyncPaymentProjectionPort
+from app.shared.enums.payment_source import PaymentSource
+from app.shared.enums.payment_status import PaymentStatus
+
+
+class AsyncOrderPaymentRepository(AsyncPaymentProjectionPort):
+    """Mesmas consultas do OrderPaymentRepository, executadas sobre AsyncSession."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def find(self, order_id: int) -> Optional[PaymentProjection]:
+        row = (await self.db.execute(find_stmt(order_id))).one_or_none()
+        return to_projection(row) if row else None
+
+    async def record(
+        self,
+        order_id: int,
+        status: PaymentStatus,
+        event_at: datetime,
+        source: PaymentSource = PaymentSource.WEBHOOK,
+    ) -> bool:
+        if (await self.db.execute(advance_stmt(order_id, status, event_at, source))).rowcount:
+            await self.db.commit()
+            return True
+        if await self.db.scalar(order_exists_stmt(order_id)) is None:
+            await self.db.rollback()
+            raise ValueError("Pedido não encontrado")
+        try:
+            await self.db.execute(insert_stmt(order_id, status, event_at, source))
+            await self.db.commit()
+            return True
+        except IntegrityError:
+            await self.db.rollback()
+        applied = (await self.db.execute(advance_stmt(order_id, status, event_at, source))).rowcount > 0
+        await self.db.commit()
+        return applied
+
+    async def pending_order_ids(self, limit: int, stale_before: datetime) -> List[int]:
+        return list(await self.db.scalars(pending_stmt(limit, stale_before)))
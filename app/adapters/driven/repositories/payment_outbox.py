@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import List, Optional, Sequence
+
+from sqlalchemy import Select, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.adapters.driven.models.payment_outbox import PaymentOutboxModel
+from app.domain.entities.payment import PaymentOutboxEntry
+from app.domain.ports.payment_outbox_port import PaymentOutboxPort
+from app.shared.enums.outbox_status import OutboxStatus
+
+
+class PaymentOutboxRepository(PaymentOutboxPort):
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def find(self, order_id: int) -> Optional[PaymentOutboxEntry]:
+        row = self.db.execute(find_stmt(order_id)).one_or_none()
+        return to_entry(row) if row else None
+
+    def claim_due(self, now: datetime, limit: int, lease_until: datetime) -> List[PaymentOutboxEntry]:
+        rows = self.db.execute(due_stmt(now, limit)).all()
+        if rows:
+            self.db.execute(lease_stmt([r.order_id for r in rows], lease_until))
+        self.db.commit()
+        return [claimed_entry(r) for r in rows]
+
+    def mark_sent(self, order_id: int, qr_code: str) -> None:
+        self.db.execute(sent_stmt(order_id, qr_code))
+        self.db.commit()
+
+    def mark_failed(self, order_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        self.db.execute(failed_stmt(order_id, error, retry_at))
+        self.db.commit()
+
+
+# ---------------------------------------------------------------------------
+# SQL compartilhado com AsyncPaymentOutboxRepository e com a gravação do pedido
+
+OUTBOX_COLUMNS = (
+    PaymentOutboxModel.order_id,
+    PaymentOutboxModel.amount,
+    PaymentOutboxModel.status,
+    PaymentOutboxModel.attempts,
+    PaymentOutboxModel.qr_code,
+    PaymentOutboxModel.last_error,
+)
+
+# tamanho máximo de last_error
+ERROR_MAX_LENGTH = 255
+
+
+def insert_stmt(order_id: int, amount: float, now: datetime):
+    # vence em ``now``: o dispatcher pega a entrada na primeira rodada
+    return insert(PaymentOutboxModel).values(
+        order_id=order_id,
+        amount=amount,
+        status=OutboxStatus.PENDING,
+        attempts=0,
+        next_attempt_at=now,
+    )
+
+
+def find_stmt(order_id: int) -> Select:
+    return select(*OUTBOX_COLUMNS).where(PaymentOutboxModel.order_id == order_id)
+
+
+def due_stmt(now: datetime, limit: int) -> Select:
+    # SKIP LOCKED: instâncias drenando ao mesmo tempo pegam lotes diferentes
+    return (
+        select(*OUTBOX_COLUMNS)
+        .where(
+            PaymentOutboxModel.status == OutboxStatus.PENDING,
+            PaymentOutboxModel.next_attempt_at <= now,
+        )
+        .order_by(PaymentOutboxModel.next_attempt_at.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def lease_stmt(order_ids: Sequence[int], lease_until: datetime):
+    return (
+        update(PaymentOutboxModel)
+        .where(PaymentOutboxModel.order_id.in_(order_ids))
+        .values(
+            attempts=PaymentOutboxModel.attempts + 1,
+            next_attempt_at=lease_until,
+            updated_at=func.now(),
+        )
+    )
+
+
+def sent_stmt(order_id: int, qr_code: str):
+    return (
+        update(PaymentOutboxModel)
+        .where(PaymentOutboxModel.order_id == order_id)
+        .values(status=OutboxStatus.SENT, qr_code=qr_code, last_error=None, updated_at=func.now())
+    )
+
+
+def failed_stmt(order_id: int, error: str, retry_at: Optional[datetime]):
+    values = dict(last_error=error[:ERROR_MAX_LENGTH], updated_at=func.now())
+    if retry_at is None:
+        values["status"] = OutboxStatus.FAILED
+    else:
+        values["next_attempt_at"] = retry_at
+    return (
+        update(PaymentOutboxModel)
+        .where(
+            PaymentOutboxModel.order_id == order_id,
+            PaymentOutboxModel.status == OutboxStatus.PENDING,
+        )
+        .values(**values)
+    )
+
+
+def to_entry(row) -> PaymentOutboxEntry:
+    return PaymentOutboxEntry(
+        order_id=row.order_id,
+        amount=row.amount,
+        status=row.status,
+        attempts=row.attempts,
+        qr_code=row.qr_code,
+        last_error=row.last_error,
+    )
+
+
+def claimed_entry(row) -> PaymentOutboxEntry:
+    entry = to_entry(row)
+    entry.attempts += 1
+    return entry
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.adapters.driven.repositories.payment_outbox import (
+    claimed_entry,
+    due_stmt,
+    failed_stmt,
+    find_stmt,
+    lease_stmt,
+    sent_stmt,
+    to_entry,
+)
+from app.domain.entities.payment import PaymentOutboxEntry
+from app.domain.ports.payment_outbox_port import AsyncPaymentOutboxPort
+
+
+class AsyncPaymentOutboxRepository(AsyncPaymentOutboxPort):
+    """Mesmas consultas do PaymentOutboxRepository, executadas sobre AsyncSession."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def find(self, order_id: int) -> Optional[PaymentOutboxEntry]:
+        row = (await self.db.execute(find_stmt(order_id))).one_or_none()
+        return to_entry(row) if row else None
+
+    async def claim_due(
+        self, now: datetime, limit: int, lease_until: datetime
+    ) -> List[PaymentOutboxEntry]:
+        rows = (await self.db.execute(due_stmt(now, limit))).all()
+        if rows:
+            await self.db.execute(lease_stmt([r.order_id for r in rows], lease_until))
+        await self.db.commit()
+        return [claimed_entry(r) for r in rows]
+
+    async def mark_sent(self, order_id: int, qr_code: str) -> None:
+        await self.db.execute(sent_stmt(order_id, qr_code))
+        await self.db.commit()
+
+    async def mark_failed(self, order_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        await self.db.execute(failed_stmt(order_id, error, retry_at))
+        await self.db.commit()
@@ -0,0 +1,62 @@
+import math
+import re
+import time
+from typing import Optional, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.shared.resilience import AdmissionController
+
+# (método, padrão do fim do caminho, classe); o prefixo (/api) não importa.
+# Streams, métricas e o que não está aqui não passam pelo controle de admissão.
+ROUTE_CLASSES: Sequence[Tuple[str, re.Pattern, str]] = (
+    ("PATCH", re.compile(r"/orders/[^/]+/status$"), "status"),
+    ("POST", re.compile(r"/payments/webhook$"), "status"),
+    ("POST", re.compile(r"/orders$"), "create"),
+    # a exportação segura a vaga pelo stream inteiro: limite próprio, fora das leituras
+    ("GET", re.compile(r"/orders/export$"), "export"),
+    ("GET", re.compile(r"/orders(/[^/]+)?$"), "read"),
+    ("GET", re.compile(r"/orders/[^/]+/payment$"), "read"),
+)
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    for route_method, pattern, name in ROUTE_CLASSES:
+        if method == route_method and pattern.search(path):
+            return name
+    return None
+
+
+class AdmissionMiddleware:
+    """
+    Middleware ASGI: segura a vaga até a resposta terminar de ser enviada
+    (inclusive exportações em streaming) e responde 503 com Retry-After quando
+    o controle de admissão recusa a requisição.
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = route_class(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await self.controller.acquire(name)
+        if retry_after is not None:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Serviço sobrecarregado, tente novamente"},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name, time.monotonic() - started)
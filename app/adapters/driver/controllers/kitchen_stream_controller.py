@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from starlette.websockets import WebSocketDisconnect
+
+from app.adapters.driver.dependencias.container import (
+    QUEUE_STREAM_HEARTBEAT_SECONDS,
+    get_kitchen_queue_feed,
+)
+from app.domain.services.kitchen_queue_feed import KitchenQueueFeed, QueueEvent, QueueSnapshot
+from app.domain.services.kitchen_queue_index import QueueChangeKind
+from app.shared.broadcast import HubFullError, Subscription
+from .order_render import order_out
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# fechamento do WebSocket quando a fila não está disponível ("try again later")
+WS_TRY_AGAIN_LATER = 1013
+
+
+def event_payload(event: QueueEvent) -> Tuple[str, Dict[str, Any]]:
+    """Nome do evento e corpo JSON: ``snapshot``, ``added``, ``changed``, ``removed`` ou ``ping``."""
+    if event is None:
+        return "ping", {}
+    if isinstance(event, QueueSnapshot):
+        return "snapshot", {"version": event.version, "orders": [order_out(o) for o in event.orders]}
+    if event.kind is QueueChangeKind.REMOVED:
+        return event.kind.value, {"version": event.version, "id": event.order_id}
+    return event.kind.value, {"version": event.version, "order": order_out(event.order)}
+
+
+def sse_message(event: QueueEvent) -> bytes:
+    if event is None:
+        return b": ping\n\n"  # comentário: mantém proxies e o navegador com a conexão viva
+    name, data = event_payload(event)
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (data["version"], name.encode(), orjson.dumps(data))
+
+
+@router.get(
+    "/orders/active/stream",
+    response_class=StreamingResponse,
+    summary="Fila da cozinha em tempo real (SSE)",
+    description="Server-Sent Events: um evento snapshot com a fila ativa e depois só as mudanças "
+                "(added, changed, removed), cada uma com a versão da fila. Um snapshot novo "
+                "substitui o estado local sempre que chegar.",
+)
+async def stream_active_orders(feed: KitchenQueueFeed = Depends(get_kitchen_queue_feed)):
+    sub = _subscribe(feed)
+    if sub is None:
+        raise HTTPException(
+            status_code=503, detail="Fila em tempo real indisponível", headers={"Retry-After": "1"}
+        )
+    return _SubscriptionStream(
+        sub,
+        _sse(feed, sub),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/orders/active/ws")
+async def active_orders_ws(
+    websocket: WebSocket,
+    feed: KitchenQueueFeed = Depends(get_kitchen_queue_feed),
+):
+    """Mesmos eventos do SSE, um JSON por mensagem com o nome em ``event``."""
+    sub = _subscribe(feed)
+    if sub is None:
+        await websocket.close(code=WS_TRY_AGAIN_LATER)
+        return
+    # a assinatura sai com o handler, mesmo se o envio nem chegar a começar
+    with sub:
+        await websocket.accept()
+
+        events = feed.events(sub, QUEUE_STREAM_HEARTBEAT_SECONDS)
+        sender = asyncio.create_task(_send_events(websocket, events))
+        closed = asyncio.create_task(_wait_disconnect(websocket))
+        done, pending = await asyncio.wait({sender, closed}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        if sender in done:
+            exc = sender.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                logger.error("Falha no push da fila da cozinha", exc_info=exc)
+            if closed not in done:
+                await websocket.close()
+
+
+# ------------------------------------------------------------------ helpers
+def _subscribe(feed: KitchenQueueFeed) -> Optional[Subscription]:
+    # assina antes de responder: sem vaga, o cliente recebe a recusa e não um stream vazio
+    if not feed.available():
+        return None
+    try:
+        return feed.subscribe()
+    except HubFullError:
+        return None
+
+
+class _SubscriptionStream(StreamingResponse):
+    """Libera a assinatura ao fim da resposta, mesmo se o corpo nem chegar a ser lido."""
+
+    def __init__(self, sub: Subscription, content: AsyncIterator[bytes], **kwargs):
+        super().__init__(content, **kwargs)
+        self.sub = sub
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        with self.sub:
+            await super().__call__(scope, receive, send)
+
+
+async def _sse(feed: KitchenQueueFeed, sub: Subscription) -> AsyncIterator[bytes]:
+    async with aclosing(feed.events(sub, QUEUE_STREAM_HEARTBEAT_SECONDS)) as events:
+        async for event in events:
+            yield sse_message(event)
+
+
+async def _send_events(websocket: WebSocket, events: AsyncIterator[QueueEvent]) -> None:
+    # aclosing: cancelado no meio de um send, a assinatura é liberada na hora
+    async with aclosing(events):
+        async for event in events:
+            name, data = event_payload(event)
+            await websocket.send_text(orjson.dumps({"event": name, **data}).decode())
+
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    # mensagens do cliente são ignoradas; só interessa saber quando ele sai
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
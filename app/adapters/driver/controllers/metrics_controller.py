@@ -0,0 +1,16 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.shared import metrics
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    summary="Contadores internos",
+    description="Contadores dos componentes em memória (cache do catálogo, filas, etc.) desta instância.",
+)
+async def get_metrics() -> Dict[str, Dict[str, Any]]:
+    return metrics.snapshot()
@@ -1,39 +1,73 @@
-import os
+import inspect
+from datetime import datetime
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Security
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Security, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 
 from app.adapters.driven.repositories.order import OrderRepository
-from app.adapters.driven.gateways.product_catalog_gateway import ProductCatalogGateway
+from app.adapters.driven.repositories.order_async import AsyncOrderRepository
+from app.adapters.driver.dependencias.container import (
+    ASYNC_IO,
+    get_create_order_service,
+    get_idempotent_requests,
+    get_list_orders_service,
+    get_order_by_id_service,
+    get_payment_outbox_store,
+    get_update_order_status_service,
+)
 from app.domain.entities.order import Order
 from app.domain.entities.item import OrderItem
-from app.domain.services.create_order_service import CreateOrderService
-from app.domain.services.list_order_service import ListOrdersService, GetOrderByIdService
-from app.domain.services.update_order_service import UpdateOrderStatusService
+from app.domain.entities.idempotency import StoredResponse
+from app.domain.entities.page import Page
+from app.domain.services.idempotency_service import request_fingerprint, scoped_key
 from app.shared.enums.order_status import OrderStatus
-from database import get_db_session
-from .order_schemas import OrderIn, OrderOut, OrderItemOut, OrderOutQrCode
-from ...driven.gateways.customer_auth_http import CustomerAuthHttp
-from ...driven.gateways.payment_status_http import PaymentGatewayHttp
+from app.shared.exceptions.idempotency import IdempotencyInProgressError, IdempotencyKeyReusedError
+from database import async_read_session, read_session
+from .order_export import MEDIA_TYPES, ExportFormat, render_orders, render_orders_async
+from .order_render import (
+    ETAG_HEADER,
+    content_etag,
+    etag_matches,
+    json_response,
+    not_modified,
+    order_etag,
+    order_out,
+    order_out_qr,
+    orders_json,
+    parse_fields,
+    queue_etag,
+)
+from .order_schemas import OrderIn, OrderOut, OrderOutQrCode, OrderPaymentOut
+from .service_runner import run_service
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
 security = HTTPBearer(auto_error=False)
+
+
 @router.post("/orders", response_model=OrderOutQrCode, status_code=status.HTTP_201_CREATED)
-def create_order(
+async def create_order(
     payload: OrderIn,
     credentials: HTTPAuthorizationCredentials = Security(security),
-    db: Session = Depends(get_db_session),
+    idempotency_key: str | None = Header(
+        default=None,
+        max_length=255,
+        description="Repetições com a mesma chave (e o mesmo corpo) recebem a resposta "
+                    "da primeira execução, sem criar outro pedido",
+    ),
+    service=Depends(get_create_order_service),
+    idempotency=Depends(get_idempotent_requests),
 ):
     token = credentials.credentials if credentials else None
 
-    order_repo = OrderRepository(db)
-    catalog = ProductCatalogGateway()
-    payment_gateway = PaymentGatewayHttp(os.getenv("PAYMENT_SERVICE_URL"))
-    customer_auth = CustomerAuthHttp(os.getenv("CUSTOMER_SERVICE_URL"))
-    service = CreateOrderService(order_repo, catalog,payment_gateway,customer_auth )
-
     domain_order = Order(
         client_id=None,
         items=[
@@ -42,39 +76,89 @@ def create_order(
         ],
     )
 
+    key = scoped_key(idempotency_key, token) if idempotency_key is not None else None
+    produce, recover = _create_calls(service, domain_order, token, key)
+
     try:
-        order,qr_code = service.execute(domain_order,token = token)
+        if key is None:
+            created = await run_service(produce)
+            return json_response(created.body, created.status_code)
+        # modo síncrono: reserva, serviço e resposta na mesma thread do pool
+        stored, replayed = await run_service(
+            idempotency.run,
+            key,
+            request_fingerprint(payload.model_dump_json().encode()),
+            produce,
+            recover,
+        )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
+    except IdempotencyKeyReusedError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except IdempotencyInProgressError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail=str(exc),
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
 
-    return OrderOutQrCode(
-        id=order.id,
-        client_id=order.client_id,
-        status=order.status,
-        amount=order.amount,
-        qr_code=qr_code,
-        items=[
-            OrderItemOut(
-                product_id=i.product_id,
-                name=i.name,
-                quantity=i.quantity,
-                price=i.price,
-            )
-            for i in order.items
-        ],
-    )
+    headers = {REPLAYED_HEADER: "true"} if replayed else None
+    return json_response(stored.body, stored.status_code, headers=headers)
+
+
+def _page_params(
+    limit: int | None = Query(
+        default=None,
+        ge=1,
+        le=MAX_PAGE_SIZE,
+        description="Tamanho da página (omitido = lista completa, sem paginação)",
+    ),
+    after: str | None = Query(
+        default=None,
+        description=f"Cursor opaco recebido no header {NEXT_CURSOR_HEADER} da página anterior",
+    ),
+) -> tuple[int | None, str | None]:
+    return limit, after
+
+
+def _projection(
+    fields: str | None = Query(
+        default=None,
+        description="Campos do pedido separados por vírgula (id, client_id, status, items, amount); "
+                    "omitido = todos. Sem items, os itens nem são lidos do banco.",
+    ),
+    include: str | None = Query(
+        default=None,
+        description='"items" acrescenta os itens aos campos de fields',
+    ),
+) -> tuple[str, ...] | None:
+    try:
+        return parse_fields(fields, include)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _with_items(projection: tuple[str, ...] | None) -> bool:
+    return projection is None or "items" in projection
 
 
 @router.get("/orders", response_model=List[OrderOut])
-def list_orders(
+async def list_orders(
+    response: Response,
     status: OrderStatus | None = Query(
         default=None,
         description="Filtra por status (omitido = todos)"
     ),
-    db: Session = Depends(get_db_session),
+    page: tuple[int | None, str | None] = Depends(_page_params),
+    projection: tuple[str, ...] | None = Depends(_projection),
+    service=Depends(get_list_orders_service),
 ):
-    orders = ListOrdersService(OrderRepository(db)).execute(status=status)
-    return [_to_out(o) for o in orders]
+    filters = dict(status=status, with_items=_with_items(projection))
+    if page == (None, None):
+        orders = await run_service(service.execute, **filters)
+    else:
+        orders = await _paginate(service, response, *page, **filters)
+    return json_response(orders_json(orders, projection), headers=response.headers)
 
 
 @router.get(
@@ -83,23 +167,102 @@ def list_orders(
     summary="Listar pedidos ativos por prioridade",
     description="Retorna pedidos ativos que ainda não foram finalizados, ordenados por prioridade de status e ID."
 )
-def list_active_sorted_orders(
-    db: Session = Depends(get_db_session),
+async def list_active_sorted_orders(
+    response: Response,
+    page: tuple[int | None, str | None] = Depends(_page_params),
+    projection: tuple[str, ...] | None = Depends(_projection),
+    if_none_match: str | None = Header(default=None),
+    service=Depends(get_list_orders_service),
+):
+    # com o índice em memória a versão da fila responde o GET condicional
+    # antes de montar a página e serializar
+    tag = service.queue_tag()
+    etag = queue_etag(tag, *page, projection) if tag is not None else None
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    filters = dict(prioritized=True, with_items=_with_items(projection))
+    if page == (None, None):
+        orders = await run_service(service.execute, **filters)
+    else:
+        orders = await _paginate(service, response, *page, **filters)
+    body = orders_json(orders, projection)
+
+    # fila lida do banco: o ETag vem do próprio corpo e só economiza a transferência
+    if etag is None:
+        etag = content_etag(body)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    response.headers[ETAG_HEADER] = etag
+    return json_response(body, headers=response.headers)
+
+
+# declarada antes de /orders/{order_id} para "export" não ser lido como id
+@router.get(
+    "/orders/export",
+    response_class=StreamingResponse,
+    summary="Exportar pedidos",
+    description="Transmite os pedidos em NDJSON (um pedido por linha) ou CSV (uma linha por item), "
+                "lidos do banco em lotes por um cursor no servidor.",
+)
+async def export_orders(
+    format: ExportFormat = Query(default=ExportFormat.NDJSON, description="ndjson ou csv"),
+    status: OrderStatus | None = Query(default=None, description="Filtra por status"),
+    created_from: datetime | None = Query(default=None, description="created_at >= (inclusivo)"),
+    created_to: datetime | None = Query(default=None, description="created_at < (exclusivo)"),
 ):
-    orders = ListOrdersService(OrderRepository(db)).execute(prioritized=True)
-    return [_to_out(o) for o in orders]
+    if created_from and created_to and created_from >= created_to:
+        raise HTTPException(status_code=400, detail="created_from deve ser anterior a created_to")
 
+    filters = dict(status=status, created_from=created_from, created_to=created_to)
+    # a sessão é aberta dentro do gerador: dependências com yield já foram
+    # finalizadas quando o StreamingResponse começa a enviar o corpo
+    body = _export_async(format, filters) if ASYNC_IO else _export_sync(format, filters)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{format.value}"'},
+    )
 
 
 @router.get("/orders/{order_id}", response_model=OrderOut, status_code=200)
-def get_order_by_id(
+async def get_order_by_id(
     order_id: int,
-    db: Session = Depends(get_db_session),
+    if_none_match: str | None = Header(default=None),
+    service=Depends(get_order_by_id_service),
 ):
-    order = GetOrderByIdService(OrderRepository(db)).execute(order_id)
+    if if_none_match:
+        # só a linha de orders: sem itens nem serialização se o cliente já tem a versão
+        header = await run_service(service.header, order_id)
+        if not header:
+            raise HTTPException(status_code=404, detail="Order not found")
+        etag = order_etag(header)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    order = await run_service(service.execute, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    return _to_out(order)
+    return json_response(orjson.dumps(order_out(order)), headers=_etag_header(order))
+
+
+@router.get(
+    "/orders/{order_id}/payment",
+    response_model=OrderPaymentOut,
+    summary="Cobrança do pedido",
+    description="QR code do pagamento, para quando a criação do pedido respondeu antes de a "
+                "cobrança ficar pronta (qr_code nulo).",
+)
+async def get_order_payment(order_id: int, store=Depends(get_payment_outbox_store)):
+    entry = await run_service(store.find, order_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return OrderPaymentOut(
+        order_id=entry.order_id,
+        status=entry.status,
+        qr_code=entry.qr_code,
+        attempts=entry.attempts,
+    )
 
 
 @router.patch(
@@ -107,35 +270,75 @@ def get_order_by_id(
     response_model=OrderOut,
     status_code=status.HTTP_200_OK,
 )
-def update_order_status(
+async def update_order_status(
     order_id: int,
     status: OrderStatus = Query(..., description="Novo status do pedido"),
-    db: Session = Depends(get_db_session),
+    service=Depends(get_update_order_status_service),
 ):
     try:
-        payment_port = PaymentGatewayHttp(os.getenv("PAYMENT_SERVICE_URL"))
-        updated = UpdateOrderStatusService(OrderRepository(db),payment_port).execute(
-            order_id, status
-        )
+        updated = await run_service(service.execute, order_id, status)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return _to_out(updated)
+    return json_response(orjson.dumps(order_out(updated)), headers=_etag_header(updated))
 
 # ------------------------------------------------------------------ helpers
-def _to_out(order: Order) -> OrderOut:
-    return OrderOut(
-        id=order.id,
-        client_id=order.client_id,
-        status=order.status,
-        amount=order.amount,
-        items=[
-            OrderItemOut(
-                product_id=i.product_id,
-                name=i.name,
-                quantity=i.quantity,
-                price=i.price,
-            )
-            for i in order.items
-        ],
-    )
+def _created(order: Order, qr_code: Optional[str]) -> StoredResponse:
+    return StoredResponse(status.HTTP_201_CREATED, orjson.dumps(order_out_qr(order, qr_code)))
+
+
+def _create_calls(service, order: Order, token: Optional[str], key: Optional[str]):
+    """
+    ``produce`` e ``recover`` no mesmo modo do serviço. Os síncronos rodam na
+    thread que já segura a Idempotency-Key: voltar ao event loop para pedir
+    outra thread do pool deixaria as requisições esperando umas pelas outras
+    quando o pool enche.
+    """
+    if inspect.iscoroutinefunction(service.execute):
+        async def produce() -> StoredResponse:
+            return _created(*await service.execute(order, token=token, idempotency_key=key))
+
+        async def recover(order_id: int) -> StoredResponse:
+            return _created(*await service.recover(order_id))
+    else:
+        def produce() -> StoredResponse:
+            return _created(*service.execute(order, token=token, idempotency_key=key))
+
+        def recover(order_id: int) -> StoredResponse:
+            return _created(*service.recover(order_id))
+    return produce, recover
+
+
+def _etag_header(order: Order) -> dict:
+    etag = order_etag(order)
+    return {ETAG_HEADER: etag} if etag else {}
+
+
+def _export_sync(fmt: ExportFormat, filters: dict):
+    db = read_session()
+    try:
+        yield from render_orders(OrderRepository(db).stream(**filters), fmt)
+    finally:
+        db.close()
+
+
+async def _export_async(fmt: ExportFormat, filters: dict):
+    async with await async_read_session() as db:
+        async for chunk in render_orders_async(AsyncOrderRepository(db).stream(**filters), fmt):
+            yield chunk
+
+
+async def _paginate(
+    service,
+    response: Response,
+    limit: int | None,
+    after: str | None,
+    **filters,
+) -> List[Order]:
+    try:
+        page: Page = await run_service(service.paginate, limit or DEFAULT_PAGE_SIZE, after, **filters)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Optional
+
+from app.domain.entities.order import Order
+
+# o corpo é enviado em blocos deste tamanho, e não uma escrita por pedido
+FLUSH_BYTES = 64 * 1024
+
+CSV_HEADER = (
+    "order_id", "client_id", "status", "amount", "created_at",
+    "product_id", "product_name", "quantity", "price",
+)
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def order_record(order: Order) -> dict:
+    return {
+        "id": order.id,
+        "client_id": order.client_id,
+        "status": order.status.value,
+        "amount": order.amount,
+        "created_at": _iso(order.created_at),
+        "items": [
+            {
+                "product_id": i.product_id,
+                "name": i.name,
+                "quantity": i.quantity,
+                "price": i.price,
+            }
+            for i in order.items
+        ],
+    }
+
+
+class _Renderer:
+    """Converte um pedido por vez em texto; no CSV cada item vira uma linha."""
+
+    def __init__(self, fmt: ExportFormat):
+        self.fmt = fmt
+        self._buf = io.StringIO()
+        self._csv = csv.writer(self._buf, lineterminator="\n")
+
+    def header(self) -> str:
+        if self.fmt is ExportFormat.CSV:
+            self._csv.writerow(CSV_HEADER)
+        return self._take()
+
+    def render(self, order: Order) -> str:
+        if self.fmt is ExportFormat.NDJSON:
+            return json.dumps(order_record(order), ensure_ascii=False) + "\n"
+
+        head = (order.id, order.client_id, order.status.value, order.amount, _iso(order.created_at))
+        if not order.items:
+            self._csv.writerow(head + (None,) * 4)
+        for i in order.items:
+            self._csv.writerow(head + (i.product_id, i.name, i.quantity, i.price))
+        return self._take()
+
+    def _take(self) -> str:
+        text = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return text
+
+
+def render_orders(orders: Iterable[Order], fmt: ExportFormat) -> Iterator[bytes]:
+    renderer = _Renderer(fmt)
+    chunk = [renderer.header()]
+    size = len(chunk[0])
+    for order in orders:
+        text = renderer.render(order)
+        chunk.append(text)
+        size += len(text)
+        if size >= FLUSH_BYTES:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+async def render_orders_async(orders: AsyncIterable[Order], fmt: ExportFormat) -> AsyncIterator[bytes]:
+    renderer = _Renderer(fmt)
+    chunk = [renderer.header()]
+    size = len(chunk[0])
+    async for order in orders:
+        text = renderer.render(order)
+        chunk.append(text)
+        size += len(text)
+        if size >= FLUSH_BYTES:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk).encode()
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
@@ -0,0 +1,153 @@
+import hashlib
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import orjson
+from fastapi import Response
+
+from app.domain.entities.order import Order
+
+JSON_MEDIA_TYPE = "application/json"
+ETAG_HEADER = "ETag"
+
+
+# campos de ``OrderOut``, na ordem em que saem no JSON
+ORDER_FIELDS = ("id", "client_id", "status", "items", "amount")
+Fields = Tuple[str, ...]
+
+
+def _items_out(order: Order) -> List[Dict[str, Any]]:
+    return [
+        {
+            "product_id": i.product_id,
+            "name": i.name,
+            "quantity": i.quantity,
+            "price": float(i.price),
+        }
+        for i in order.items
+    ]
+
+
+def order_out(order: Order) -> Dict[str, Any]:
+    """Mesmo formato (e ordem de campos) de ``OrderOut``, sem passar pelo Pydantic."""
+    return {
+        "id": order.id,
+        "client_id": order.client_id,
+        "status": order.status.value,
+        "items": _items_out(order),
+        "amount": float(order.amount),
+    }
+
+
+_FIELD_VALUES: Dict[str, Callable[[Order], Any]] = {
+    "id": lambda o: o.id,
+    "client_id": lambda o: o.client_id,
+    "status": lambda o: o.status.value,
+    "items": _items_out,
+    "amount": lambda o: float(o.amount),
+}
+
+
+def order_fields(order: Order, fields: Fields) -> Dict[str, Any]:
+    """Só os campos pedidos, calculando apenas esses."""
+    return {f: _FIELD_VALUES[f](order) for f in fields}
+
+
+def parse_fields(fields: Optional[str], include: Optional[str]) -> Optional[Fields]:
+    """
+    Projeção pedida em ``?fields=`` (lista separada por vírgula) e
+    ``?include=items``. None quando o pedido sai completo. Lança ValueError
+    para campos desconhecidos.
+    """
+    included = _split(include)
+    if included - {"items"}:
+        raise ValueError(f"include inválido: {', '.join(sorted(included - {'items'}))}")
+    if fields is None:
+        return None
+
+    requested = _split(fields)
+    unknown = requested - set(ORDER_FIELDS)
+    if unknown:
+        raise ValueError(f"Campos desconhecidos: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("Informe ao menos um campo em fields")
+    requested |= included
+    return tuple(f for f in ORDER_FIELDS if f in requested)
+
+
+def _split(value: Optional[str]) -> Set[str]:
+    return {part.strip() for part in (value or "").split(",") if part.strip()}
+
+
+def order_out_qr(order: Order, qr_code: Optional[str]) -> Dict[str, Any]:
+    """Formato de ``OrderOutQrCode``."""
+    out = order_out(order)
+    return {
+        "id": out["id"],
+        "client_id": out["client_id"],
+        "qr_code": qr_code,
+        "status": out["status"],
+        "items": out["items"],
+        "amount": out["amount"],
+    }
+
+
+def orders_json(orders: Iterable[Order], fields: Optional[Fields] = None) -> bytes:
+    if fields is None:
+        return orjson.dumps([order_out(o) for o in orders])
+    return orjson.dumps([order_fields(o, fields) for o in orders])
+
+
+def json_response(
+    body: bytes,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    Corpo já serializado. Um Response devolvido pelo endpoint não passa pela
+    validação/serialização do ``response_model``, que continua declarado só
+    para o schema do OpenAPI.
+    """
+    return Response(body, status_code=status_code, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+# ---------------------------------------------------------------- validadores
+def _etag(*parts: Any) -> str:
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def order_etag(order: Order) -> Optional[str]:
+    """
+    ETag forte de um pedido, pela versão gravada (``updated_at``). O status entra
+    junto porque em bancos com relógio de segundos duas trocas seguidas podem
+    gravar o mesmo ``updated_at``. Sem ``updated_at`` não há ETag.
+    """
+    if order.updated_at is None:
+        return None
+    return _etag(order.id, order.status.value, order.updated_at.isoformat())
+
+
+def queue_etag(
+    tag: str,
+    limit: Optional[int],
+    after: Optional[str],
+    fields: Optional[Fields] = None,
+) -> str:
+    """ETag de uma página da fila: versão do índice mais os parâmetros da página."""
+    return _etag("queue", tag, limit, after, fields)
+
+
+def content_etag(body: bytes) -> str:
+    return _etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """Comparação fraca de ``If-None-Match`` (RFC 9110 13.1.2), aceitando lista e ``*``."""
+    if not if_none_match or etag is None:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+
+def not_modified(etag: str, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(status_code=304, headers={**(headers or {}), ETAG_HEADER: etag})
@@ -1,7 +1,10 @@
+from datetime import datetime
 from typing import Optional, List
 from pydantic import BaseModel
 
 from app.shared.enums.order_status import OrderStatus
+from app.shared.enums.outbox_status import OutboxStatus
+from app.shared.enums.payment_status import PaymentStatus
 
 
 class OrderItemIn(BaseModel):
@@ -35,4 +38,17 @@ class OrderOutQrCode(BaseModel):
     qr_code: Optional[str]
     status: OrderStatus
     items: List[OrderItemOut]
-    amount: float
\ No newline at end of file
+    amount: float
+
+class OrderPaymentOut(BaseModel):
+    order_id: int
+    # PENDING enquanto a cobrança não foi criada; FAILED quando as tentativas acabaram
+    status: OutboxStatus
+    qr_code: Optional[str]
+    attempts: int
+
+class PaymentWebhookIn(BaseModel):
+    order_id: int
+    status: PaymentStatus
+    # quando o serviço de pagamento observou a mudança (omitido = agora)
+    occurred_at: Optional[datetime] = None
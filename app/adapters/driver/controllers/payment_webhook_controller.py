@@ -0,0 +1,52 @@
+import hashlib
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+
+from app.adapters.driver.dependencias.container import get_record_payment_status_service
+from .order_schemas import PaymentWebhookIn
+from .service_runner import run_service
+
+router = APIRouter()
+
+# HMAC-SHA256 do corpo em hex no header abaixo. Sem segredo configurado o
+# webhook fica fechado (503); aceitar eventos sem assinatura só com o opt-out
+# explícito, para ambiente local
+PAYMENT_WEBHOOK_SECRET = os.getenv("PAYMENT_WEBHOOK_SECRET")
+PAYMENT_WEBHOOK_ALLOW_UNSIGNED = (
+    os.getenv("PAYMENT_WEBHOOK_ALLOW_UNSIGNED", "false").lower() == "true"
+)
+SIGNATURE_HEADER = "X-Payment-Signature"
+
+
+@router.post(
+    "/payments/webhook",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Webhook de status de pagamento",
+    description="Recebe mudanças de status do serviço de pagamento e atualiza a projeção local "
+                "consultada na troca de status do pedido. Eventos fora de ordem são ignorados.",
+)
+async def payment_webhook(
+    payload: PaymentWebhookIn,
+    request: Request,
+    signature: str | None = Header(default=None, alias=SIGNATURE_HEADER),
+    service=Depends(get_record_payment_status_service),
+):
+    if PAYMENT_WEBHOOK_SECRET:
+        if not _valid_signature(await request.body(), signature):
+            raise HTTPException(status_code=401, detail="Assinatura inválida")
+    elif not PAYMENT_WEBHOOK_ALLOW_UNSIGNED:
+        raise HTTPException(status_code=503, detail="Webhook de pagamento sem segredo configurado")
+    try:
+        await run_service(service.execute, payload.order_id, payload.status, payload.occurred_at)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+def _valid_signature(body: bytes, signature: str | None) -> bool:
+    if not signature:
+        return False
+    expected = hmac.new(PAYMENT_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.removeprefix("sha256="))
@@ -0,0 +1,10 @@
+import inspect
+
+from fastapi.concurrency import run_in_threadpool
+
+
+async def run_service(fn, *args, **kwargs):
+    """Serviços assíncronos são aguardados; os síncronos vão para o threadpool."""
+    if inspect.iscoroutinefunction(fn):
+        return await fn(*args, **kwargs)
+    return await run_in_threadpool(fn, *args, **kwargs)
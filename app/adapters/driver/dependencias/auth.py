@@ -1,7 +1,7 @@
 from typing import Optional
 
 from fastapi import Depends, HTTPException,Header
-from app.shared.handles.jwt_user import verify_jwt
+from app.shared.handlers.jwt_user import verify_jwt
 from fastapi.security import HTTPBearer
 
 security = HTTPBearer()  # Define o esquema de segurança Bearer
@@ -0,0 +1,624 @@
+import importlib.util
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Optional
+
+import httpx
+import requests
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from requests.adapters import HTTPAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.adapters.driven.gateways.cached_product_catalog import (
+    AsyncCachedProductCatalogGateway,
+    CachedProductCatalogGateway,
+)
+from app.adapters.driven.gateways.customer_auth_http import AsyncCustomerAuthHttp, CustomerAuthHttp
+from app.adapters.driven.gateways.customer_auth_jwt import (
+    AsyncLocalJwtCustomerAuth,
+    LocalJwtCustomerAuth,
+)
+from app.adapters.driven.gateways.payment_status_http import AsyncPaymentGatewayHttp, PaymentGatewayHttp
+from app.adapters.driven.gateways.product_catalog_gateway import (
+    AsyncProductCatalogGateway,
+    ProductCatalogGateway,
+)
+from app.adapters.driven.repositories.idempotency import IdempotencyRepository
+from app.adapters.driven.repositories.idempotency_async import AsyncIdempotencyRepository
+from app.adapters.driven.repositories.order import OrderRepository
+from app.adapters.driven.repositories.order_async import AsyncOrderRepository
+from app.adapters.driven.repositories.order_payment import OrderPaymentRepository
+from app.adapters.driven.repositories.order_payment_async import AsyncOrderPaymentRepository
+from app.adapters.driven.repositories.payment_outbox import PaymentOutboxRepository
+from app.adapters.driven.repositories.payment_outbox_async import AsyncPaymentOutboxRepository
+from app.adapters.driver.workers.idempotency import IdempotencyKeyPurger
+from app.adapters.driver.workers.kitchen_queue import KitchenQueueReconciler
+from app.adapters.driver.workers.payment_outbox import PaymentOutboxDispatcher
+from app.adapters.driver.workers.payment_projection import PaymentProjectionReconciler
+from app.adapters.driver.workers.replica_lag import ReplicaLagProbe
+from app.domain.services.create_order_service import AsyncCreateOrderService, CreateOrderService
+from app.domain.services.idempotency_service import AsyncIdempotentRequests, IdempotentRequests
+from app.domain.services.kitchen_queue_feed import KitchenQueueFeed
+from app.domain.services.kitchen_queue_index import KitchenQueueIndex
+from app.domain.services.list_order_service import (
+    AsyncGetOrderByIdService,
+    AsyncListOrdersService,
+    GetOrderByIdService,
+    ListOrdersService,
+)
+from app.domain.services.payment_status_service import (
+    AsyncRecordPaymentStatusService,
+    RecordPaymentStatusService,
+)
+from app.domain.services.update_order_service import (
+    AsyncUpdateOrderStatusService,
+    UpdateOrderStatusService,
+)
+from app.shared import metrics
+from app.shared.broadcast import BroadcastHub
+from app.shared.cache.ttl_lru import TTLCache
+from app.shared.handlers.jwt_user import JWKS_URL, build_verifier, jwks_fetcher
+from app.shared.resilience import (
+    AdmissionController,
+    Bulkhead,
+    CircuitBreaker,
+    Resilience,
+    RetryPolicy,
+    RouteBudget,
+)
+from database import (
+    DB_READ_HOST,
+    DB_REPLICA_LAG_CHECK_INTERVAL,
+    get_async_db_session,
+    get_async_read_db_session,
+    get_db_session,
+    get_read_db_session,
+    replica_monitor,
+)
+
+logger = logging.getLogger(__name__)
+
+# sync (padrão): repositório/gateways bloqueantes rodando no threadpool do anyio.
+# async: AsyncSession + httpx.AsyncClient direto no event loop.
+ASYNC_IO = os.getenv("ORDER_IO_MODE", "sync").lower() == "async"
+
+# Clientes HTTP de saída (pagamento, clientes e catálogo)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+# threads para buscar produtos em paralelo no modo sync (0 = sequencial); também
+# usadas no fallback item a item de reserve_many e na renovação do cache
+CATALOG_FANOUT_WORKERS = int(os.getenv("CATALOG_FANOUT_WORKERS", "16"))
+
+# Orçamento de tempo de cada requisição para todas as suas chamadas de saída
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "10"))
+# Resiliência das chamadas de saída. Cada valor pode ser sobrescrito por
+# dependência com o prefixo CATALOG_, PAYMENT_ ou CUSTOMER_ (ex.: PAYMENT_MAX_CONCURRENT).
+RETRY_ATTEMPTS = int(os.getenv("RETRY_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.05"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "1"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "30"))
+MAX_CONCURRENT = int(os.getenv("MAX_CONCURRENT", "20"))
+BULKHEAD_MAX_WAIT_SECONDS = float(os.getenv("BULKHEAD_MAX_WAIT_SECONDS", "0.5"))
+# GETs mais lentos que isso ganham uma segunda cópia (0 = sem hedge)
+HEDGE_AFTER_SECONDS = float(os.getenv("HEDGE_AFTER_SECONDS", "0.3"))
+HEDGE_WORKERS = int(os.getenv("HEDGE_WORKERS", "8"))
+DEPENDENCIES = ("catalog", "payment", "customer")
+
+# Controle de admissão das requisições (503 + Retry-After em vez de fila sem
+# fim). As classes dividem ADMISSION_MAX_CONCURRENT vagas, em geral o tamanho
+# do threadpool; cada uma tem seu limite e espera máxima, sobrescritos por
+# classe com ADMISSION_STATUS_, ADMISSION_CREATE_, ADMISSION_READ_ ou
+# ADMISSION_EXPORT_ (ex.: ADMISSION_READ_MAX_CONCURRENT). Atualizações de status
+# passam na frente; exportações (longas) ficam com poucas vagas e por último.
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "40"))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "0.5"))
+# classe -> (limite de concorrência padrão, prioridade)
+ADMISSION_CLASSES = {"status": (16, 0), "create": (16, 1), "read": (24, 2), "export": (2, 3)}
+
+# Cache de produtos do catálogo (nome/preço; estoque é sempre validado na reserva)
+CATALOG_CACHE_ENABLED = os.getenv("CATALOG_CACHE_ENABLED", "true").lower() == "true"
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", "5000"))
+CATALOG_CACHE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL_SECONDS", "300"))
+CATALOG_CACHE_STALE_SECONDS = float(os.getenv("CATALOG_CACHE_STALE_SECONDS", "3600"))
+CATALOG_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+CATALOG_CACHE_WARM_UP = os.getenv("CATALOG_CACHE_WARM_UP", "true").lower() == "true"
+
+# Validação local de tokens (SECRET_KEY ou JWKS_URL em jwt_user); sem chave
+# configurada todo token vai ao serviço de clientes
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+# teto para JWTs (que valem até o exp) e TTL dos tokens opacos
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "300"))
+AUTH_OPAQUE_TTL_SECONDS = float(os.getenv("AUTH_OPAQUE_TTL_SECONDS", "60"))
+AUTH_NEGATIVE_TTL_SECONDS = float(os.getenv("AUTH_NEGATIVE_TTL_SECONDS", "10"))
+
+# Projeção local do status de pagamento (webhook + reconciliação periódica)
+PAYMENT_PROJECTION_MAX_AGE_SECONDS = float(os.getenv("PAYMENT_PROJECTION_MAX_AGE_SECONDS", "10"))
+PAYMENT_RECONCILE_ENABLED = os.getenv("PAYMENT_RECONCILE_ENABLED", "true").lower() == "true"
+PAYMENT_RECONCILE_SECONDS = float(os.getenv("PAYMENT_RECONCILE_SECONDS", "30"))
+PAYMENT_RECONCILE_BATCH_SIZE = int(os.getenv("PAYMENT_RECONCILE_BATCH_SIZE", "100"))
+
+# Outbox de pagamentos: a cobrança é gravada com o pedido e criada em segundo
+# plano. O POST /orders espera o QR code até PAYMENT_OUTBOX_WAIT_SECONDS
+# (0 = não espera); falhas voltam com backoff até PAYMENT_OUTBOX_MAX_ATTEMPTS.
+# No modo sync as cobranças de um lote saem em paralelo em até
+# PAYMENT_OUTBOX_WORKERS threads próprias (0 = uma de cada vez). A entrega é
+# at-least-once: o gateway recebe a Idempotency-Key do pedido e não cobra duas
+# vezes. Desligado, a cobrança volta a ser criada na própria requisição.
+PAYMENT_OUTBOX_ENABLED = os.getenv("PAYMENT_OUTBOX_ENABLED", "true").lower() == "true"
+PAYMENT_OUTBOX_WAIT_SECONDS = float(os.getenv("PAYMENT_OUTBOX_WAIT_SECONDS", "2"))
+PAYMENT_OUTBOX_POLL_SECONDS = float(os.getenv("PAYMENT_OUTBOX_POLL_SECONDS", "5"))
+PAYMENT_OUTBOX_BATCH_SIZE = int(os.getenv("PAYMENT_OUTBOX_BATCH_SIZE", "50"))
+PAYMENT_OUTBOX_WORKERS = int(os.getenv("PAYMENT_OUTBOX_WORKERS", "8"))
+# maior que o timeout do gateway: uma tentativa em curso não é pega de novo
+PAYMENT_OUTBOX_LEASE_SECONDS = float(os.getenv("PAYMENT_OUTBOX_LEASE_SECONDS", "30"))
+PAYMENT_OUTBOX_MAX_ATTEMPTS = int(os.getenv("PAYMENT_OUTBOX_MAX_ATTEMPTS", "10"))
+PAYMENT_OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("PAYMENT_OUTBOX_RETRY_BASE_SECONDS", "1"))
+PAYMENT_OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("PAYMENT_OUTBOX_RETRY_MAX_SECONDS", "300"))
+
+# Idempotency-Key do POST /orders: respostas guardadas por ``TTL``; repetições
+# esperam a execução original até ``WAIT`` segundos; passado o ``LOCK`` uma
+# execução que não terminou é considerada abandonada
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "30"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "5"))
+IDEMPOTENCY_PURGE_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_SECONDS", "600"))
+IDEMPOTENCY_PURGE_BATCH_SIZE = int(os.getenv("IDEMPOTENCY_PURGE_BATCH_SIZE", "1000"))
+
+KITCHEN_QUEUE_ENABLED = os.getenv("KITCHEN_QUEUE_ENABLED", "true").lower() == "true"
+KITCHEN_QUEUE_RECONCILE_SECONDS = float(os.getenv("KITCHEN_QUEUE_RECONCILE_SECONDS", "15"))
+# Push da fila (SSE/WebSocket): mensagens pendentes por tela antes de ela ser
+# ressincronizada com um snapshot, e conexões simultâneas por instância
+QUEUE_STREAM_BUFFER_SIZE = int(os.getenv("QUEUE_STREAM_BUFFER_SIZE", "256"))
+QUEUE_STREAM_MAX_SUBSCRIBERS = int(os.getenv("QUEUE_STREAM_MAX_SUBSCRIBERS", "1000"))
+QUEUE_STREAM_HEARTBEAT_SECONDS = float(os.getenv("QUEUE_STREAM_HEARTBEAT_SECONDS", "15"))
+
+
+def _http_client_options() -> dict:
+    # HTTP/2 depende do pacote opcional h2 (httpx[http2]); sem ele fica em HTTP/1.1
+    http2 = HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+    return dict(
+        timeout=HTTP_TIMEOUT,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def _setting(dependency: str, name: str, default, cast=float):
+    return cast(os.getenv(f"{dependency.upper()}_{name}", default))
+
+
+def _resilience(dependency: str, executor: Optional[ThreadPoolExecutor]) -> Resilience:
+    setting = partial(_setting, dependency)
+    hedge_after = setting("HEDGE_AFTER_SECONDS", HEDGE_AFTER_SECONDS)
+    return Resilience(
+        dependency,
+        timeout=setting("HTTP_TIMEOUT", HTTP_TIMEOUT),
+        retry=RetryPolicy(
+            attempts=setting("RETRY_ATTEMPTS", RETRY_ATTEMPTS, int),
+            base_delay=setting("RETRY_BASE_DELAY", RETRY_BASE_DELAY),
+            max_delay=setting("RETRY_MAX_DELAY", RETRY_MAX_DELAY),
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=setting("BREAKER_FAILURE_THRESHOLD", BREAKER_FAILURE_THRESHOLD, int),
+            reset_timeout=setting("BREAKER_RESET_SECONDS", BREAKER_RESET_SECONDS),
+        ),
+        bulkhead=Bulkhead(
+            setting("MAX_CONCURRENT", MAX_CONCURRENT, int),
+            max_wait=setting("BULKHEAD_MAX_WAIT_SECONDS", BULKHEAD_MAX_WAIT_SECONDS),
+        ),
+        hedge_after=hedge_after or None,
+        executor=executor,
+    )
+
+
+def _admission() -> AdmissionController:
+    budgets = {}
+    for name, (max_concurrent, priority) in ADMISSION_CLASSES.items():
+        setting = partial(_setting, f"admission_{name}")
+        budgets[name] = RouteBudget(
+            max_concurrent=setting("MAX_CONCURRENT", max_concurrent, int),
+            max_wait=setting("MAX_WAIT_SECONDS", ADMISSION_MAX_WAIT_SECONDS),
+            priority=priority,
+        )
+    return AdmissionController(budgets, ADMISSION_MAX_CONCURRENT)
+
+
+def _catalog_cache() -> TTLCache:
+    return TTLCache(
+        maxsize=CATALOG_CACHE_MAX_ENTRIES,
+        ttl=CATALOG_CACHE_TTL_SECONDS,
+        stale_ttl=CATALOG_CACHE_STALE_SECONDS,
+        negative_ttl=CATALOG_CACHE_NEGATIVE_TTL_SECONDS,
+    )
+
+
+def _auth_cache() -> TTLCache:
+    return TTLCache(
+        maxsize=AUTH_CACHE_MAX_ENTRIES,
+        ttl=AUTH_OPAQUE_TTL_SECONDS,
+        negative_ttl=AUTH_NEGATIVE_TTL_SECONDS,
+    )
+
+
+def _catalog_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_MAX_KEEPALIVE_CONNECTIONS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class Container:
+    """
+    Objetos com escopo de aplicação: clientes HTTP com pool de conexões, gateways
+    e a fila da cozinha. ``start``/``stop`` são chamados pelo lifespan do FastAPI;
+    os providers abaixo montam repositórios e serviços por requisição a partir daqui.
+    """
+
+    def __init__(self) -> None:
+        self.queue_hub = BroadcastHub(QUEUE_STREAM_BUFFER_SIZE, QUEUE_STREAM_MAX_SUBSCRIBERS)
+        self.kitchen_queue = KitchenQueueIndex(on_change=self.queue_hub.publish)
+        # criado antes do start: o middleware é montado junto com o app
+        self.admission: Optional[AdmissionController] = _admission() if ADMISSION_ENABLED else None
+        self.http_client: Optional[httpx.Client] = None
+        self.async_http_client: Optional[httpx.AsyncClient] = None
+        self.catalog_session: Optional[requests.Session] = None
+        self.catalog_executor: Optional[ThreadPoolExecutor] = None
+        self.hedge_executor: Optional[ThreadPoolExecutor] = None
+        self.payment_outbox_executor: Optional[ThreadPoolExecutor] = None
+        self.resilience: Dict[str, Resilience] = {}
+        self._flights: Dict[str, Any] = {}
+        self.catalog = None
+        self.payment_gateway = None
+        self.customer_auth = None
+        self.started = False
+        self._reconciler: Optional[KitchenQueueReconciler] = None
+        self._payment_reconciler: Optional[PaymentProjectionReconciler] = None
+        self._idempotency_purger: Optional[IdempotencyKeyPurger] = None
+        self._replica_probe: Optional[ReplicaLagProbe] = None
+        self.payment_outbox: Optional[PaymentOutboxDispatcher] = None
+
+    async def start(self) -> None:
+        payment_url = os.getenv("PAYMENT_SERVICE_URL", "")
+        customer_url = os.getenv("CUSTOMER_SERVICE_URL", "")
+
+        if not ASYNC_IO and HEDGE_WORKERS > 0:
+            # no modo sync a cópia do hedge precisa de uma thread própria
+            self.hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+        self.resilience = {name: _resilience(name, self.hedge_executor) for name in DEPENDENCIES}
+        metrics.register("resilience", self.resilience_stats)
+        policy = self.resilience
+
+        if ASYNC_IO:
+            self.async_http_client = httpx.AsyncClient(**_http_client_options())
+            self.catalog = AsyncProductCatalogGateway(self.async_http_client, policy["catalog"])
+            self.payment_gateway = AsyncPaymentGatewayHttp(
+                payment_url, self.async_http_client, policy["payment"]
+            )
+            self.customer_auth = AsyncCustomerAuthHttp(
+                customer_url, self.async_http_client, policy["customer"]
+            )
+        else:
+            self.http_client = httpx.Client(**_http_client_options())
+            self.catalog_session = _catalog_session()
+            if CATALOG_FANOUT_WORKERS > 0:
+                self.catalog_executor = ThreadPoolExecutor(
+                    max_workers=CATALOG_FANOUT_WORKERS, thread_name_prefix="catalog"
+                )
+            self.catalog = ProductCatalogGateway(
+                self.catalog_session, executor=self.catalog_executor, policy=policy["catalog"]
+            )
+            self.payment_gateway = PaymentGatewayHttp(payment_url, self.http_client, policy["payment"])
+            self.customer_auth = CustomerAuthHttp(customer_url, self.http_client, policy["customer"])
+
+        # antes do cache: ele envolve o gateway e esconde o atributo
+        self._flights = {"catalog": self.catalog.flights, "payment": self.payment_gateway.flights}
+        metrics.register("single_flight", self.single_flight_stats)
+
+        if CATALOG_CACHE_ENABLED:
+            await self._cache_catalog()
+        self._verify_tokens_locally()
+
+        if KITCHEN_QUEUE_ENABLED:
+            metrics.register("queue_stream", self.queue_hub.stats)
+            self._reconciler = KitchenQueueReconciler.for_mode(
+                self.kitchen_queue, KITCHEN_QUEUE_RECONCILE_SECONDS, ASYNC_IO
+            )
+            await self._reconciler.start()
+
+        if PAYMENT_RECONCILE_ENABLED:
+            self._payment_reconciler = PaymentProjectionReconciler.for_mode(
+                self.payment_gateway,
+                PAYMENT_RECONCILE_SECONDS,
+                PAYMENT_RECONCILE_BATCH_SIZE,
+                PAYMENT_PROJECTION_MAX_AGE_SECONDS,
+                ASYNC_IO,
+            )
+            metrics.register("payment_projection", self._payment_reconciler.stats)
+            await self._payment_reconciler.start()
+
+        if self.admission is not None:
+            metrics.register("admission", self.admission.stats)
+
+        if PAYMENT_OUTBOX_ENABLED:
+            if not ASYNC_IO and PAYMENT_OUTBOX_WORKERS > 0:
+                # fora do threadpool das requisições: quem espera o QR não disputa threads
+                self.payment_outbox_executor = ThreadPoolExecutor(
+                    max_workers=PAYMENT_OUTBOX_WORKERS, thread_name_prefix="payment-outbox"
+                )
+            self.payment_outbox = PaymentOutboxDispatcher.for_mode(
+                self.payment_gateway,
+                PAYMENT_OUTBOX_POLL_SECONDS,
+                PAYMENT_OUTBOX_BATCH_SIZE,
+                PAYMENT_OUTBOX_LEASE_SECONDS,
+                RetryPolicy(
+                    attempts=PAYMENT_OUTBOX_MAX_ATTEMPTS,
+                    base_delay=PAYMENT_OUTBOX_RETRY_BASE_SECONDS,
+                    max_delay=PAYMENT_OUTBOX_RETRY_MAX_SECONDS,
+                ),
+                ASYNC_IO,
+                self.payment_outbox_executor,
+            )
+            metrics.register("payment_outbox", self.payment_outbox.stats)
+            await self.payment_outbox.start()
+
+        if IDEMPOTENCY_PURGE_SECONDS > 0:
+            self._idempotency_purger = IdempotencyKeyPurger.for_mode(
+                IDEMPOTENCY_PURGE_SECONDS, IDEMPOTENCY_PURGE_BATCH_SIZE, ASYNC_IO
+            )
+            metrics.register("idempotency", self._idempotency_purger.stats)
+            await self._idempotency_purger.start()
+
+        if DB_READ_HOST:
+            self._replica_probe = ReplicaLagProbe.for_mode(
+                replica_monitor, DB_REPLICA_LAG_CHECK_INTERVAL, ASYNC_IO
+            )
+            metrics.register("replica_lag", self._replica_probe.stats)
+            await self._replica_probe.start()
+        self.started = True
+
+    async def _cache_catalog(self) -> None:
+        if ASYNC_IO:
+            self.catalog = AsyncCachedProductCatalogGateway(self.catalog, _catalog_cache())
+        else:
+            self.catalog = CachedProductCatalogGateway(
+                self.catalog, _catalog_cache(), self.catalog_executor
+            )
+        metrics.register("catalog_cache", self.catalog.stats)
+
+        if CATALOG_CACHE_WARM_UP:
+            try:
+                warm = self.catalog.warm_up
+                loaded = await (warm() if ASYNC_IO else run_in_threadpool(warm))
+                logger.info("Cache do catálogo aquecido com %s produtos", loaded)
+            except Exception:
+                # sem aquecimento o cache só enche sob demanda
+                logger.exception("Falha ao aquecer o cache do catálogo")
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        return {name: policy.stats() for name, policy in self.resilience.items()}
+
+    def single_flight_stats(self) -> Dict[str, Any]:
+        return {name: flights.stats() for name, flights in self._flights.items()}
+
+    def _verify_tokens_locally(self) -> None:
+        fetch = None
+        if JWKS_URL:
+            if self.http_client is None:
+                # a recarga do JWKS é síncrona (numa thread) também no modo async
+                self.http_client = httpx.Client(**_http_client_options())
+            fetch = jwks_fetcher(self.http_client, self.resilience["customer"])
+        verifier = build_verifier(fetch)
+        if verifier is None:
+            return
+        local = AsyncLocalJwtCustomerAuth if ASYNC_IO else LocalJwtCustomerAuth
+        self.customer_auth = local(
+            verifier, self.customer_auth, _auth_cache(), max_ttl=AUTH_CACHE_TTL_SECONDS
+        )
+        metrics.register("customer_auth", self.customer_auth.stats)
+
+    async def stop(self) -> None:
+        self.started = False
+        metrics.unregister("admission")
+        metrics.unregister("catalog_cache")
+        metrics.unregister("customer_auth")
+        metrics.unregister("idempotency")
+        metrics.unregister("payment_outbox")
+        metrics.unregister("payment_projection")
+        metrics.unregister("queue_stream")
+        metrics.unregister("replica_lag")
+        metrics.unregister("resilience")
+        metrics.unregister("single_flight")
+        # conexões de push abertas terminam aqui, senão o servidor espera por elas
+        self.queue_hub.close()
+        if self._reconciler is not None:
+            await self._reconciler.stop()
+            self._reconciler = None
+        if self._payment_reconciler is not None:
+            await self._payment_reconciler.stop()
+            self._payment_reconciler = None
+        if self._idempotency_purger is not None:
+            await self._idempotency_purger.stop()
+            self._idempotency_purger = None
+        if self._replica_probe is not None:
+            await self._replica_probe.stop()
+            self._replica_probe = None
+        # antes de fechar os clientes HTTP: um lote em curso é cancelado e a
+        # entrada volta ao fim do lease
+        if self.payment_outbox is not None:
+            await self.payment_outbox.stop()
+            self.payment_outbox = None
+        if self.payment_outbox_executor is not None:
+            self.payment_outbox_executor.shutdown(wait=True)
+            self.payment_outbox_executor = None
+        if self.async_http_client is not None:
+            await self.async_http_client.aclose()
+            self.async_http_client = None
+        if self.http_client is not None:
+            self.http_client.close()
+            self.http_client = None
+        if self.catalog_executor is not None:
+            self.catalog_executor.shutdown(wait=True)
+            self.catalog_executor = None
+        if self.hedge_executor is not None:
+            # cópias perdedoras ainda em voo terminam sozinhas pelo timeout
+            self.hedge_executor.shutdown(wait=False)
+            self.hedge_executor = None
+        if self.catalog_session is not None:
+            self.catalog_session.close()
+            self.catalog_session = None
+
+
+container = Container()
+
+
+def get_container() -> Container:
+    return container
+
+
+def _started_container() -> Container:
+    if not container.started:
+        raise RuntimeError("Container não iniciado: os gateways são criados no lifespan da aplicação")
+    return container
+
+
+# ------------------------------------------------------------------ repositórios
+def _sync_order_repository(db: Session = Depends(get_db_session)) -> OrderRepository:
+    return OrderRepository(db)
+
+
+async def _async_order_repository(
+    db: AsyncSession = Depends(get_async_db_session),
+) -> AsyncOrderRepository:
+    return AsyncOrderRepository(db)
+
+
+# leituras (listagens e GET por id) podem ir para a réplica; escritas sempre no primário
+def _sync_read_order_repository(db: Session = Depends(get_read_db_session)) -> OrderRepository:
+    return OrderRepository(db)
+
+
+async def _async_read_order_repository(
+    db: AsyncSession = Depends(get_async_read_db_session),
+) -> AsyncOrderRepository:
+    return AsyncOrderRepository(db)
+
+
+def _sync_idempotency_store(db: Session = Depends(get_db_session)) -> IdempotencyRepository:
+    return IdempotencyRepository(db)
+
+
+async def _async_idempotency_store(
+    db: AsyncSession = Depends(get_async_db_session),
+) -> AsyncIdempotencyRepository:
+    return AsyncIdempotencyRepository(db)
+
+
+def _sync_payment_projection(db: Session = Depends(get_db_session)) -> OrderPaymentRepository:
+    return OrderPaymentRepository(db)
+
+
+async def _async_payment_projection(
+    db: AsyncSession = Depends(get_async_db_session),
+) -> AsyncOrderPaymentRepository:
+    return AsyncOrderPaymentRepository(db)
+
+
+get_order_repository = _async_order_repository if ASYNC_IO else _sync_order_repository
+get_read_order_repository = (
+    _async_read_order_repository if ASYNC_IO else _sync_read_order_repository
+)
+get_idempotency_store = _async_idempotency_store if ASYNC_IO else _sync_idempotency_store
+
+
+# o QR code é lido no primário: logo após a criação a réplica pode não tê-lo
+def _sync_payment_outbox_store(db: Session = Depends(get_db_session)) -> PaymentOutboxRepository:
+    return PaymentOutboxRepository(db)
+
+
+async def _async_payment_outbox_store(
+    db: AsyncSession = Depends(get_async_db_session),
+) -> AsyncPaymentOutboxRepository:
+    return AsyncPaymentOutboxRepository(db)
+
+
+get_payment_outbox_store = _async_payment_outbox_store if ASYNC_IO else _sync_payment_outbox_store
+# a projeção é lida e escrita no primário: logo após um webhook a réplica pode estar atrasada
+get_payment_projection = _async_payment_projection if ASYNC_IO else _sync_payment_projection
+
+
+# ------------------------------------------------------------------ serviços
+def get_create_order_service(
+    repo=Depends(get_order_repository),
+    c: Container = Depends(_started_container),
+):
+    outbox = dict(payment_outbox=c.payment_outbox, payment_wait=PAYMENT_OUTBOX_WAIT_SECONDS)
+    if ASYNC_IO:
+        return AsyncCreateOrderService(
+            repo, c.catalog, c.payment_gateway, c.customer_auth, c.kitchen_queue, **outbox
+        )
+    return CreateOrderService(
+        repo,
+        c.catalog,
+        c.payment_gateway,
+        c.customer_auth,
+        c.kitchen_queue,
+        c.catalog_executor,
+        **outbox,
+    )
+
+
+def get_idempotent_requests(store=Depends(get_idempotency_store)):
+    service = AsyncIdempotentRequests if ASYNC_IO else IdempotentRequests
+    return service(
+        store,
+        ttl=IDEMPOTENCY_TTL_SECONDS,
+        lock=IDEMPOTENCY_LOCK_SECONDS,
+        wait=IDEMPOTENCY_WAIT_SECONDS,
+    )
+
+
+def get_update_order_status_service(
+    repo=Depends(get_order_repository),
+    payments=Depends(get_payment_projection),
+    c: Container = Depends(_started_container),
+):
+    service = AsyncUpdateOrderStatusService if ASYNC_IO else UpdateOrderStatusService
+    return service(
+        repo, c.payment_gateway, c.kitchen_queue, payments, PAYMENT_PROJECTION_MAX_AGE_SECONDS
+    )
+
+
+def get_record_payment_status_service(payments=Depends(get_payment_projection)):
+    service = AsyncRecordPaymentStatusService if ASYNC_IO else RecordPaymentStatusService
+    return service(payments)
+
+
+def get_list_orders_service(
+    repo=Depends(get_read_order_repository),
+    c: Container = Depends(get_container),
+):
+    service = AsyncListOrdersService if ASYNC_IO else ListOrdersService
+    return service(repo, c.kitchen_queue)
+
+
+def get_kitchen_queue_feed(c: Container = Depends(get_container)) -> KitchenQueueFeed:
+    return KitchenQueueFeed(c.kitchen_queue, c.queue_hub)
+
+
+def get_order_by_id_service(repo=Depends(get_read_order_repository)):
+    service = AsyncGetOrderByIdService if ASYNC_IO else GetOrderByIdService
+    return service(repo)
@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+import database
+from app.adapters.driven.repositories.idempotency import IdempotencyRepository
+from app.adapters.driven.repositories.idempotency_async import AsyncIdempotencyRepository
+from app.domain.services.payment_status_service import now_utc
+
+logger = logging.getLogger(__name__)
+
+
+def purge_expired_keys(batch_size: int) -> int:
+    db = database.SessionLocal()
+    try:
+        return IdempotencyRepository(db).purge_expired(now_utc(), batch_size)
+    finally:
+        db.close()
+
+
+async def purge_expired_keys_async(batch_size: int) -> int:
+    async with database.AsyncSessionLocal() as db:
+        return await AsyncIdempotencyRepository(db).purge_expired(now_utc(), batch_size)
+
+
+class IdempotencyKeyPurger:
+    """
+    Apaga Idempotency-Keys vencidas, até ``batch_size`` por rodada a cada
+    ``interval`` segundos. Chaves vencidas já não valem mesmo antes de
+    apagadas: uma nova reserva as reaproveita.
+    """
+
+    def __init__(self, interval: float, purge: Callable[[], Awaitable[int]]):
+        self.interval = interval
+        self.purge = purge
+        self.runs = 0
+        self.purged = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_mode(cls, interval: float, batch_size: int, async_io: bool) -> "IdempotencyKeyPurger":
+        if async_io:
+            return cls(interval, lambda: purge_expired_keys_async(batch_size))
+        return cls(interval, lambda: run_in_threadpool(purge_expired_keys, batch_size))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"runs": self.runs, "purged": self.purged}
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> bool:
+        try:
+            purged = await self.purge()
+        except Exception:
+            logger.exception("Falha ao apagar Idempotency-Keys vencidas")
+            return False
+        self.runs += 1
+        self.purged += purged
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+import database
+from app.adapters.driven.repositories.order import OrderRepository
+from app.adapters.driven.repositories.order_async import AsyncOrderRepository
+from app.domain.entities.order import Order
+from app.domain.services.kitchen_queue_index import KitchenQueueIndex
+
+logger = logging.getLogger(__name__)
+
+
+def load_active_orders() -> List[Order]:
+    # sempre no primário: uma réplica atrasada desfaria mudanças de outras instâncias
+    db = database.SessionLocal()
+    try:
+        return OrderRepository(db).find_active_sorted_orders()
+    finally:
+        db.close()
+
+
+async def load_active_orders_async() -> List[Order]:
+    async with database.AsyncSessionLocal() as db:
+        return await AsyncOrderRepository(db).find_active_sorted_orders()
+
+
+class KitchenQueueReconciler:
+    """
+    Carrega o índice da fila na subida e o reconcilia com o banco a cada
+    ``interval`` segundos. Cobre o que as atualizações incrementais não veem:
+    escritas feitas por outras instâncias ou direto no banco.
+    """
+
+    def __init__(
+        self,
+        index: KitchenQueueIndex,
+        interval: float,
+        load: Callable[[], Awaitable[List[Order]]],
+    ):
+        self.index = index
+        self.interval = interval
+        self.load = load
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_mode(cls, index: KitchenQueueIndex, interval: float, async_io: bool) -> "KitchenQueueReconciler":
+        if async_io:
+            return cls(index, interval, load_active_orders_async)
+        return cls(index, interval, lambda: run_in_threadpool(load_active_orders))
+
+    async def start(self) -> None:
+        await self.reconcile()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def reconcile(self) -> bool:
+        since = self.index.version
+        try:
+            orders = await self.load()
+        except Exception:
+            # mantém o último estado (ou o fallback para o banco, se nunca carregou)
+            logger.exception("Falha ao reconciliar a fila da cozinha")
+            return False
+        self.index.reload(orders, since)
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.reconcile()
@@ -0,0 +1,279 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import database
+from app.adapters.driven.repositories.payment_outbox import PaymentOutboxRepository
+from app.adapters.driven.repositories.payment_outbox_async import AsyncPaymentOutboxRepository
+from app.domain.entities.payment import PaymentOutboxEntry
+from app.domain.ports.payment_outbox_port import PaymentDispatcherPort
+from app.domain.ports.payment_status_port import AsyncPaymentGatewayPort, PaymentGatewayPort
+from app.domain.services.payment_status_service import now_utc
+from app.shared.concurrency import settle, settle_async
+from app.shared.resilience import RetryPolicy, remaining
+
+logger = logging.getLogger(__name__)
+
+# (pedido, QR code ou None se a tentativa falhou) de cada entrada de um lote
+Dispatched = List[Tuple[int, Optional[str]]]
+
+# QR codes recentes: quem começa a esperar depois do envio não perde a resposta
+RECENT_MAX_ENTRIES = 1024
+
+
+def dispatch_due_payments(
+    gateway: PaymentGatewayPort,
+    batch_size: int,
+    lease: float,
+    retry: RetryPolicy,
+    executor: Optional[Executor] = None,
+) -> Dispatched:
+    db = database.SessionLocal()
+    try:
+        repo = PaymentOutboxRepository(db)
+        now = now_utc()
+        entries = repo.claim_due(now, batch_size, now + timedelta(seconds=lease))
+        calls = [partial(gateway.create_payment, e.order_id, e.amount) for e in entries]
+        dispatched: Dispatched = []
+        for entry, (result, exc) in zip(entries, settle(executor, calls, stop_on_error=False)):
+            if exc is None:
+                repo.mark_sent(entry.order_id, result[0])
+                dispatched.append((entry.order_id, result[0]))
+            else:
+                repo.mark_failed(entry.order_id, _error(exc), _retry_at(entry, retry))
+                dispatched.append((entry.order_id, None))
+        return dispatched
+    finally:
+        db.close()
+
+
+async def dispatch_due_payments_async(
+    gateway: AsyncPaymentGatewayPort, batch_size: int, lease: float, retry: RetryPolicy
+) -> Dispatched:
+    async with database.AsyncSessionLocal() as db:
+        repo = AsyncPaymentOutboxRepository(db)
+        now = now_utc()
+        entries = await repo.claim_due(now, batch_size, now + timedelta(seconds=lease))
+        outcomes = await settle_async([gateway.create_payment(e.order_id, e.amount) for e in entries])
+        dispatched: Dispatched = []
+        for entry, (result, exc) in zip(entries, outcomes):
+            if exc is None:
+                await repo.mark_sent(entry.order_id, result[0])
+                dispatched.append((entry.order_id, result[0]))
+            else:
+                await repo.mark_failed(entry.order_id, _error(exc), _retry_at(entry, retry))
+                dispatched.append((entry.order_id, None))
+        return dispatched
+
+
+class PaymentOutboxDispatcher(PaymentDispatcherPort):
+    """
+    Drena o outbox de pagamentos: cria as cobranças pendentes em lotes de até
+    ``batch_size``, a cada ``interval`` segundos ou assim que um pedido novo
+    avisa por ``wait_for``. Falhas voltam com backoff até ``retry.attempts``
+    tentativas.
+
+    No modo sync cada lote roda na thread própria ``coordinator``, nunca no
+    threadpool das requisições: lá estão justamente os POST /orders bloqueados
+    em ``wait_for``, esperando por este lote.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        batch_size: int,
+        dispatch_batch: Callable[[], Awaitable[Dispatched]],
+        coordinator: Optional[Executor] = None,
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.dispatch_batch = dispatch_batch
+        self._coordinator = coordinator
+        self.runs = 0
+        self.sent = 0
+        self.failed = 0
+        self.waits = 0
+        self.wait_timeouts = 0
+        self._waiters: Dict[int, List[concurrent.futures.Future]] = {}
+        self._recent: "OrderedDict[int, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_mode(
+        cls,
+        gateway,
+        interval: float,
+        batch_size: int,
+        lease: float,
+        retry: RetryPolicy,
+        async_io: bool,
+        executor: Optional[Executor] = None,
+    ) -> "PaymentOutboxDispatcher":
+        if async_io:
+            return cls(
+                interval,
+                batch_size,
+                lambda: dispatch_due_payments_async(gateway, batch_size, lease, retry),
+            )
+        coordinator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="payment-outbox-batch")
+        batch = partial(dispatch_due_payments, gateway, batch_size, lease, retry, executor)
+        return cls(
+            interval,
+            batch_size,
+            lambda: asyncio.get_running_loop().run_in_executor(coordinator, batch),
+            coordinator,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "sent": self.sent,
+            "failed": self.failed,
+            "waits": self.waits,
+            "wait_timeouts": self.wait_timeouts,
+        }
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+        if self._coordinator is not None:
+            # um lote em curso termina sozinho; a entrada volta ao fim do lease se cair
+            self._coordinator.shutdown(wait=False)
+            self._coordinator = None
+
+    # ---------------------------------------------------------- espera do QR
+    def wait_for(self, order_id: int, timeout: float) -> Optional[str]:
+        """Chamado de uma thread do pool, depois do commit do pedido."""
+        waiter = self._register(order_id)
+        if waiter.done():
+            return waiter.result()
+        try:
+            return waiter.result(self._bounded(timeout))
+        except concurrent.futures.TimeoutError:
+            self.wait_timeouts += 1
+            return None
+        finally:
+            self._unregister(order_id, waiter)
+
+    async def wait_for_async(self, order_id: int, timeout: float) -> Optional[str]:
+        waiter = self._register(order_id)
+        if waiter.done():
+            return waiter.result()
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(waiter), self._bounded(timeout))
+        except asyncio.TimeoutError:
+            self.wait_timeouts += 1
+            return None
+        finally:
+            self._unregister(order_id, waiter)
+
+    def _register(self, order_id: int) -> concurrent.futures.Future:
+        waiter: concurrent.futures.Future = concurrent.futures.Future()
+        with self._lock:
+            self.waits += 1
+            if order_id in self._recent:
+                waiter.set_result(self._recent[order_id])
+                return waiter
+            if self._loop is None:
+                # dispatcher parado: a cobrança sai quando alguém drenar o outbox
+                waiter.set_result(None)
+                return waiter
+            self._waiters.setdefault(order_id, []).append(waiter)
+        self._notify()
+        return waiter
+
+    def _unregister(self, order_id: int, waiter: concurrent.futures.Future) -> None:
+        with self._lock:
+            waiters = self._waiters.get(order_id)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiters[order_id]
+
+    def _notify(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except (AttributeError, RuntimeError):
+            pass  # parado no meio do caminho: a espera termina pelo timeout
+
+    @staticmethod
+    def _bounded(timeout: float) -> float:
+        left = remaining()
+        return max(0.0, timeout if left is None else min(timeout, left))
+
+    # ---------------------------------------------------------------- drenagem
+    async def drain(self) -> bool:
+        """Lotes seguidos enquanto vierem cheios. False se uma rodada falhou."""
+        while True:
+            try:
+                dispatched = await self.dispatch_batch()
+            except Exception:
+                logger.exception("Falha ao drenar o outbox de pagamentos")
+                return False
+            self.runs += 1
+            self._resolve(dispatched)
+            if len(dispatched) < self.batch_size:
+                return True
+
+    def _resolve(self, dispatched: Dispatched) -> None:
+        with self._lock:
+            for order_id, qr_code in dispatched:
+                if qr_code is None:
+                    self.failed += 1
+                    _log_failure(order_id)
+                else:
+                    self.sent += 1
+                    self._recent[order_id] = qr_code
+                    if len(self._recent) > RECENT_MAX_ENTRIES:
+                        self._recent.popitem(last=False)
+                # falha: quem espera segue sem QR; a cobrança sai numa próxima tentativa
+                for waiter in self._waiters.pop(order_id, []):
+                    if not waiter.done():
+                        waiter.set_result(qr_code)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            await self.drain()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+def _retry_at(entry: PaymentOutboxEntry, retry: RetryPolicy):
+    if entry.attempts >= retry.attempts:
+        logger.error(
+            "Cobrança do pedido %s não criada após %s tentativas", entry.order_id, entry.attempts
+        )
+        return None
+    return now_utc() + timedelta(seconds=retry.backoff(entry.attempts))
+
+
+def _error(exc: BaseException) -> str:
+    return f"{type(exc).__name__}: {exc}"
+
+
+def _log_failure(order_id: int) -> None:
+    # o erro fica em last_error; a entrada volta com backoff ou vira FAILED
+    logger.warning("Falha ao criar a cobrança do pedido %s", order_id)
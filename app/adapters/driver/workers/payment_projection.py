@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from datetime import timedelta
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+import database
+from app.adapters.driven.repositories.order_payment import OrderPaymentRepository
+from app.adapters.driven.repositories.order_payment_async import AsyncOrderPaymentRepository
+from app.domain.ports.payment_status_port import AsyncPaymentGatewayPort, PaymentGatewayPort
+from app.domain.services.payment_status_service import now_utc
+from app.shared.concurrency import settle, settle_async
+from app.shared.enums.payment_source import PaymentSource
+
+logger = logging.getLogger(__name__)
+
+# (sincronizados, falhas) de uma rodada
+Synced = Tuple[int, int]
+
+
+def sync_pending_payments(
+    gateway: PaymentGatewayPort,
+    batch_size: int,
+    max_age: float,
+    executor: Optional[Executor] = None,
+) -> Synced:
+    db = database.SessionLocal()
+    try:
+        repo = OrderPaymentRepository(db)
+        order_ids = repo.pending_order_ids(batch_size, now_utc() - timedelta(seconds=max_age))
+        calls = [partial(gateway.get_status, order_id) for order_id in order_ids]
+        synced = failed = 0
+        for order_id, (status, exc) in zip(order_ids, settle(executor, calls, stop_on_error=False)):
+            if exc is None and _record(repo, order_id, status):
+                synced += 1
+            else:
+                failed += 1
+                _log_failure(order_id, exc)
+        return synced, failed
+    finally:
+        db.close()
+
+
+async def sync_pending_payments_async(
+    gateway: AsyncPaymentGatewayPort, batch_size: int, max_age: float
+) -> Synced:
+    async with database.AsyncSessionLocal() as db:
+        repo = AsyncOrderPaymentRepository(db)
+        order_ids = await repo.pending_order_ids(batch_size, now_utc() - timedelta(seconds=max_age))
+        outcomes = await settle_async([gateway.get_status(order_id) for order_id in order_ids])
+        synced = failed = 0
+        for order_id, (status, exc) in zip(order_ids, outcomes):
+            if exc is None and await _record_async(repo, order_id, status):
+                synced += 1
+            else:
+                failed += 1
+                _log_failure(order_id, exc)
+        return synced, failed
+
+
+class PaymentProjectionReconciler:
+    """
+    Preenche a projeção de pagamento dos pedidos RECEIVED que não receberam
+    webhook (ou cujo PENDING envelheceu), ``batch_size`` pedidos a cada
+    ``interval`` segundos.
+    """
+
+    def __init__(self, interval: float, sync_batch: Callable[[], Awaitable[Synced]]):
+        self.interval = interval
+        self.sync_batch = sync_batch
+        self.runs = 0
+        self.synced = 0
+        self.failed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_mode(
+        cls,
+        gateway,
+        interval: float,
+        batch_size: int,
+        max_age: float,
+        async_io: bool,
+        executor: Optional[Executor] = None,
+    ) -> "PaymentProjectionReconciler":
+        if async_io:
+            return cls(interval, lambda: sync_pending_payments_async(gateway, batch_size, max_age))
+        return cls(
+            interval,
+            lambda: run_in_threadpool(sync_pending_payments, gateway, batch_size, max_age, executor),
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"runs": self.runs, "synced": self.synced, "failed": self.failed}
+
+    async def start(self) -> None:
+        # a primeira rodada não segura a subida da aplicação
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def reconcile(self) -> bool:
+        try:
+            synced, failed = await self.sync_batch()
+        except Exception:
+            logger.exception("Falha ao reconciliar a projeção de pagamentos")
+            return False
+        self.runs += 1
+        self.synced += synced
+        self.failed += failed
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            await self.reconcile()
+            await asyncio.sleep(self.interval)
+
+
+def _record(repo: OrderPaymentRepository, order_id: int, status) -> bool:
+    try:
+        repo.record(order_id, status, now_utc(), PaymentSource.POLL)
+        return True
+    except Exception:
+        repo.db.rollback()
+        return False
+
+
+async def _record_async(repo: AsyncOrderPaymentRepository, order_id: int, status) -> bool:
+    try:
+        await repo.record(order_id, status, now_utc(), PaymentSource.POLL)
+        return True
+    except Exception:
+        await repo.db.rollback()
+        return False
+
+
+def _log_failure(order_id: int, exc: Optional[BaseException]) -> None:
+    # segue com o resto do lote; o pedido volta na próxima rodada
+    logger.warning("Não foi possível sincronizar o pagamento do pedido %s: %s", order_id, exc)
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import database
+from database import ReplicaLagMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaLagProbe:
+    """
+    Mede o atraso da réplica de leitura a cada ``interval`` segundos e guarda o
+    resultado no ``monitor``, que as requisições só consultam. Com a réplica
+    fora do ar quem espera o connect timeout é esta tarefa, não uma leitura.
+    """
+
+    def __init__(self, monitor: ReplicaLagMonitor, interval: float, check: Callable[[], Awaitable[bool]]):
+        self.monitor = monitor
+        self.interval = interval
+        self.check = check
+        self.checks = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def for_mode(cls, monitor: ReplicaLagMonitor, interval: float, async_io: bool) -> "ReplicaLagProbe":
+        if async_io:
+            return cls(monitor, interval, lambda: monitor.check_async(database.async_read_engine))
+        # thread do executor padrão do loop, não do threadpool das requisições
+        return cls(monitor, interval, lambda: asyncio.to_thread(monitor.check, database.read_engine))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"checks": self.checks, "healthy": self.monitor.healthy(), "lag": self.monitor.lag}
+
+    async def start(self) -> None:
+        # sem esperar a primeira medição: até lá as leituras vão para o primário
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> bool:
+        try:
+            await self.check()
+        except Exception:
+            logger.exception("Falha ao medir o atraso da réplica")
+            return False
+        self.checks += 1
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.shared.enums.idempotency_status import IdempotencyStatus
+
+
+@dataclass
+class StoredResponse:
+    """Resposta já serializada, devolvida igual a cada repetição da requisição."""
+
+    status_code: int
+    body: bytes
+
+
+@dataclass
+class IdempotencyRecord:
+    key: str
+    fingerprint: str
+    status: IdempotencyStatus
+    locked_until: datetime
+    expires_at: datetime
+    response: Optional[StoredResponse] = None
+    order_id: Optional[int] = None
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Optional, List
 from app.domain.entities.item import OrderItem
 from app.shared.enums.order_status import OrderStatus
@@ -12,4 +13,6 @@ class Order:
     # coupon_hash: Optional[str] = None
     # coupon_id: Optional[int] = None
     items: List[OrderItem] = field(default_factory=list)
-    amount: Optional[float] = 0.0
\ No newline at end of file
+    amount: Optional[float] = 0.0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
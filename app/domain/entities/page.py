@@ -0,0 +1,10 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from app.domain.entities.order import Order
+
+
+@dataclass
+class Page:
+    items: List[Order] = field(default_factory=list)
+    next_cursor: Optional[str] = None
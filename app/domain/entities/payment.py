@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.shared.enums.outbox_status import OutboxStatus
+from app.shared.enums.payment_status import PaymentStatus
+
+
+@dataclass
+class PaymentProjection:
+    """Último status de pagamento conhecido localmente para um pedido."""
+
+    order_id: int
+    status: PaymentStatus
+    # quando o serviço de pagamento observou o status (webhook) ou quando o consultamos
+    event_at: Optional[datetime] = None
+    synced_at: Optional[datetime] = None
+
+    def fresh(self, max_age: float, now: datetime) -> bool:
+        # PAID/FAILED/CANCELED só mudam por um novo webhook; PENDING vence rápido
+        if self.status is not PaymentStatus.PENDING:
+            return True
+        if self.synced_at is None:
+            return False
+        return now - as_utc(self.synced_at) <= timedelta(seconds=max_age)
+
+
+@dataclass
+class PaymentOutboxEntry:
+    """Cobrança a criar no serviço de pagamento, gravada junto com o pedido."""
+
+    order_id: int
+    amount: float
+    status: OutboxStatus = OutboxStatus.PENDING
+    attempts: int = 0
+    qr_code: Optional[str] = None
+    last_error: Optional[str] = None
+
+
+def as_utc(value: datetime) -> datetime:
+    # o SQLite devolve datetimes sem fuso; tudo aqui é gravado em UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -3,4 +3,10 @@ from abc import ABC, abstractmethod
 class CustomerAuthPort(ABC):
     @abstractmethod
     def verify_token(self, token: str) -> int:
-        """Retorna o ID do cliente se válido. Lança ValueError se inválido."""
\ No newline at end of file
+        """Retorna o ID do cliente se válido. Lança ValueError se inválido."""
+
+
+class AsyncCustomerAuthPort(ABC):
+    @abstractmethod
+    async def verify_token(self, token: str) -> int:
+        """Retorna o ID do cliente se válido. Lança ValueError se inválido."""
@@ -0,0 +1,64 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+from app.domain.entities.idempotency import IdempotencyRecord, StoredResponse
+
+
+class IdempotencyStorePort(ABC):
+    @abstractmethod
+    def claim(
+        self,
+        key: str,
+        fingerprint: str,
+        now: datetime,
+        locked_until: datetime,
+        expires_at: datetime,
+    ) -> Optional[IdempotencyRecord]:
+        """
+        Reserva a chave (IN_PROGRESS até ``locked_until``). Retorna None se a
+        reserva é de quem chamou; senão o registro existente. Chaves vencidas e
+        reservas abandonadas (lock vencido, mesmo corpo) podem ser retomadas,
+        exceto as que já criaram um pedido (``order_id``).
+        """
+
+    @abstractmethod
+    def find(self, key: str) -> Optional[IdempotencyRecord]: ...
+
+    @abstractmethod
+    def complete(self, key: str, response: StoredResponse) -> None: ...
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """
+        Desfaz a reserva de uma execução que falhou: a próxima tentativa executa
+        de novo. Reservas que já criaram o pedido ficam para ser respondidas a
+        partir dele.
+        """
+
+    @abstractmethod
+    def purge_expired(self, now: datetime, limit: int) -> int: ...
+
+
+class AsyncIdempotencyStorePort(ABC):
+    @abstractmethod
+    async def claim(
+        self,
+        key: str,
+        fingerprint: str,
+        now: datetime,
+        locked_until: datetime,
+        expires_at: datetime,
+    ) -> Optional[IdempotencyRecord]: ...
+
+    @abstractmethod
+    async def find(self, key: str) -> Optional[IdempotencyRecord]: ...
+
+    @abstractmethod
+    async def complete(self, key: str, response: StoredResponse) -> None: ...
+
+    @abstractmethod
+    async def release(self, key: str) -> None: ...
+
+    @abstractmethod
+    async def purge_expired(self, now: datetime, limit: int) -> int: ...
@@ -1,20 +1,135 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, List, Optional, Tuple
+
 from app.domain.entities.order import Order
-from app.shared.enums.order_status import OrderStatus
+from app.domain.entities.page import Page
+from app.shared.enums.order_status import OrderStatus, queue_priority
+from app.shared.handlers.cursor import decode_cursor, encode_cursor
 
 class OrderRepositoryPort(ABC):
+    # Leituras de listagem aceitam ``with_items=False``: os pedidos voltam com
+    # ``items`` vazio e as implementações em banco nem consultam order_items.
+    # ``create(..., with_payment=True)`` grava também a entrada do outbox de
+    # pagamento, na mesma transação do pedido.
     @abstractmethod
-    def create(self, order: Order) -> Order: ...
+    def create(
+        self, order: Order, with_payment: bool = False, idempotency_key: Optional[str] = None
+    ) -> Order: ...
     @abstractmethod
     def find_by_id(self, order_id: int) -> Optional[Order]: ...
     @abstractmethod
-    def find_all(self, status: Optional[OrderStatus]) -> List[Order]: ...
+    def find_all(self, status: Optional[OrderStatus], with_items: bool = True) -> List[Order]: ...
     @abstractmethod
-    def find_active_sorted_orders(self) -> List[Order]: ...
+    def find_active_sorted_orders(self, with_items: bool = True) -> List[Order]: ...
     @abstractmethod
     def find_by_client(self, client_id: int) -> List[Order]: ...
     @abstractmethod
     def update(self, order: Order) -> Order: ...
     @abstractmethod
     def delete(self, order_id: int) -> None: ...
+
+    def update_status(
+        self,
+        order_id: int,
+        expected_status: OrderStatus,
+        new_status: OrderStatus,
+    ) -> Optional[Order]:
+        """
+        Troca o status somente se o pedido ainda estiver em ``expected_status``.
+        Retorna o pedido atualizado ou None se ele não existe ou mudou no meio do caminho.
+        """
+        order = self.find_by_id(order_id)
+        if order is None or order.status != expected_status:
+            return None
+        order.status = new_status
+        return self.update(order)
+
+    def find_header(self, order_id: int) -> Optional[Order]:
+        """
+        Pedido sem os itens (só as colunas de ``orders``), para checar a versão
+        antes de uma leitura completa. O padrão carrega o pedido inteiro.
+        """
+        return self.find_by_id(order_id)
+
+    # Paginação por cursor (keyset). As implementações em banco devem sobrescrever
+    # para empurrar o filtro ao SQL; o padrão abaixo pagina em memória.
+    def find_page(
+        self,
+        status: Optional[OrderStatus],
+        limit: int,
+        after: Optional[str] = None,
+        with_items: bool = True,
+    ) -> Page:
+        orders = sorted(self.find_all(status=status, with_items=with_items), key=lambda o: o.id)
+        return _slice_page(orders, limit, after, lambda o: (o.id,), size=1)
+
+    def find_active_sorted_page(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        with_items: bool = True,
+    ) -> Page:
+        orders = self.find_active_sorted_orders(with_items=with_items)
+        return _slice_page(
+            orders, limit, after, lambda o: (queue_priority(o.status), o.id), size=2
+        )
+
+
+class AsyncOrderRepositoryPort(ABC):
+    """Contrato do repositório para o caminho assíncrono (ORDER_IO_MODE=async)."""
+
+    @abstractmethod
+    async def create(
+        self, order: Order, with_payment: bool = False, idempotency_key: Optional[str] = None
+    ) -> Order: ...
+    @abstractmethod
+    async def find_by_id(self, order_id: int) -> Optional[Order]: ...
+    @abstractmethod
+    async def find_all(self, status: Optional[OrderStatus], with_items: bool = True) -> List[Order]: ...
+    @abstractmethod
+    async def find_active_sorted_orders(self, with_items: bool = True) -> List[Order]: ...
+    @abstractmethod
+    async def find_by_client(self, client_id: int) -> List[Order]: ...
+    @abstractmethod
+    async def update(self, order: Order) -> Order: ...
+    @abstractmethod
+    async def update_status(
+        self, order_id: int, expected_status: OrderStatus, new_status: OrderStatus
+    ) -> Optional[Order]: ...
+    @abstractmethod
+    async def delete(self, order_id: int) -> None: ...
+    @abstractmethod
+    async def find_page(
+        self,
+        status: Optional[OrderStatus],
+        limit: int,
+        after: Optional[str] = None,
+        with_items: bool = True,
+    ) -> Page: ...
+    @abstractmethod
+    async def find_active_sorted_page(
+        self, limit: int, after: Optional[str] = None, with_items: bool = True
+    ) -> Page: ...
+
+    async def find_header(self, order_id: int) -> Optional[Order]:
+        return await self.find_by_id(order_id)
+
+
+def _slice_page(
+    orders: List[Order],
+    limit: int,
+    after: Optional[str],
+    key: Callable[[Order], Tuple],
+    size: int,
+) -> Page:
+    if after is not None:
+        last = decode_cursor(after, size)
+        orders = [o for o in orders if key(o) > last]
+    return page_from_rows(orders, limit, key)
+
+
+def page_from_rows(rows: List[Order], limit: int, key: Callable[[Order], Tuple]) -> Page:
+    """Monta a página a partir de até ``limit + 1`` linhas já ordenadas pela chave."""
+    items = rows[:limit]
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit else None
+    return Page(items=items, next_cursor=next_cursor)
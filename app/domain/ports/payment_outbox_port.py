@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from app.domain.entities.payment import PaymentOutboxEntry
+
+
+class PaymentOutboxPort(ABC):
+    @abstractmethod
+    def find(self, order_id: int) -> Optional[PaymentOutboxEntry]: ...
+
+    @abstractmethod
+    def claim_due(self, now: datetime, limit: int, lease_until: datetime) -> List[PaymentOutboxEntry]:
+        """
+        Reserva até ``limit`` entradas pendentes vencidas até ``now``, contando
+        a tentativa. Ninguém mais as pega antes de ``lease_until``.
+        """
+
+    @abstractmethod
+    def mark_sent(self, order_id: int, qr_code: str) -> None: ...
+
+    @abstractmethod
+    def mark_failed(self, order_id: int, error: str, retry_at: Optional[datetime]) -> None:
+        """Agenda nova tentativa em ``retry_at``; None desiste (FAILED)."""
+
+
+class AsyncPaymentOutboxPort(ABC):
+    @abstractmethod
+    async def find(self, order_id: int) -> Optional[PaymentOutboxEntry]: ...
+
+    @abstractmethod
+    async def claim_due(
+        self, now: datetime, limit: int, lease_until: datetime
+    ) -> List[PaymentOutboxEntry]: ...
+
+    @abstractmethod
+    async def mark_sent(self, order_id: int, qr_code: str) -> None: ...
+
+    @abstractmethod
+    async def mark_failed(self, order_id: int, error: str, retry_at: Optional[datetime]) -> None: ...
+
+
+class PaymentDispatcherPort(ABC):
+    """Espera (limitada) pelo QR code de um pedido recém-gravado com entrada no outbox."""
+
+    @abstractmethod
+    def wait_for(self, order_id: int, timeout: float) -> Optional[str]: ...
+
+    @abstractmethod
+    async def wait_for_async(self, order_id: int, timeout: float) -> Optional[str]: ...
@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from app.domain.entities.payment import PaymentProjection
+from app.shared.enums.payment_source import PaymentSource
+from app.shared.enums.payment_status import PaymentStatus
+
+
+class PaymentProjectionPort(ABC):
+    @abstractmethod
+    def find(self, order_id: int) -> Optional[PaymentProjection]: ...
+
+    @abstractmethod
+    def record(
+        self,
+        order_id: int,
+        status: PaymentStatus,
+        event_at: datetime,
+        source: PaymentSource = PaymentSource.WEBHOOK,
+    ) -> bool:
+        """
+        Grava o status se ``event_at`` não for anterior ao já projetado pela
+        mesma origem. Webhook sempre vence uma consulta; consulta só substitui
+        um webhook ainda PENDING. Retorna False se o evento chegou fora de ordem
+        e foi ignorado. Lança ValueError se o pedido não existe.
+        """
+
+    @abstractmethod
+    def pending_order_ids(self, limit: int, stale_before: datetime) -> List[int]:
+        """Pedidos RECEIVED sem projeção ou com PENDING sincronizado antes de ``stale_before``."""
+
+
+class AsyncPaymentProjectionPort(ABC):
+    @abstractmethod
+    async def find(self, order_id: int) -> Optional[PaymentProjection]: ...
+
+    @abstractmethod
+    async def record(
+        self,
+        order_id: int,
+        status: PaymentStatus,
+        event_at: datetime,
+        source: PaymentSource = PaymentSource.WEBHOOK,
+    ) -> bool: ...
+
+    @abstractmethod
+    async def pending_order_ids(self, limit: int, stale_before: datetime) -> List[int]: ...
@@ -7,4 +7,16 @@ class PaymentGatewayPort(ABC):
 
     @abstractmethod
     def create_payment(self, order_id: int, amount: float) -> tuple[str, PaymentStatus]:
+        """
+        Retorna (qr_code, status_inicial). O outbox pode repetir a chamada para
+        o mesmo pedido: a implementação garante uma única cobrança por ``order_id``.
+        """
+
+
+class AsyncPaymentGatewayPort(ABC):
+    @abstractmethod
+    async def get_status(self, order_id: int) -> PaymentStatus: ...
+
+    @abstractmethod
+    async def create_payment(self, order_id: int, amount: float) -> tuple[str, PaymentStatus]:
         """Retorna (qr_code, status_inicial)"""
@@ -1,45 +1,210 @@
+import logging
+from concurrent.futures import Executor
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.domain.entities.item import OrderItem
 from app.domain.entities.order import Order
-from app.domain.ports.customer_auth_port import CustomerAuthPort
-from app.domain.ports.order_repository_port import OrderRepositoryPort
-from app.adapters.driven.gateways.product_catalog_gateway import ProductCatalogGateway
-from app.domain.ports.payment_status_port import PaymentGatewayPort
+from app.domain.ports.customer_auth_port import AsyncCustomerAuthPort, CustomerAuthPort
+from app.domain.ports.order_repository_port import AsyncOrderRepositoryPort, OrderRepositoryPort
+from app.adapters.driven.gateways.product_catalog_gateway import (
+    AsyncProductCatalogGateway,
+    ProductCatalogGateway,
+    merge_lines,
+)
+from app.domain.ports.payment_outbox_port import PaymentDispatcherPort
+from app.domain.ports.payment_status_port import AsyncPaymentGatewayPort, PaymentGatewayPort
+from app.domain.services.kitchen_queue_index import KitchenQueueIndex
+from app.shared.concurrency import raise_first, settle, settle_async
+
+logger = logging.getLogger(__name__)
+
 
 class CreateOrderService:
+    """
+    Com ``executor`` o token é validado enquanto os produtos são buscados em
+    paralelo; sem ele tudo roda em sequência. O estoque é reservado de uma vez
+    com ``reserve_many`` (que não deixa reservas pela metade) e devolvido se a
+    gravação do pedido falhar.
+
+    Com ``payment_outbox`` a cobrança é gravada no outbox junto com o pedido e
+    criada pelo dispatcher; o QR code só volta se sair em ``payment_wait``
+    segundos (senão None). Sem ele, a cobrança é criada aqui, após o commit.
+
+    ``idempotency_key`` (já reservada) é ligada ao pedido no mesmo commit;
+    ``recover`` responde a partir desse pedido se a execução não terminou.
+    """
+
     def __init__(
         self,
         order_repo: OrderRepositoryPort,
         catalog: ProductCatalogGateway,
         payment_gateway: PaymentGatewayPort,
-            customer_auth: CustomerAuthPort
+            customer_auth: CustomerAuthPort,
+        kitchen_queue: Optional[KitchenQueueIndex] = None,
+        executor: Optional[Executor] = None,
+        payment_outbox: Optional[PaymentDispatcherPort] = None,
+        payment_wait: float = 0.0,
+    ):
+        self.order_repo = order_repo
+        self.catalog = catalog
+        self.payment_gateway = payment_gateway
+        self.customer_auth = customer_auth
+        self.kitchen_queue = kitchen_queue
+        self.executor = executor
+        self.payment_outbox = payment_outbox
+        self.payment_wait = payment_wait
+
+    def execute(self, order: Order, token: str | None, idempotency_key: Optional[str] = None):
+        product_ids = _distinct_products(order.items)
+        calls = [partial(self.catalog.get_product, pid) for pid in product_ids]
+        if token:
+            calls.insert(0, partial(self.customer_auth.verify_token, token))
+
+        results = raise_first(settle(self.executor, calls))
+        if token:
+            order.client_id = results.pop(0)
+        products = dict(zip(product_ids, results))
+
+        reserved = _lines(order.items)
+        for product_id, qty in merge_lines(reserved).items():
+            _check_stock(products[product_id], qty)
+        self.catalog.reserve_many(reserved)
+
+        try:
+            order.amount = float(sum(_price_item(i, products[i.product_id]) for i in order.items))
+            # 1) persiste o pedido (e a cobrança pendente, com outbox)
+            order = self.order_repo.create(
+                order, **_create_options(self.payment_outbox, idempotency_key)
+            )
+        except Exception:
+            self._release(reserved)
+            raise
+
+        if self.kitchen_queue is not None:
+            self.kitchen_queue.apply(order)
+
+        # 2) cobrança: pelo dispatcher, com espera limitada, ou direto no gateway
+        if self.payment_outbox is not None:
+            qr_code = self.payment_outbox.wait_for(order.id, self.payment_wait)
+        else:
+            qr_code, _ = self.payment_gateway.create_payment(order.id, order.amount)
+
+        return [order, qr_code]
+
+    def recover(self, order_id: int):
+        # a cobrança segue pelo outbox; o QR fica em GET /orders/{id}/payment
+        return [_recovered(self.order_repo.find_by_id(order_id)), None]
+
+    def _release(self, lines: List[Tuple[str, int]]) -> None:
+        try:
+            self.catalog.release_many(lines)
+        except Exception:
+            _log_release_failure(lines)
+
+
+class AsyncCreateOrderService:
+    def __init__(
+        self,
+        order_repo: AsyncOrderRepositoryPort,
+        catalog: AsyncProductCatalogGateway,
+        payment_gateway: AsyncPaymentGatewayPort,
+        customer_auth: AsyncCustomerAuthPort,
+        kitchen_queue: Optional[KitchenQueueIndex] = None,
+        payment_outbox: Optional[PaymentDispatcherPort] = None,
+        payment_wait: float = 0.0,
     ):
         self.order_repo = order_repo
         self.catalog = catalog
         self.payment_gateway = payment_gateway
         self.customer_auth = customer_auth
+        self.kitchen_queue = kitchen_queue
+        self.payment_outbox = payment_outbox
+        self.payment_wait = payment_wait
 
-    def execute(self, order: Order,token: str | None):
+    async def execute(self, order: Order, token: str | None, idempotency_key: Optional[str] = None):
+        product_ids = _distinct_products(order.items)
+        calls = [self.catalog.get_product(pid) for pid in product_ids]
         if token:
-            order.client_id = self.customer_auth.verify_token(token)
-        total = 0
-        for item in order.items:
-            prod = self.catalog.get_product(item.product_id)
-            if prod["stock"] < item.quantity:
-                raise ValueError(
-                    f"Estoque insuficiente para '{prod['name']}' "
-                    f"(disponível {prod['stock']})"
-                )
-            self.catalog.reserve_stock(item.product_id, item.quantity)
+            calls.insert(0, self.customer_auth.verify_token(token))
 
-            item.name = prod["name"]
-            item.price = prod["price"] * item.quantity
-            total += item.price
+        results = raise_first(await settle_async(calls))
+        if token:
+            order.client_id = results.pop(0)
+        products = dict(zip(product_ids, results))
 
-        order.amount = float(total)
+        reserved = _lines(order.items)
+        for product_id, qty in merge_lines(reserved).items():
+            _check_stock(products[product_id], qty)
+        await self.catalog.reserve_many(reserved)
 
-        # 1) persiste o pedido
-        order = self.order_repo.create(order)
+        try:
+            order.amount = float(sum(_price_item(i, products[i.product_id]) for i in order.items))
+            order = await self.order_repo.create(
+                order, **_create_options(self.payment_outbox, idempotency_key)
+            )
+        except Exception:
+            await self._release(reserved)
+            raise
 
-        # 2) dispara criação do pagamento
-        qr_code, _ = self.payment_gateway.create_payment(order.id, order.amount)
+        if self.kitchen_queue is not None:
+            self.kitchen_queue.apply(order)
+        if self.payment_outbox is not None:
+            qr_code = await self.payment_outbox.wait_for_async(order.id, self.payment_wait)
+        else:
+            qr_code, _ = await self.payment_gateway.create_payment(order.id, order.amount)
 
         return [order, qr_code]
+
+    async def recover(self, order_id: int):
+        return [_recovered(await self.order_repo.find_by_id(order_id)), None]
+
+    async def _release(self, lines: List[Tuple[str, int]]) -> None:
+        try:
+            await self.catalog.release_many(lines)
+        except Exception:
+            _log_release_failure(lines)
+
+
+def _create_options(payment_outbox, idempotency_key: Optional[str]) -> Dict:
+    # só os argumentos em uso: repositórios sem outbox/idempotência seguem valendo
+    options: Dict = {}
+    if payment_outbox is not None:
+        options["with_payment"] = True
+    if idempotency_key is not None:
+        options["idempotency_key"] = idempotency_key
+    return options
+
+
+def _recovered(order: Optional[Order]) -> Order:
+    if order is None:
+        raise ValueError("Pedido não encontrado")
+    return order
+
+
+def _check_stock(prod: Dict, qty: int) -> None:
+    # produtos vindos do cache não trazem "stock": quem decide é o reserve_many
+    if "stock" in prod and prod["stock"] < qty:
+        raise ValueError(
+            f"Estoque insuficiente para '{prod['name']}' "
+            f"(disponível {prod['stock']})"
+        )
+
+
+def _price_item(item: OrderItem, prod: Dict) -> float:
+    item.name = prod["name"]
+    item.price = prod["price"] * item.quantity
+    return item.price
+
+
+def _distinct_products(items: Sequence[OrderItem]) -> List[str]:
+    return list(dict.fromkeys(i.product_id for i in items))
+
+
+def _lines(items: Sequence[OrderItem]) -> List[Tuple[str, int]]:
+    return [(i.product_id, i.quantity) for i in items]
+
+
+def _log_release_failure(lines: List[Tuple[str, int]]) -> None:
+    # a falha original é a que importa para o cliente; a devolução é best effort
+    logger.exception("Falha ao devolver ao catálogo a reserva de %s", lines)
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional, Tuple
+
+from app.domain.entities.idempotency import IdempotencyRecord, StoredResponse
+from app.domain.entities.payment import as_utc
+from app.domain.ports.idempotency_port import AsyncIdempotencyStorePort, IdempotencyStorePort
+from app.domain.services.payment_status_service import now_utc
+from app.shared.enums.idempotency_status import IdempotencyStatus
+from app.shared.exceptions.idempotency import IdempotencyInProgressError, IdempotencyKeyReusedError
+from app.shared.resilience import remaining
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 3600.0
+# maior que o orçamento de uma requisição: passado o lock, a reserva é
+# considerada abandonada e outra tentativa pode executar
+DEFAULT_LOCK_SECONDS = 30.0
+DEFAULT_WAIT_SECONDS = 5.0
+POLL_SECONDS = 0.1
+
+# (resposta, True se veio de uma execução anterior)
+Outcome = Tuple[StoredResponse, bool]
+# resposta montada a partir do pedido de uma execução que não chegou ao fim
+Recover = Callable[[int], StoredResponse]
+
+
+def scoped_key(key: str, scope: Optional[str] = None) -> str:
+    """Chave gravada: a mesma Idempotency-Key de clientes diferentes não colide."""
+    return hashlib.sha256(f"{scope or ''}\n{key}".encode()).hexdigest()
+
+
+def request_fingerprint(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+class _IdempotencyPolicy:
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        lock: float = DEFAULT_LOCK_SECONDS,
+        wait: float = DEFAULT_WAIT_SECONDS,
+        poll: float = POLL_SECONDS,
+        clock: Callable[[], datetime] = now_utc,
+    ):
+        self.ttl = ttl
+        self.lock = lock
+        self.wait = wait
+        self.poll = poll
+        self._clock = clock
+
+    def _window(self) -> Tuple[datetime, datetime, datetime]:
+        now = self._clock()
+        return now, now + timedelta(seconds=self.lock), now + timedelta(seconds=self.ttl)
+
+    def _give_up_at(self) -> float:
+        # quem espera a requisição original não passa do orçamento da própria requisição
+        wait = self.wait
+        left = remaining()
+        if left is not None:
+            wait = min(wait, max(0.0, left))
+        return time.monotonic() + wait
+
+    def _settled(self, record: IdempotencyRecord, fingerprint: str) -> Optional[StoredResponse]:
+        """Resposta guardada, ou None se a execução original ainda está em andamento."""
+        if record.fingerprint != fingerprint:
+            raise IdempotencyKeyReusedError("Idempotency-Key já usada com outro pedido")
+        if record.status is IdempotencyStatus.COMPLETED:
+            return record.response
+        return None
+
+    def _abandoned(self, record: IdempotencyRecord) -> bool:
+        return as_utc(record.locked_until) < self._clock()
+
+    def _in_progress(self) -> IdempotencyInProgressError:
+        return IdempotencyInProgressError(
+            "Requisição com esta Idempotency-Key ainda em andamento", retry_after=1.0
+        )
+
+
+class IdempotentRequests(_IdempotencyPolicy):
+    """
+    Executa ``produce`` uma única vez por chave. Repetições recebem a resposta
+    guardada; se a original ainda está em andamento, esperam por ela até
+    ``wait`` segundos. Uma execução que falha libera a chave.
+
+    Se a execução gravou o pedido mas não a resposta (processo caiu entre os
+    dois commits), a reserva abandonada é respondida por ``recover`` a partir
+    do pedido, em vez de executar ``produce`` de novo.
+    """
+
+    def __init__(self, store: IdempotencyStorePort, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def run(
+        self,
+        key: str,
+        fingerprint: str,
+        produce: Callable[[], StoredResponse],
+        recover: Optional[Recover] = None,
+    ) -> Outcome:
+        give_up = self._give_up_at()
+        while True:
+            record = self.store.claim(key, fingerprint, *self._window())
+            if record is None:
+                return self._execute(key, produce), False
+            while record is not None:
+                stored = self._settled(record, fingerprint)
+                if stored is not None:
+                    return stored, True
+                if self._abandoned(record):
+                    if record.order_id is None:
+                        break
+                    if recover is not None:
+                        return self._recover(key, record.order_id, recover), True
+                if time.monotonic() >= give_up:
+                    raise self._in_progress()
+                time.sleep(self.poll)
+                record = self.store.find(key)
+            # liberada (a original falhou) ou abandonada: tenta reservar de novo
+
+    def _execute(self, key: str, produce: Callable[[], StoredResponse]) -> StoredResponse:
+        try:
+            response = produce()
+        except BaseException:
+            try:
+                self.store.release(key)
+            except Exception:
+                logger.exception("Falha ao liberar a Idempotency-Key após erro")
+            raise
+        self.store.complete(key, response)
+        return response
+
+    def _recover(self, key: str, order_id: int, recover: Recover) -> StoredResponse:
+        response = recover(order_id)
+        self.store.complete(key, response)
+        return response
+
+
+class AsyncIdempotentRequests(_IdempotencyPolicy):
+    def __init__(self, store: AsyncIdempotencyStorePort, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        produce: Callable[[], Awaitable[StoredResponse]],
+        recover: Optional[Callable[[int], Awaitable[StoredResponse]]] = None,
+    ) -> Outcome:
+        give_up = self._give_up_at()
+        while True:
+            record = await self.store.claim(key, fingerprint, *self._window())
+            if record is None:
+                return await self._execute(key, produce), False
+            while record is not None:
+                stored = self._settled(record, fingerprint)
+                if stored is not None:
+                    return stored, True
+                if self._abandoned(record):
+                    if record.order_id is None:
+                        break
+                    if recover is not None:
+                        return await self._recover(key, record.order_id, recover), True
+                if time.monotonic() >= give_up:
+                    raise self._in_progress()
+                await asyncio.sleep(self.poll)
+                record = await self.store.find(key)
+
+    async def _execute(
+        self, key: str, produce: Callable[[], Awaitable[StoredResponse]]
+    ) -> StoredResponse:
+        try:
+            response = await produce()
+        except BaseException:
+            try:
+                await self.store.release(key)
+            except Exception:
+                logger.exception("Falha ao liberar a Idempotency-Key após erro")
+            raise
+        await self.store.complete(key, response)
+        return response
+
+    async def _recover(
+        self, key: str, order_id: int, recover: Callable[[int], Awaitable[StoredResponse]]
+    ) -> StoredResponse:
+        response = await recover(order_id)
+        await self.store.complete(key, response)
+        return response
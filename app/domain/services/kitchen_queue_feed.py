@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Union
+
+from app.domain.entities.order import Order
+from app.domain.services.kitchen_queue_index import KitchenQueueIndex, QueueChange
+from app.shared.broadcast import BroadcastHub, SubscriberLagged, Subscription
+
+
+@dataclass(frozen=True)
+class QueueSnapshot:
+    version: int
+    orders: List[Order]
+
+
+# snapshot, delta, ou None como batida quando nada mudou
+QueueEvent = Optional[Union[QueueSnapshot, QueueChange]]
+
+
+class KitchenQueueFeed:
+    """
+    Fila da cozinha por push: um snapshot inicial do índice e depois só as
+    mudanças publicadas por ele no ``hub``. Um assinante que fica para trás
+    recebe um novo snapshot em vez dos deltas perdidos.
+
+    Quem abre a conexão assina com ``subscribe`` antes de responder ao cliente,
+    para que um hub sem vaga vire recusa (503) e não um stream vazio.
+    """
+
+    def __init__(self, index: KitchenQueueIndex, hub: BroadcastHub):
+        self.index = index
+        self.hub = hub
+
+    def available(self) -> bool:
+        # antes da primeira carga o índice está vazio, e não só sem mudanças
+        return self.index.ready and not self.hub.full
+
+    def subscribe(self) -> Subscription:
+        """Lança HubFullError se o hub não tiver vaga."""
+        return self.hub.subscribe()
+
+    async def events(self, sub: Subscription, heartbeat: Optional[float] = None) -> AsyncIterator[QueueEvent]:
+        """Eventos de ``sub``, encerrada junto com o gerador."""
+        # assinada antes do snapshot: o que mudar depois dele já está no buffer
+        with sub:
+            snapshot = self._snapshot()
+            yield snapshot
+            while True:
+                try:
+                    batches = await sub.receive(heartbeat)
+                except SubscriberLagged:
+                    snapshot = self._snapshot()
+                    yield snapshot
+                    continue
+                if batches is None:
+                    return
+                if not batches:
+                    yield None
+                for changes in batches:
+                    for change in changes:
+                        # já refletidas no snapshot
+                        if change.version > snapshot.version:
+                            yield change
+
+    def _snapshot(self) -> QueueSnapshot:
+        return QueueSnapshot(*self.index.versioned_snapshot())
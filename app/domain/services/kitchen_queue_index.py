@@ -0,0 +1,168 @@
+import copy
+import logging
+import threading
+import uuid
+from bisect import bisect_right, insort
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.domain.entities.order import Order
+from app.domain.entities.page import Page
+from app.domain.ports.order_repository_port import page_from_rows
+from app.shared.enums.order_status import OrderStatus, queue_priority
+from app.shared.handlers.cursor import decode_cursor
+
+logger = logging.getLogger(__name__)
+
+QueueKey = Tuple[int, int]
+
+
+class QueueChangeKind(str, Enum):
+    ADDED = "added"
+    CHANGED = "changed"  # status (ou outro campo) mudou; pode mudar de posição
+    REMOVED = "removed"
+
+
+@dataclass(frozen=True)
+class QueueChange:
+    kind: QueueChangeKind
+    order_id: int
+    version: int
+    order: Optional[Order] = None  # None em REMOVED
+
+
+def _change(order_id: int, version: int, before: Optional[Order], after: Optional[Order]) -> QueueChange:
+    if before is None:
+        return QueueChange(QueueChangeKind.ADDED, order_id, version, after)
+    if after is None:
+        return QueueChange(QueueChangeKind.REMOVED, order_id, version)
+    return QueueChange(QueueChangeKind.CHANGED, order_id, version, after)
+
+
+def in_kitchen_queue(order: Order) -> bool:
+    # mesmo critério de active_queue_filter (pedidos inativos só somem na reconciliação)
+    return order.status is not OrderStatus.COMPLETED
+
+
+def _key(order: Order) -> QueueKey:
+    return (queue_priority(order.status), order.id)
+
+
+class KitchenQueueIndex:
+    """
+    Fila da cozinha em memória, na ordem de ``find_active_sorted_orders``
+    (prioridade do status, depois id).
+
+    É carregada uma vez, atualizada pelos fluxos de criação e troca de status e
+    reconciliada periodicamente com o banco. ``version`` cresce a cada mudança
+    efetiva, então dois snapshots com a mesma versão têm o mesmo conteúdo.
+    A versão só vale dentro do processo; ``tag`` a combina com um id sorteado na
+    criação do índice, para comparar versões vindas de outras réplicas.
+
+    Cada mudança efetiva é entregue a ``on_change`` como uma lista de
+    ``QueueChange`` com a nova versão. A chamada acontece dentro do lock, na
+    ordem das versões, e portanto não pode bloquear.
+    """
+
+    def __init__(self, on_change: Optional[Callable[[List[QueueChange]], None]] = None) -> None:
+        self._lock = threading.Lock()
+        self._keys: List[QueueKey] = []
+        self._orders: Dict[int, Order] = {}
+        # id -> versão da última atualização incremental; protege essas mudanças
+        # de serem desfeitas por uma reconciliação lida antes delas
+        self._touched: Dict[int, int] = {}
+        self.version = 0
+        self.ready = False
+        self.epoch = uuid.uuid4().hex[:12]
+        self.on_change = on_change
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    # ------------------------------------------------------------------ escrita
+    def apply(self, order: Order) -> None:
+        """Reflete um pedido recém-gravado: entra, muda de posição ou sai da fila."""
+        with self._lock:
+            before = self._discard(order.id)
+            after = None
+            if in_kitchen_queue(order):
+                after = copy.deepcopy(order)
+                self._put(after)
+            if before is not None or after is not None:
+                self.version += 1
+                self._touched[order.id] = self.version
+                self._notify([_change(order.id, self.version, before, after)])
+
+    def reload(self, orders: Iterable[Order], since_version: int) -> None:
+        """
+        Substitui o conteúdo pelo resultado do banco. ``since_version`` é a versão
+        lida antes da consulta: pedidos alterados localmente depois dela mantêm o
+        estado atual, que é mais novo que o da consulta.
+        """
+        fresh = {o.id: o for o in orders if in_kitchen_queue(o)}
+        with self._lock:
+            recent = {oid for oid, v in self._touched.items() if v > since_version}
+            for oid in recent:
+                fresh.pop(oid, None)
+                if oid in self._orders:
+                    fresh[oid] = self._orders[oid]
+
+            changes = [
+                _change(oid, self.version + 1, self._orders.get(oid), fresh.get(oid))
+                for oid in sorted(self._orders.keys() | fresh.keys())
+                if self._orders.get(oid) != fresh.get(oid)
+            ]
+            if changes:
+                self.version += 1
+            self._orders = fresh
+            self._keys = sorted(_key(o) for o in fresh.values())
+            self._touched = {oid: v for oid, v in self._touched.items() if oid in recent}
+            self.ready = True
+            if changes:
+                self._notify(changes)
+
+    # ------------------------------------------------------------------ leitura
+    @property
+    def tag(self) -> str:
+        return f"{self.epoch}.{self.version}"
+
+    def snapshot(self) -> List[Order]:
+        return self.versioned_snapshot()[1]
+
+    def versioned_snapshot(self) -> Tuple[int, List[Order]]:
+        """Conteúdo e versão lidos juntos: mudanças posteriores têm versão maior."""
+        with self._lock:
+            return self.version, [self._orders[oid] for _, oid in self._keys]
+
+    def page(self, limit: int, after: Optional[str] = None) -> Page:
+        start_key = decode_cursor(after, 2) if after else None
+        if start_key and not all(isinstance(v, int) for v in start_key):
+            raise ValueError("Cursor inválido")
+        with self._lock:
+            start = bisect_right(self._keys, start_key) if start_key else 0
+            rows = [self._orders[oid] for _, oid in self._keys[start:start + limit + 1]]
+        return page_from_rows(rows, limit, _key)
+
+    # ------------------------------------------------------------------ helpers
+    def _put(self, order: Order) -> None:
+        self._orders[order.id] = order
+        insort(self._keys, _key(order))
+
+    def _discard(self, order_id: int) -> Optional[Order]:
+        current = self._orders.pop(order_id, None)
+        if current is None:
+            return None
+        key = _key(current)
+        pos = bisect_right(self._keys, key) - 1
+        del self._keys[pos]
+        return current
+
+    def _notify(self, changes: List[QueueChange]) -> None:
+        if self.on_change is None:
+            return
+        try:
+            self.on_change(changes)
+        except Exception:
+            # quem assina não pode derrubar a escrita que já foi gravada
+            logger.exception("Falha ao publicar mudanças da fila da cozinha")
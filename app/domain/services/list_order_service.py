@@ -1,25 +1,127 @@
 from typing import List, Optional
 from app.domain.entities.order import Order
-from app.domain.ports.order_repository_port import OrderRepositoryPort
+from app.domain.entities.page import Page
+from app.domain.ports.order_repository_port import AsyncOrderRepositoryPort, OrderRepositoryPort
+from app.domain.services.kitchen_queue_index import KitchenQueueIndex
 from app.shared.enums.order_status import OrderStatus
 
 class ListOrdersService:
-    def __init__(self, repo: OrderRepositoryPort):
+    def __init__(self, repo: OrderRepositoryPort, kitchen_queue: Optional[KitchenQueueIndex] = None):
         self.repo = repo
+        self.kitchen_queue = kitchen_queue
+
+    def execute(
+        self,
+        status: Optional[OrderStatus] = None,
+        prioritized: bool = False,
+        with_items: bool = True,
+    ):
+        if prioritized and status is None:
+            if _queue_ready(self.kitchen_queue):
+                return self.kitchen_queue.snapshot()
+            return self.repo.find_active_sorted_orders(with_items=with_items)
+        return self.repo.find_all(status=status, with_items=with_items)
 
-    def execute(self, status: Optional[OrderStatus] = None, prioritized: bool = False):
+    def paginate(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        status: Optional[OrderStatus] = None,
+        prioritized: bool = False,
+        with_items: bool = True,
+    ) -> Page:
         if prioritized and status is None:
-            return self.repo.find_active_sorted_orders()
-        return self.repo.find_all(status=status)
+            if _queue_ready(self.kitchen_queue):
+                # o índice já tem os itens em memória; sem itens é só a saída que muda
+                return self.kitchen_queue.page(limit, after)
+            return self.repo.find_active_sorted_page(
+                limit=limit, after=after, with_items=with_items
+            )
+        return self.repo.find_page(
+            status=status, limit=limit, after=after, with_items=with_items
+        )
+
+    def queue_tag(self) -> Optional[str]:
+        return _queue_tag(self.kitchen_queue)
 
 class GetOrderByIdService:
     def __init__(self, repo: OrderRepositoryPort):
         self.repo = repo
     def execute(self, order_id: int) -> Optional[Order]:
         return self.repo.find_by_id(order_id)
+    def header(self, order_id: int) -> Optional[Order]:
+        return self.repo.find_header(order_id)
 
 class ListOrdersByClientService:
     def __init__(self, repo: OrderRepositoryPort):
         self.repo = repo
     def execute(self, client_id: int) -> List[Order]:
         return self.repo.find_by_client(client_id)
+
+
+class AsyncListOrdersService:
+    def __init__(self, repo: AsyncOrderRepositoryPort, kitchen_queue: Optional[KitchenQueueIndex] = None):
+        self.repo = repo
+        self.kitchen_queue = kitchen_queue
+
+    async def execute(
+        self,
+        status: Optional[OrderStatus] = None,
+        prioritized: bool = False,
+        with_items: bool = True,
+    ):
+        if prioritized and status is None:
+            if _queue_ready(self.kitchen_queue):
+                return self.kitchen_queue.snapshot()
+            return await self.repo.find_active_sorted_orders(with_items=with_items)
+        return await self.repo.find_all(status=status, with_items=with_items)
+
+    async def paginate(
+        self,
+        limit: int,
+        after: Optional[str] = None,
+        status: Optional[OrderStatus] = None,
+        prioritized: bool = False,
+        with_items: bool = True,
+    ) -> Page:
+        if prioritized and status is None:
+            if _queue_ready(self.kitchen_queue):
+                # o índice já tem os itens em memória; sem itens é só a saída que muda
+                return self.kitchen_queue.page(limit, after)
+            return await self.repo.find_active_sorted_page(
+                limit=limit, after=after, with_items=with_items
+            )
+        return await self.repo.find_page(
+            status=status, limit=limit, after=after, with_items=with_items
+        )
+
+    def queue_tag(self) -> Optional[str]:
+        return _queue_tag(self.kitchen_queue)
+
+class AsyncGetOrderByIdService:
+    def __init__(self, repo: AsyncOrderRepositoryPort):
+        self.repo = repo
+    async def execute(self, order_id: int) -> Optional[Order]:
+        return await self.repo.find_by_id(order_id)
+    async def header(self, order_id: int) -> Optional[Order]:
+        return await self.repo.find_header(order_id)
+
+class AsyncListOrdersByClientService:
+    def __init__(self, repo: AsyncOrderRepositoryPort):
+        self.repo = repo
+    async def execute(self, client_id: int) -> List[Order]:
+        return await self.repo.find_by_client(client_id)
+
+
+def _queue_ready(kitchen_queue: Optional[KitchenQueueIndex]) -> bool:
+    # sem índice, ou antes da primeira carga, a fila sai do banco
+    return kitchen_queue is not None and kitchen_queue.ready
+
+
+def _queue_tag(kitchen_queue: Optional[KitchenQueueIndex]) -> Optional[str]:
+    """
+    Versão da fila servida pelo índice, ou None quando ela sai do banco. Deve ser
+    lida antes do conteúdo: se a fila mudar no meio, a resposta leva uma versão
+    mais velha que o corpo e a próxima requisição condicional só baixa de novo.
+    """
+    return kitchen_queue.tag if _queue_ready(kitchen_queue) else None
@@ -0,0 +1,107 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.domain.entities.payment import as_utc
+from app.domain.ports.payment_projection_port import (
+    AsyncPaymentProjectionPort,
+    PaymentProjectionPort,
+)
+from app.domain.ports.payment_status_port import AsyncPaymentGatewayPort, PaymentGatewayPort
+from app.shared.enums.payment_source import PaymentSource
+from app.shared.enums.payment_status import PaymentStatus
+
+logger = logging.getLogger(__name__)
+
+# idade máxima de uma projeção PENDING antes de consultar o serviço de pagamento
+DEFAULT_MAX_AGE_SECONDS = 10.0
+
+
+class RecordPaymentStatusService:
+    """Aplica na projeção um status recebido pelo webhook do serviço de pagamento."""
+
+    def __init__(self, payments: PaymentProjectionPort):
+        self.payments = payments
+
+    def execute(self, order_id: int, status: PaymentStatus, occurred_at: Optional[datetime] = None) -> bool:
+        return self.payments.record(order_id, status, _event_time(occurred_at))
+
+
+class AsyncRecordPaymentStatusService:
+    def __init__(self, payments: AsyncPaymentProjectionPort):
+        self.payments = payments
+
+    async def execute(
+        self, order_id: int, status: PaymentStatus, occurred_at: Optional[datetime] = None
+    ) -> bool:
+        return await self.payments.record(order_id, status, _event_time(occurred_at))
+
+
+class PaymentStatusReader:
+    """
+    Status do pagamento lido primeiro da projeção local. Só consulta o serviço
+    de pagamento se ela não existe ou está vencida, e grava o que ele devolver.
+    """
+
+    def __init__(
+        self,
+        gateway: PaymentGatewayPort,
+        payments: Optional[PaymentProjectionPort] = None,
+        max_age: float = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        self.gateway = gateway
+        self.payments = payments
+        self.max_age = max_age
+
+    def get_status(self, order_id: int) -> PaymentStatus:
+        if self.payments is None:
+            return self.gateway.get_status(order_id)
+        projection = self.payments.find(order_id)
+        if projection is not None and projection.fresh(self.max_age, now_utc()):
+            return projection.status
+
+        status = self.gateway.get_status(order_id)
+        try:
+            self.payments.record(order_id, status, now_utc(), PaymentSource.POLL)
+        except Exception:
+            _log_record_failure(order_id)
+        return status
+
+
+class AsyncPaymentStatusReader:
+    def __init__(
+        self,
+        gateway: AsyncPaymentGatewayPort,
+        payments: Optional[AsyncPaymentProjectionPort] = None,
+        max_age: float = DEFAULT_MAX_AGE_SECONDS,
+    ):
+        self.gateway = gateway
+        self.payments = payments
+        self.max_age = max_age
+
+    async def get_status(self, order_id: int) -> PaymentStatus:
+        if self.payments is None:
+            return await self.gateway.get_status(order_id)
+        projection = await self.payments.find(order_id)
+        if projection is not None and projection.fresh(self.max_age, now_utc()):
+            return projection.status
+
+        status = await self.gateway.get_status(order_id)
+        try:
+            await self.payments.record(order_id, status, now_utc(), PaymentSource.POLL)
+        except Exception:
+            _log_record_failure(order_id)
+        return status
+
+
+def now_utc() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _event_time(occurred_at: Optional[datetime]) -> datetime:
+    return as_utc(occurred_at) if occurred_at is not None else now_utc()
+
+
+def _log_record_failure(order_id: int) -> None:
+    # a projeção é só um atalho: o status veio do serviço de pagamento e vale
+    logger.exception("Falha ao gravar a projeção de pagamento do pedido %s", order_id)
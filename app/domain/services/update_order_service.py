@@ -1,36 +1,138 @@
+from typing import Optional
+
 from app.domain.entities.order import Order
-from app.domain.ports.order_repository_port import OrderRepositoryPort
-from app.domain.ports.payment_status_port import PaymentGatewayPort
+from app.domain.ports.order_repository_port import AsyncOrderRepositoryPort, OrderRepositoryPort
+from app.domain.ports.payment_projection_port import (
+    AsyncPaymentProjectionPort,
+    PaymentProjectionPort,
+)
+from app.domain.ports.payment_status_port import AsyncPaymentGatewayPort, PaymentGatewayPort
+from app.domain.services.kitchen_queue_index import KitchenQueueIndex
+from app.domain.services.payment_status_service import (
+    DEFAULT_MAX_AGE_SECONDS,
+    AsyncPaymentStatusReader,
+    PaymentStatusReader,
+)
 from app.shared.enums.order_status import OrderStatus
 from app.shared.enums.payment_status import PaymentStatus
 
+ALLOWED_TRANSITIONS = {
+    OrderStatus.RECEIVED: {OrderStatus.IN_PROGRESS},
+    OrderStatus.IN_PROGRESS: {OrderStatus.READY},
+    OrderStatus.READY: {OrderStatus.COMPLETED},
+    OrderStatus.CANCELED: {OrderStatus.CANCELED},
+}
+
+# status de origem de cada destino que não depende do pagamento: a transição vira
+# um único UPDATE ... WHERE status = origem, sem ler o pedido antes
+_DIRECT_SOURCE = {
+    target: source
+    for source, targets in ALLOWED_TRANSITIONS.items()
+    for target in targets
+    if target is not OrderStatus.IN_PROGRESS
+}
+
 
 class UpdateOrderStatusService:
 
-    def __init__(self, order_repo: OrderRepositoryPort,payment_port: PaymentGatewayPort) -> None:
+    def __init__(
+        self,
+        order_repo: OrderRepositoryPort,
+        payment_port: PaymentGatewayPort,
+        kitchen_queue: Optional[KitchenQueueIndex] = None,
+        payments: Optional[PaymentProjectionPort] = None,
+        payment_max_age: float = DEFAULT_MAX_AGE_SECONDS,
+    ) -> None:
         self.order_repo = order_repo
         self.payment_port = payment_port
+        self.kitchen_queue = kitchen_queue
+        # projeção local primeiro; payment_port só se ela faltar ou estiver vencida
+        self.payment_status = PaymentStatusReader(payment_port, payments, payment_max_age)
 
     def execute(self, order_id: int, new_status: OrderStatus) -> Order:
-        order = self.order_repo.find_by_id(order_id)
+        source = _DIRECT_SOURCE.get(new_status)
+        updated = None
+        if source is not None:
+            updated = self.order_repo.update_status(order_id, source, new_status)
+        if updated is None:
+            # transição que depende do pagamento, ou o UPDATE direto não casou:
+            # o cabeçalho basta para validar (e explicar o erro)
+            updated = self._validated_update(order_id, new_status)
+        if self.kitchen_queue is not None:
+            self.kitchen_queue.apply(updated)
+        return updated
+
+    def _validated_update(self, order_id: int, new_status: OrderStatus) -> Order:
+        order = self.order_repo.find_header(order_id)
         if order is None:
             raise ValueError("Pedido não encontrado")
 
-        if order.status is OrderStatus.RECEIVED and new_status is OrderStatus.IN_PROGRESS:
-            payment_status = self.payment_port.get_status(order_id)
-            if payment_status in (PaymentStatus.CANCELED,PaymentStatus.FAILED):
-                new_status = OrderStatus.CANCELED
-            elif payment_status is not PaymentStatus.PAID:
-                raise ValueError("Não é possível alterar o status para diferente de RECEIVED sem que o pagamento esteja aprovado.")
-
-        allowed = {
-            OrderStatus.RECEIVED: {OrderStatus.IN_PROGRESS},
-            OrderStatus.IN_PROGRESS: {OrderStatus.READY},
-            OrderStatus.READY: {OrderStatus.COMPLETED},
-            OrderStatus.CANCELED: {OrderStatus.CANCELED},
-        }
-        if new_status not in allowed.get(order.status, set()):
-            raise ValueError(f"Transição {order.status} → {new_status} inválida")
-
-        order.status = new_status
-        return self.order_repo.update(order)
+        payment_status = None
+        if _needs_payment(order, new_status):
+            payment_status = self.payment_status.get_status(order_id)
+        new_status = _next_status(order, new_status, payment_status)
+        return _checked(self.order_repo.update_status(order_id, order.status, new_status))
+
+
+class AsyncUpdateOrderStatusService:
+
+    def __init__(
+        self,
+        order_repo: AsyncOrderRepositoryPort,
+        payment_port: AsyncPaymentGatewayPort,
+        kitchen_queue: Optional[KitchenQueueIndex] = None,
+        payments: Optional[AsyncPaymentProjectionPort] = None,
+        payment_max_age: float = DEFAULT_MAX_AGE_SECONDS,
+    ) -> None:
+        self.order_repo = order_repo
+        self.payment_port = payment_port
+        self.kitchen_queue = kitchen_queue
+        self.payment_status = AsyncPaymentStatusReader(payment_port, payments, payment_max_age)
+
+    async def execute(self, order_id: int, new_status: OrderStatus) -> Order:
+        source = _DIRECT_SOURCE.get(new_status)
+        updated = None
+        if source is not None:
+            updated = await self.order_repo.update_status(order_id, source, new_status)
+        if updated is None:
+            updated = await self._validated_update(order_id, new_status)
+        if self.kitchen_queue is not None:
+            self.kitchen_queue.apply(updated)
+        return updated
+
+    async def _validated_update(self, order_id: int, new_status: OrderStatus) -> Order:
+        order = await self.order_repo.find_header(order_id)
+        if order is None:
+            raise ValueError("Pedido não encontrado")
+
+        payment_status = None
+        if _needs_payment(order, new_status):
+            payment_status = await self.payment_status.get_status(order_id)
+        new_status = _next_status(order, new_status, payment_status)
+        return _checked(await self.order_repo.update_status(order_id, order.status, new_status))
+
+
+def _needs_payment(order: Order, new_status: OrderStatus) -> bool:
+    return order.status is OrderStatus.RECEIVED and new_status is OrderStatus.IN_PROGRESS
+
+
+def _next_status(
+    order: Order,
+    new_status: OrderStatus,
+    payment_status: Optional[PaymentStatus],
+) -> OrderStatus:
+    if payment_status is not None:
+        if payment_status in (PaymentStatus.CANCELED,PaymentStatus.FAILED):
+            new_status = OrderStatus.CANCELED
+        elif payment_status is not PaymentStatus.PAID:
+            raise ValueError("Não é possível alterar o status para diferente de RECEIVED sem que o pagamento esteja aprovado.")
+
+    if new_status not in ALLOWED_TRANSITIONS.get(order.status, set()):
+        raise ValueError(f"Transição {order.status} → {new_status} inválida")
+    return new_status
+
+
+def _checked(updated: Optional[Order]) -> Order:
+    if updated is None:
+        raise ValueError("Pedido alterado por outra requisição, tente novamente")
+    return updated
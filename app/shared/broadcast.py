@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+
+class HubFullError(Exception):
+    """Limite de assinantes atingido."""
+
+
+class SubscriberLagged(Exception):
+    """O buffer do assinante encheu e as mensagens pendentes foram descartadas."""
+
+
+class Subscription:
+    """
+    Buffer de um assinante, limitado a ``maxsize`` mensagens. Vive no event loop
+    em que foi criado: as mensagens chegam por ``call_soon_threadsafe``.
+    """
+
+    def __init__(self, hub: "BroadcastHub", loop: asyncio.AbstractEventLoop, maxsize: int):
+        self._hub = hub
+        self.loop = loop
+        self.maxsize = maxsize
+        self._buffer: Deque[Any] = deque()
+        self._wakeup = asyncio.Event()
+        self.lagged = False
+        self.closed = False
+
+    async def receive(self, timeout: Optional[float] = None) -> Optional[List[Any]]:
+        """
+        Mensagens acumuladas desde a última chamada, esperando até ``timeout``
+        segundos ([] se nada chegou). None quando a assinatura foi encerrada.
+        Lança SubscriberLagged uma vez depois de um estouro do buffer; a partir
+        daí o assinante volta a receber normalmente.
+        """
+        if not self._buffer and not self.lagged and not self.closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._wakeup.clear()
+        if self.lagged:
+            self.lagged = False
+            raise SubscriberLagged()
+        if self._buffer:
+            messages = list(self._buffer)
+            self._buffer.clear()
+            return messages
+        return None if self.closed else []
+
+    def close(self) -> None:
+        self._hub._remove(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --------------------------------------------------------- no event loop
+    def _offer(self, message: Any) -> None:
+        if self.closed or self.lagged:
+            return
+        if len(self._buffer) >= self.maxsize:
+            # assinante lento: em vez de segurar os outros, perde o que estava
+            # pendente e é avisado para se ressincronizar
+            self._buffer.clear()
+            self.lagged = True
+            self._hub.lagged += 1
+        else:
+            self._buffer.append(message)
+        self._wakeup.set()
+
+    def _end(self) -> None:
+        self.closed = True
+        self._wakeup.set()
+
+
+class BroadcastHub:
+    """
+    Difusão em processo: ``publish`` (de qualquer thread) entrega a mensagem no
+    buffer de cada assinante, sem esperar por nenhum deles. A ordem de
+    publicação é preservada para cada assinante.
+    """
+
+    def __init__(self, buffer_size: int = 256, max_subscribers: int = 1000):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.lagged = 0
+        self.rejected = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> Subscription:
+        """Nova assinatura no event loop corrente. Lança HubFullError no limite."""
+        sub = Subscription(self, asyncio.get_running_loop(), self.buffer_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected += 1
+                raise HubFullError("Limite de conexões atingido")
+            self._subscribers.add(sub)
+        return sub
+
+    def publish(self, message: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for sub in subscribers:
+            self._deliver(sub, sub._offer, message)
+
+    def close(self) -> None:
+        """Encerra as assinaturas atuais (o ``receive`` pendente devolve None)."""
+        with self._lock:
+            subscribers, self._subscribers = list(self._subscribers), set()
+        for sub in subscribers:
+            self._deliver(sub, sub._end)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "lagged": self.lagged,
+            "rejected": self.rejected,
+        }
+
+    def _remove(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+        sub.closed = True
+
+    def _deliver(self, sub: Subscription, fn, *args) -> None:
+        # sempre pela fila do loop, mesmo de dentro dele, para manter a ordem
+        try:
+            sub.loop.call_soon_threadsafe(fn, *args)
+        except RuntimeError:
+            # loop já encerrado: a assinatura não tem mais quem leia
+            self._remove(sub)
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class Freshness(str, Enum):
+    FRESH = "fresh"
+    STALE = "stale"        # passou do TTL, mas ainda pode ser servido enquanto é renovado
+    MISSING = "missing"
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    stale_until: float
+    negative: bool = False
+
+
+class TTLCache:
+    """
+    LRU limitado a ``maxsize`` entradas, com TTL. Depois do TTL a entrada ainda
+    vale por ``stale_ttl`` segundos como STALE (stale-while-revalidate). Entradas
+    negativas (ex.: 404) usam ``negative_ttl`` e não têm janela de stale.
+    Seguro para uso entre threads; nenhuma operação bloqueia em I/O.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        negative_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("hits", "stale_hits", "negative_hits", "misses", "evictions", "expirations"), 0
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def lookup(self, key: Hashable) -> Tuple[Freshness, Any, bool]:
+        """Retorna (frescor, valor, negativo) e contabiliza hit/miss."""
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and now >= entry.stale_until:
+                del self._data[key]
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return Freshness.MISSING, None, False
+
+            self._data.move_to_end(key)
+            if entry.negative:
+                self._counters["negative_hits"] += 1
+            elif now < entry.expires_at:
+                self._counters["hits"] += 1
+            else:
+                self._counters["stale_hits"] += 1
+                return Freshness.STALE, entry.value, False
+            return Freshness.FRESH, entry.value, entry.negative
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """``ttl`` substitui o TTL padrão só para esta entrada (ex.: até o ``exp`` de um token)."""
+        now = self._clock()
+        ttl = self.ttl if ttl is None else ttl
+        self._store(key, _Entry(value, now + ttl, now + ttl + self.stale_ttl))
+
+    def put_negative(self, key: Hashable, value: Any = None) -> None:
+        if self.negative_ttl <= 0:
+            return
+        now = self._clock()
+        expires = now + self.negative_ttl
+        self._store(key, _Entry(value, expires, expires, negative=True))
+
+    def put_many(self, items: Iterable[Tuple[Hashable, Any]]) -> int:
+        count = 0
+        for key, value in items:
+            self.put(key, value)
+            count += 1
+        return count
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "size": len(self._data), "maxsize": self.maxsize}
+
+    def _store(self, key: Hashable, entry: _Entry) -> None:
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._counters["evictions"] += 1
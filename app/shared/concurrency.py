@@ -0,0 +1,49 @@
+import asyncio
+import contextvars
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+# (resultado, exceção) de cada chamada, na ordem em que foram pedidas
+Outcome = Tuple[Any, Optional[BaseException]]
+
+
+def settle(
+    executor: Optional[Executor],
+    calls: Sequence[Callable[[], Any]],
+    stop_on_error: bool = True,
+) -> List[Outcome]:
+    """
+    Executa ``calls`` e devolve o desfecho de cada uma. Com ``executor`` todas
+    rodam em paralelo até o fim; em sequência para na primeira falha se
+    ``stop_on_error``.
+    """
+    if executor is not None and len(calls) > 1:
+        # cada tarefa leva uma cópia do contexto (ex.: deadline da requisição)
+        futures = [executor.submit(contextvars.copy_context().run, call) for call in calls]
+        return [
+            (None, f.exception()) if f.exception() is not None else (f.result(), None)
+            for f in futures
+        ]
+
+    outcomes: List[Outcome] = []
+    for call in calls:
+        try:
+            outcomes.append((call(), None))
+        except Exception as exc:
+            outcomes.append((None, exc))
+            if stop_on_error:
+                break
+    return outcomes
+
+
+async def settle_async(calls: Sequence[Awaitable]) -> List[Outcome]:
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    return [(None, r) if isinstance(r, BaseException) else (r, None) for r in results]
+
+
+def raise_first(outcomes: List[Outcome]) -> List[Any]:
+    """Relança a primeira falha; sem falhas, devolve os resultados."""
+    for _, exc in outcomes:
+        if exc is not None:
+            raise exc
+    return [result for result, _ in outcomes]
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class IdempotencyStatus(Enum):
+    IN_PROGRESS = "IN_PROGRESS"
+    COMPLETED = "COMPLETED"
@@ -5,4 +5,17 @@ class OrderStatus(str, PyEnum):
     IN_PROGRESS = "Em Preparação"
     READY = "Pronto"
     COMPLETED = "Finalizado"
-    CANCELED = "Cancelado"
\ No newline at end of file
+    CANCELED = "Cancelado"
+
+
+# ordem da fila da cozinha: pronto primeiro, depois em preparo, depois recebido
+ACTIVE_QUEUE_PRIORITY = {
+    OrderStatus.READY: 1,
+    OrderStatus.IN_PROGRESS: 2,
+    OrderStatus.RECEIVED: 3,
+}
+DEFAULT_QUEUE_PRIORITY = 9999
+
+
+def queue_priority(status: OrderStatus) -> int:
+    return ACTIVE_QUEUE_PRIORITY.get(status, DEFAULT_QUEUE_PRIORITY)
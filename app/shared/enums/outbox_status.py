@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class OutboxStatus(Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    # tentativas esgotadas: precisa de intervenção
+    FAILED = "FAILED"
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class PaymentSource(Enum):
+    # evento do serviço de pagamento, com o horário em que ele observou o status
+    WEBHOOK = "WEBHOOK"
+    # consulta nossa (leitura ou reconciliador): o horário é o do nosso relógio
+    POLL = "POLL"
@@ -0,0 +1,2 @@
+class ProductNotFoundError(ValueError):
+    """Catálogo respondeu 404 para o produto (resposta que pode ir para o cache negativo)."""
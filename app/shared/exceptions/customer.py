@@ -0,0 +1,2 @@
+class InvalidTokenError(ValueError):
+    """Serviço de clientes recusou o token (400/401): resposta que pode ir para o cache negativo."""
@@ -0,0 +1,10 @@
+class IdempotencyKeyReusedError(Exception):
+    """A mesma Idempotency-Key chegou com outro corpo de requisição."""
+
+
+class IdempotencyInProgressError(Exception):
+    """A requisição original com esta chave ainda não terminou."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,19 @@
+class DependencyUnavailableError(Exception):
+    """Chamada a um serviço externo recusada antes de sair (ou sem tempo para sair)."""
+
+    def __init__(self, dependency: str, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.dependency = dependency
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(DependencyUnavailableError):
+    pass
+
+
+class BulkheadFullError(DependencyUnavailableError):
+    pass
+
+
+class DeadlineExceededError(DependencyUnavailableError):
+    pass
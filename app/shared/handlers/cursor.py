@@ -0,0 +1,27 @@
+import base64
+import json
+from typing import Any, Tuple
+
+
+def encode_cursor(*values: Any) -> str:
+    """Serializa a chave da última linha da página em um token opaco (base64url)."""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> Tuple[int, ...]:
+    """
+    Inverso de ``encode_cursor``. Lança ValueError se o token não tiver ``size``
+    valores inteiros (todas as chaves de página são ids/prioridades): um token
+    adulterado vira 400, não um erro do banco.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Cursor inválido")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Cursor inválido")
+    if not all(type(v) is int for v in values):
+        raise ValueError("Cursor inválido")
+    return tuple(values)
@@ -1,48 +1,212 @@
-# import os
-#
-# import jwt
-# from datetime import datetime, timedelta
-# from typing import Optional
-# from dotenv import load_dotenv
-# from jwt import ExpiredSignatureError, InvalidTokenError
-# from passlib.context import CryptContext
-#
-# load_dotenv()
-# SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key")
-# ALGORITHM = os.getenv("ALGORITHM", "HS256")
-# ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-#
-#
-# pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-#
-#
-# def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-#     """Gera um JWT com dados e tempo de expiração."""
-#     to_encode = data.copy()
-#     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-#     to_encode.update({"exp": expire})
-#     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-#
-#
-# def verify_password(plain_password: str, hashed_password: str) -> bool:
-#     """Verifica se a senha está correta."""
-#     return pwd_context.verify(plain_password, hashed_password)
-#
-#
-# def get_password_hash(password: str) -> str:
-#     """Gera o hash da senha."""
-#     return pwd_context.hash(password)
-#
-#
-# def verify_jwt(token: str) -> dict:
-#     """
-#     Verifica e decodifica um JWT.
-#     Retorna o payload se válido; caso contrário, lança uma exceção.
-#     """
-#     try:
-#         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-#         return payload
-#     except ExpiredSignatureError:
-#         raise ValueError("Token expirado")
-#     except InvalidTokenError:
-#         raise ValueError("Token inválido")
\ No newline at end of file
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, AbstractSet, Callable, Dict, Optional
+
+import httpx
+import jwt
+from dotenv import load_dotenv
+from jwt.exceptions import JWTDecodeError, JWTException
+from jwt.jwk import AbstractJWKBase, OctetJWK
+
+from app.shared.exceptions.resilience import DependencyUnavailableError
+from app.shared.resilience import Resilience
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+# Chave simétrica (HS256) compartilhada com o serviço de clientes...
+SECRET_KEY = os.getenv("SECRET_KEY")
+ALGORITHM = os.getenv("ALGORITHM", "HS256")
+# ...ou chaves públicas publicadas por ele (JWKS), com rotação por "kid"
+JWKS_URL = os.getenv("JWKS_URL")
+JWKS_ALGORITHMS = frozenset(os.getenv("JWKS_ALGORITHMS", "RS256").split(","))
+JWKS_REFRESH_SECONDS = float(os.getenv("JWKS_REFRESH_SECONDS", "3600"))
+# intervalo mínimo entre recargas provocadas por "kid" desconhecido
+JWKS_MIN_REFRESH_SECONDS = float(os.getenv("JWKS_MIN_REFRESH_SECONDS", "30"))
+
+_jwt = jwt.JWT()
+
+
+def token_header(token: str) -> Optional[Dict[str, Any]]:
+    """Cabeçalho de um JWS compacto, ou None se o token não for um JWT."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        padded = parts[0] + "=" * (-len(parts[0]) % 4)
+        header = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    return header if isinstance(header, dict) and "alg" in header else None
+
+
+def looks_like_jwt(token: str) -> bool:
+    return token_header(token) is not None
+
+
+class StaticKeySet:
+    """Uma única chave, qualquer que seja o ``kid`` do token."""
+
+    def __init__(self, key: AbstractJWKBase):
+        self.key = key
+
+    def get(self, kid: Optional[str]) -> Optional[AbstractJWKBase]:
+        return self.key
+
+    def peek(self, kid: Optional[str]) -> Optional[AbstractJWKBase]:
+        return self.key
+
+
+class JwksKeySet:
+    """
+    Chaves de um JWKS indexadas por ``kid``. Recarrega a cada ``refresh``
+    segundos e também quando aparece um ``kid`` desconhecido (chave nova após
+    rotação), no máximo uma vez a cada ``min_refresh`` segundos.
+
+    Se a busca falhar, as chaves anteriores continuam valendo e a próxima
+    tentativa só sai depois de ``min_refresh`` segundos; sem chave para o
+    ``kid`` nesse meio tempo, o JWKS é tratado como dependência indisponível.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Dict[str, Any]],
+        refresh: float = JWKS_REFRESH_SECONDS,
+        min_refresh: float = JWKS_MIN_REFRESH_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._fetch = fetch
+        self.refresh = refresh
+        self.min_refresh = min_refresh
+        self._clock = clock
+        self._keys: Dict[Optional[str], AbstractJWKBase] = {}
+        self._loaded_at = float("-inf")
+        self._retry_at = float("-inf")
+        self._failing = False
+        self._lock = threading.Lock()
+        self.failures = 0
+
+    def peek(self, kid: Optional[str]) -> Optional[AbstractJWKBase]:
+        """Consulta sem I/O; None se a chave não estiver carregada ou o JWKS venceu."""
+        now = self._clock()
+        if now - self._loaded_at >= self.refresh and now >= self._retry_at:
+            return None
+        return self._keys.get(kid)
+
+    def get(self, kid: Optional[str]) -> Optional[AbstractJWKBase]:
+        key = self.peek(kid)
+        if key is not None:
+            return key
+        with self._lock:
+            now = self._clock()
+            age = now - self._loaded_at
+            if now >= self._retry_at and (
+                age >= self.refresh or (kid not in self._keys and age >= self.min_refresh)
+            ):
+                self.load()
+            key = self._keys.get(kid)
+            if key is None and self._failing:
+                raise DependencyUnavailableError(
+                    "customer", "Chaves de verificação de token indisponíveis", self._retry_at - now
+                )
+            return key
+
+    def load(self) -> int:
+        try:
+            jwks = self._fetch()
+        except Exception:
+            # endpoint fora do ar: fica com as chaves atuais até o próximo intervalo
+            logger.warning("Falha ao carregar o JWKS", exc_info=True)
+            self.failures += 1
+            self._failing = True
+            self._retry_at = self._clock() + self.min_refresh
+            return len(self._keys)
+        keys = {}
+        for dct in jwks.get("keys", []):
+            try:
+                keys[dct.get("kid")] = jwt.jwk_from_dict(dct)
+            except JWTException:
+                continue  # tipo de chave não suportado: ignora só ela
+        self._keys = keys
+        self._loaded_at = self._clock()
+        self._failing = False
+        return len(keys)
+
+
+class JwtVerifier:
+    def __init__(self, keys, algorithms: AbstractSet[str]):
+        self.keys = keys
+        # "none" nunca é aceito, mesmo se configurado
+        self.algorithms = frozenset(a for a in algorithms if a and a.lower() != "none")
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Valida assinatura, exp e nbf. Lança ValueError se o token não for aceito."""
+        header = token_header(token)
+        if header is None or header["alg"] not in self.algorithms:
+            raise ValueError("Token inválido")
+        key = self.keys.get(header.get("kid"))
+        if key is None:
+            raise ValueError("Token inválido")
+        return _decode(token, key, self.algorithms)
+
+    def can_verify_now(self, token: str) -> bool:
+        """True se o ``kid`` do token já está carregado (sem I/O para descobrir)."""
+        header = token_header(token)
+        return header is not None and self.keys.peek(header.get("kid")) is not None
+
+
+def jwks_fetcher(client: httpx.Client, policy: Resilience) -> Callable[[], Dict[str, Any]]:
+    """Busca o JWKS pelo cliente HTTP e pela política de resiliência informados."""
+
+    def fetch() -> Dict[str, Any]:
+        resp = policy.call(lambda t: client.get(JWKS_URL, timeout=t), idempotent=True)
+        resp.raise_for_status()
+        return resp.json()
+
+    return fetch
+
+
+def build_verifier(fetch_jwks: Optional[Callable[[], Dict[str, Any]]] = None) -> Optional[JwtVerifier]:
+    """Verificador a partir do ambiente; None se não há chave configurada."""
+    if JWKS_URL:
+        fetch = fetch_jwks or jwks_fetcher(httpx.Client(timeout=5), Resilience("customer"))
+        return JwtVerifier(JwksKeySet(fetch), JWKS_ALGORITHMS)
+    if SECRET_KEY:
+        return JwtVerifier(StaticKeySet(OctetJWK(SECRET_KEY.encode())), {ALGORITHM})
+    return None
+
+
+def verify_jwt(token: str) -> dict:
+    """
+    Verifica e decodifica um JWT com as chaves do ambiente.
+    Retorna o payload se válido; caso contrário, lança ValueError.
+    """
+    verifier = _default_verifier()
+    if verifier is None:
+        raise ValueError("Verificação local de token não configurada")
+    return verifier.verify(token)
+
+
+_default: Optional[JwtVerifier] = None
+
+
+def _default_verifier() -> Optional[JwtVerifier]:
+    global _default
+    if _default is None:
+        _default = build_verifier()
+    return _default
+
+
+def _decode(token: str, key: AbstractJWKBase, algorithms: AbstractSet[str]) -> Dict[str, Any]:
+    try:
+        return _jwt.decode(token, key, algorithms=set(algorithms))
+    except JWTDecodeError as exc:
+        if str(exc) == "JWT Expired":
+            raise ValueError("Token expirado")
+        raise ValueError("Token inválido")
+    except JWTException:
+        raise ValueError("Token inválido")
@@ -0,0 +1,16 @@
+from typing import Any, Callable, Dict
+
+# nome -> função que devolve os contadores atuais daquele componente
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    _providers[name] = provider
+
+
+def unregister(name: str) -> None:
+    _providers.pop(name, None)
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: provider() for name, provider in sorted(_providers.items())}
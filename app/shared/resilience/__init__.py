@@ -0,0 +1,6 @@
+from app.shared.resilience.admission import AdmissionController, RouteBudget
+from app.shared.resilience.breaker import BreakerState, CircuitBreaker
+from app.shared.resilience.bulkhead import Bulkhead
+from app.shared.resilience.deadline import budget, deadline, remaining
+from app.shared.resilience.policy import Resilience
+from app.shared.resilience.retry import NO_RETRY, RetryPolicy
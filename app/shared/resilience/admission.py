@@ -0,0 +1,161 @@
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+from app.shared.resilience.deadline import remaining
+from app.shared.resilience.latency import LatencyRecorder
+
+# peso da última requisição na média do tempo de serviço
+_EWMA_ALPHA = 0.2
+
+
+@dataclass(frozen=True)
+class RouteBudget:
+    """
+    Orçamento de uma classe de rotas: até ``max_concurrent`` requisições em
+    execução e no máximo ``max_wait`` segundos na fila. Na disputa por uma vaga
+    do limite global, ``priority`` menor passa na frente.
+    """
+
+    max_concurrent: int
+    max_wait: float
+    priority: int
+
+
+class _RouteState:
+    def __init__(self, budget: RouteBudget):
+        self.budget = budget
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.service_time = 0.0
+        self.queue_time = LatencyRecorder()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": len(self.waiters),
+            "max_concurrent": self.budget.max_concurrent,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "service_ms": round(self.service_time * 1000, 2),
+            "queue": self.queue_time.stats(),
+        }
+
+
+class AdmissionController:
+    """
+    Controle de admissão das requisições, no event loop (sem threads). Cada
+    classe de rotas tem seu limite de concorrência e todas dividem
+    ``max_concurrent`` vagas, que em geral acompanham o threadpool. Quem não
+    entra na hora espera na fila da sua classe; quando a espera estimada (ou a
+    real) passaria de ``max_wait``, a requisição é recusada na hora em vez de
+    esperar à toa.
+    """
+
+    def __init__(self, budgets: Dict[str, RouteBudget], max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self._routes = {name: _RouteState(b) for name, b in budgets.items()}
+        # liberação de vagas: classes de maior prioridade primeiro
+        self._by_priority = sorted(self._routes.values(), key=lambda r: r.budget.priority)
+        self.in_flight = 0
+
+    async def acquire(self, name: str) -> Optional[float]:
+        """
+        Vaga para uma requisição da classe ``name``. None quando admitida;
+        recusada, devolve em quantos segundos vale tentar de novo.
+        """
+        route = self._routes[name]
+        if self._can_run(route) and not self._queued_ahead(route):
+            self._enter(route)
+            route.queue_time.observe(0.0)
+            return None
+
+        max_wait = route.budget.max_wait
+        left = remaining()
+        if left is not None:
+            max_wait = min(max_wait, max(0.0, left))
+        estimate = self._estimated_wait(route)
+        if estimate > max_wait:
+            return self._shed(route, estimate)
+
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        route.waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=max_wait)
+        finally:
+            if not waiter.done():
+                # tempo esgotado ou requisição cancelada (cliente desconectou)
+                waiter.cancel()
+                route.waiters.remove(waiter)
+            elif asyncio.current_task().cancelling():
+                # a vaga chegou junto com o cancelamento: devolve
+                self._leave(route)
+        if not waiter.done() or waiter.cancelled():
+            return self._shed(route, estimate or max_wait)
+        route.queue_time.observe(time.monotonic() - started)
+        return None
+
+    def release(self, name: str, service_time: float) -> None:
+        route = self._routes[name]
+        route.service_time += _EWMA_ALPHA * (service_time - route.service_time)
+        self._leave(route)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "routes": {name: route.stats() for name, route in self._routes.items()},
+        }
+
+    # ---------------------------------------------------------------- vagas
+    def _can_run(self, route: _RouteState) -> bool:
+        return (
+            self.in_flight < self.max_concurrent
+            and route.in_flight < route.budget.max_concurrent
+        )
+
+    def _queued_ahead(self, route: _RouteState) -> int:
+        # fila de quem passa na frente; uma classe parada no próprio limite não conta
+        return sum(
+            len(other.waiters)
+            for other in self._by_priority
+            if other.budget.priority <= route.budget.priority
+            and (other is route or other.in_flight < other.budget.max_concurrent)
+        )
+
+    def _estimated_wait(self, route: _RouteState) -> float:
+        # quantas "levas" de requisições passam na frente, vezes o tempo de cada uma
+        slots = max(1, min(route.budget.max_concurrent, self.max_concurrent))
+        rounds = math.ceil((self._queued_ahead(route) + 1) / slots)
+        return rounds * route.service_time
+
+    def _enter(self, route: _RouteState) -> None:
+        self.in_flight += 1
+        route.in_flight += 1
+        route.admitted += 1
+
+    def _leave(self, route: _RouteState) -> None:
+        self.in_flight -= 1
+        route.in_flight -= 1
+        self._grant()
+
+    def _grant(self) -> None:
+        for route in self._by_priority:
+            while route.waiters and self._can_run(route):
+                waiter = route.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._enter(route)
+                waiter.set_result(None)
+            if self.in_flight >= self.max_concurrent:
+                return
+
+    def _shed(self, route: _RouteState, retry_after: float) -> float:
+        route.shed += 1
+        return max(1.0, retry_after)
@@ -0,0 +1,91 @@
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"            # recusa tudo até reset_timeout
+    HALF_OPEN = "half_open"  # deixa passar poucas chamadas de teste
+
+
+class CircuitBreaker:
+    """
+    Abre após ``failure_threshold`` falhas seguidas e recusa chamadas por
+    ``reset_timeout`` segundos. Depois deixa passar até ``half_open_calls``
+    chamadas de teste: um sucesso fecha, uma falha abre de novo.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @property
+    def state(self) -> BreakerState:
+        with self._lock:
+            return self._current()
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current()
+            if state is BreakerState.CLOSED:
+                return True
+            if state is BreakerState.HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            return False
+
+    def release_trial(self) -> None:
+        """Chamada liberada por ``allow`` que terminou sem resultado (bulkhead cheio, cancelada)."""
+        with self._lock:
+            if self._state is BreakerState.HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = BreakerState.CLOSED
+            self._failures = 0
+            self._trials = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            state = self._current()
+            self._failures += 1
+            if state is BreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = BreakerState.OPEN
+                self._opened_at = self._clock()
+                self._trials = 0
+                self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current().value,
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+            }
+
+    def _current(self) -> BreakerState:
+        if self._state is BreakerState.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = BreakerState.HALF_OPEN
+            self._trials = 0
+        return self._state
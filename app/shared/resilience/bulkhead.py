@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from typing import Any, Dict, Optional
+
+
+class Bulkhead:
+    """
+    Limite de chamadas simultâneas a uma dependência. Quem não consegue vaga em
+    ``max_wait`` segundos é recusado, então um serviço lento não prende todas
+    as threads (ou tarefas) que as outras dependências também precisam.
+    """
+
+    def __init__(self, max_concurrent: int, max_wait: float = 0.5):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self._threads = threading.BoundedSemaphore(max_concurrent)
+        self._tasks: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def acquire(self, wait: float) -> bool:
+        if not self._threads.acquire(timeout=max(0.0, min(wait, self.max_wait))):
+            return self._reject()
+        self._enter()
+        return True
+
+    def release(self) -> None:
+        self._leave()
+        self._threads.release()
+
+    async def acquire_async(self, wait: float) -> bool:
+        if self._tasks is None:
+            self._tasks = asyncio.Semaphore(self.max_concurrent)
+        try:
+            await asyncio.wait_for(self._tasks.acquire(), max(0.0, min(wait, self.max_wait)))
+        except asyncio.TimeoutError:
+            return self._reject()
+        self._enter()
+        return True
+
+    def release_async(self) -> None:
+        self._leave()
+        self._tasks.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrent": self.max_concurrent,
+            "rejected": self.rejected,
+        }
+
+    def _enter(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _reject(self) -> bool:
+        with self._lock:
+            self.rejected += 1
+        return False
@@ -0,0 +1,35 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# instante (time.monotonic) até o qual a requisição atual pode esperar por
+# serviços externos. Viaja com o contexto: run_in_threadpool e settle o copiam.
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Orçamento de tempo para as chamadas de saída do bloco. Aninhado, vale o menor."""
+    if seconds is None:
+        yield
+        return
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(at, current))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Segundos restantes do orçamento (pode ser <= 0), ou None sem orçamento."""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def budget(timeout: float) -> float:
+    """``timeout`` limitado ao que resta do orçamento da requisição."""
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
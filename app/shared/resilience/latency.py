@@ -0,0 +1,23 @@
+import threading
+from collections import deque
+from typing import Any, Dict
+
+
+class LatencyRecorder:
+    """Percentis das últimas ``window`` chamadas, em milissegundos."""
+
+    def __init__(self, window: int = 1024):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+        pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))], 2)
+        return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
@@ -0,0 +1,242 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.shared.exceptions.resilience import (
+    BulkheadFullError,
+    CircuitOpenError,
+    DeadlineExceededError,
+    DependencyUnavailableError,
+)
+from app.shared.resilience.breaker import CircuitBreaker
+from app.shared.resilience.bulkhead import Bulkhead
+from app.shared.resilience.deadline import budget, remaining
+from app.shared.resilience.latency import LatencyRecorder
+from app.shared.resilience.retry import NO_RETRY, RetryPolicy
+
+# send(timeout) -> resposta HTTP (requests.Response ou httpx.Response)
+Send = Callable[[float], Any]
+AsyncSend = Callable[[float], Awaitable[Any]]
+
+
+class Resilience:
+    """
+    Política de chamadas de saída para uma dependência. Cada tentativa usa o
+    menor entre ``timeout`` e o que resta do deadline da requisição, passa pelo
+    circuit breaker e pelo bulkhead, e respostas 5xx contam como falha. Só
+    chamadas ``idempotent`` são repetidas; ``hedge`` dispara uma segunda cópia
+    de um GET que passou de ``hedge_after`` segundos e fica com a que responder
+    primeiro (no modo sync precisa de ``executor``).
+
+    A resposta é devolvida como veio (inclusive 4xx/5xx) para o gateway tratar;
+    erros de transporte são relançados depois da última tentativa.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 5.0,
+        retry: RetryPolicy = NO_RETRY,
+        breaker: Optional[CircuitBreaker] = None,
+        bulkhead: Optional[Bulkhead] = None,
+        hedge_after: Optional[float] = None,
+        executor: Optional[Executor] = None,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.retry = retry
+        self.breaker = breaker
+        self.bulkhead = bulkhead
+        self.hedge_after = hedge_after
+        self.executor = executor
+        self.latency = LatencyRecorder()
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+
+    # ------------------------------------------------------------------ sync
+    def call(self, send: Send, idempotent: bool = False, hedge: bool = False):
+        hedge = hedge and self.hedge_after is not None and self.executor is not None
+        attempts = self.retry.attempts if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            if attempt > 1:
+                pause = self.retry.backoff(attempt - 1)
+                if not _fits(pause):
+                    break
+                self.retries += 1
+                time.sleep(pause)
+            try:
+                resp = self._hedged(send) if hedge else self._attempt(send)
+            except DependencyUnavailableError:
+                raise
+            except Exception as exc:
+                error, resp = exc, None
+            else:
+                error = None
+                if resp.status_code not in self.retry.retry_statuses:
+                    return resp
+        if error is not None:
+            raise error
+        return resp
+
+    def _attempt(self, send: Send):
+        timeout = self._admit()
+        settled = False
+        try:
+            if self.bulkhead is not None and not self.bulkhead.acquire(timeout):
+                raise BulkheadFullError(self.name, f"Limite de chamadas simultâneas a {self.name} atingido")
+            started = time.monotonic()
+            try:
+                resp = send(timeout)
+            except Exception:
+                settled = True
+                self._failed()
+                raise
+            finally:
+                self.latency.observe(time.monotonic() - started)
+                if self.bulkhead is not None:
+                    self.bulkhead.release()
+            settled = True
+            self._settled(resp)
+            return resp
+        finally:
+            if not settled:
+                self._unsettled()
+
+    def _hedged(self, send: Send):
+        first = self._submit(send)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if first in done:
+            return first.result()
+        self.hedges += 1
+        pending = {first, self._submit(send)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        # as duas falharam: vale o erro da chamada original
+        return first.result()
+
+    def _submit(self, send: Send) -> Future:
+        # cada tarefa leva uma cópia do contexto (deadline da requisição)
+        return self.executor.submit(contextvars.copy_context().run, self._attempt, send)
+
+    # ------------------------------------------------------------------ async
+    async def acall(self, send: AsyncSend, idempotent: bool = False, hedge: bool = False):
+        hedge = hedge and self.hedge_after is not None
+        attempts = self.retry.attempts if idempotent else 1
+        for attempt in range(1, attempts + 1):
+            if attempt > 1:
+                pause = self.retry.backoff(attempt - 1)
+                if not _fits(pause):
+                    break
+                self.retries += 1
+                await asyncio.sleep(pause)
+            try:
+                resp = await (self._hedged_async(send) if hedge else self._attempt_async(send))
+            except DependencyUnavailableError:
+                raise
+            except Exception as exc:
+                error, resp = exc, None
+            else:
+                error = None
+                if resp.status_code not in self.retry.retry_statuses:
+                    return resp
+        if error is not None:
+            raise error
+        return resp
+
+    async def _attempt_async(self, send: AsyncSend):
+        timeout = self._admit()
+        settled = False
+        try:
+            if self.bulkhead is not None and not await self.bulkhead.acquire_async(timeout):
+                raise BulkheadFullError(self.name, f"Limite de chamadas simultâneas a {self.name} atingido")
+            started = time.monotonic()
+            try:
+                resp = await send(timeout)
+            except Exception:  # CancelledError (cópia perdedora do hedge) não conta como falha
+                settled = True
+                self._failed()
+                raise
+            finally:
+                self.latency.observe(time.monotonic() - started)
+                if self.bulkhead is not None:
+                    self.bulkhead.release_async()
+            settled = True
+            self._settled(resp)
+            return resp
+        finally:
+            if not settled:
+                self._unsettled()
+
+    async def _hedged_async(self, send: AsyncSend):
+        first = asyncio.ensure_future(self._attempt_async(send))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if first in done:
+            return first.result()
+        self.hedges += 1
+        pending = {first, asyncio.ensure_future(self._attempt_async(send))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # ------------------------------------------------------------------ comum
+    def stats(self) -> Dict[str, Any]:
+        stats = {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            **self.latency.stats(),
+        }
+        if self.breaker is not None:
+            stats["breaker"] = self.breaker.stats()
+        if self.bulkhead is not None:
+            stats["bulkhead"] = self.bulkhead.stats()
+        return stats
+
+    def _admit(self) -> float:
+        self.calls += 1
+        timeout = budget(self.timeout)
+        if timeout <= 0:
+            raise DeadlineExceededError(self.name, f"Sem tempo para chamar {self.name}")
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError(
+                self.name, f"{self.name} indisponível (circuito aberto)", self.breaker.retry_after()
+            )
+        return timeout
+
+    def _failed(self) -> None:
+        self.failures += 1
+        if self.breaker is not None:
+            self.breaker.record_failure()
+
+    def _unsettled(self) -> None:
+        # sem sucesso nem falha (bulkhead cheio, cancelada): a vaga de teste
+        # do half-open volta, senão o circuito recusaria tudo para sempre
+        if self.breaker is not None:
+            self.breaker.release_trial()
+
+    def _settled(self, resp) -> None:
+        if resp.status_code >= 500:
+            self._failed()
+        elif self.breaker is not None:
+            self.breaker.record_success()
+
+
+def _fits(pause: float) -> bool:
+    # não vale esperar para tentar de novo se o deadline acaba antes
+    left = remaining()
+    return left is None or pause < left
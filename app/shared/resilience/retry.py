@@ -0,0 +1,24 @@
+import random
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Novas tentativas só para chamadas idempotentes, com backoff exponencial e
+    "full jitter" (espera sorteada entre 0 e o teto da tentativa) para que
+    instâncias diferentes não voltem todas ao mesmo tempo.
+    """
+
+    attempts: int = 3
+    base_delay: float = 0.05
+    max_delay: float = 1.0
+    # respostas tratadas como falha transitória
+    retry_statuses: frozenset = frozenset({502, 503, 504})
+
+    def backoff(self, attempt: int) -> float:
+        """Espera antes da tentativa ``attempt`` (1 = primeira repetição)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
@@ -0,0 +1,96 @@
+"""
+Custo por pedido das listagens (find_all + conversão para o corpo da resposta) em cada
+estratégia de carga: tempo de CPU e pico de memória alocada (tracemalloc).
+
+    python -m benchmarks.list_read_paths         # sqlite em memória, 10k pedidos
+    BENCH_DATABASE_URL=postgresql://... BENCH_ORDERS=10000 python -m benchmarks.list_read_paths
+"""
+import gc
+import os
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.adapters.driven.models.item import OrderItemModel
+from app.adapters.driven.models.order import OrderModel
+from app.adapters.driven.repositories.order import ItemLoading, OrderRepository
+from app.adapters.driver.controllers.order_render import order_out
+from app.shared.enums.order_status import OrderStatus
+from database import Base
+
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite://")
+ORDERS = int(os.getenv("BENCH_ORDERS", "10000"))
+ITEMS_PER_ORDER = int(os.getenv("BENCH_ITEMS", "3"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "3"))
+
+
+def _seed(engine) -> None:
+    statuses = list(OrderStatus)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(OrderModel),
+            [
+                {"id": n, "client_id": n % 100, "status": statuses[n % len(statuses)], "amount": 30.0}
+                for n in range(1, ORDERS + 1)
+            ],
+        )
+        conn.execute(
+            insert(OrderItemModel),
+            [
+                {
+                    "order_id": n,
+                    "product_id": f"SKU{k}",
+                    "product_name": f"Item {k}",
+                    "quantity": 1,
+                    "price": 10.0,
+                }
+                for n in range(1, ORDERS + 1)
+                for k in range(ITEMS_PER_ORDER)
+            ],
+        )
+
+
+def _list(Session, loading: ItemLoading):
+    with Session() as db:
+        return [order_out(o) for o in OrderRepository(db, loading=loading).find_all()]
+
+
+def _measure(Session, loading: ItemLoading):
+    _list(Session, loading)  # aquece caches de compilação do SQLAlchemy
+
+    cpu = float("inf")
+    for _ in range(ROUNDS):
+        gc.collect()
+        started = time.process_time()
+        _list(Session, loading)
+        cpu = min(cpu, time.process_time() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    _list(Session, loading)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak
+
+
+def main() -> None:
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    _seed(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    print(f"{ORDERS} pedidos x {ITEMS_PER_ORDER} itens")
+    print(f"{'carga':>9} {'CPU total (ms)':>15} {'µs/pedido':>10} {'pico (MiB)':>11}")
+    for loading in (ItemLoading.SELECTIN, ItemLoading.JOINED, ItemLoading.BATCH, ItemLoading.CORE):
+        cpu, peak = _measure(Session, loading)
+        print(
+            f"{loading.value:>9} {cpu * 1000:>15.0f} {cpu / ORDERS * 1e6:>10.1f} "
+            f"{peak / 2**20:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
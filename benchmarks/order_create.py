@@ -0,0 +1,86 @@
+"""
+Compara pedidos/s do OrderRepository.create antigo (add + flush + refresh) com o
+atual (INSERT ... RETURNING + INSERT multi-linha) para pedidos com 1, 5 e 20 itens.
+
+    python -m benchmarks.order_create            # sqlite em memória
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.order_create
+"""
+import os
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.adapters.driven.models.item import OrderItemModel
+from app.adapters.driven.models.order import OrderModel
+from app.adapters.driven.repositories.order import OrderRepository
+from app.domain.entities.item import OrderItem
+from app.domain.entities.order import Order
+from database import Base
+
+DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite://")
+DURATION = float(os.getenv("BENCH_SECONDS", "2"))
+
+
+def legacy_create(db: Session, order: Order) -> Order:
+    """Implementação anterior de OrderRepository.create, mantida só para comparação."""
+    order_model = OrderModel(client_id=order.client_id, status=order.status, amount=order.amount)
+    db.add(order_model)
+    db.flush()
+
+    item_models = []
+    for item in order.items:
+        im = OrderItemModel(
+            order_id=order_model.id,
+            product_id=item.product_id,
+            product_name=item.name,
+            quantity=item.quantity,
+            price=item.price,
+        )
+        db.add(im)
+        item_models.append(im)
+
+    db.commit()
+    db.refresh(order_model)
+    return OrderRepository(db)._to_entity(order_model, item_models)
+
+
+def _order(lines: int) -> Order:
+    return Order(
+        client_id=1,
+        amount=10.0 * lines,
+        items=[
+            OrderItem(product_id=f"SKU{n}", name=f"Item {n}", quantity=1, price=10.0)
+            for n in range(lines)
+        ],
+    )
+
+
+def _rate(Session, create, lines: int) -> float:
+    done = 0
+    with Session() as db:
+        deadline = time.perf_counter() + DURATION
+        started = time.perf_counter()
+        while time.perf_counter() < deadline:
+            create(db, _order(lines))
+            done += 1
+        return done / (time.perf_counter() - started)
+
+
+def main() -> None:
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    print(f"{'itens':>5} {'antes (ped/s)':>14} {'depois (ped/s)':>15} {'ganho':>7}")
+    for lines in (1, 5, 20):
+        before = _rate(Session, legacy_create, lines)
+        after = _rate(Session, lambda db, o: OrderRepository(db).create(o), lines)
+        print(f"{lines:>5} {before:>14.0f} {after:>15.0f} {after / before:>6.2f}x")
+
+    Base.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
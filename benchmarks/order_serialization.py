@@ -0,0 +1,89 @@
+"""
+Tempo para transformar N pedidos no corpo JSON de GET /orders: caminho antigo
+(OrderOut montado à mão, revalidado pelo response_model e codificado com o json
+da stdlib) contra o atual (dict direto para orjson).
+
+    python -m benchmarks.order_serialization
+    BENCH_SIZES=1000,10000,50000 BENCH_ITEMS=5 python -m benchmarks.order_serialization
+"""
+import json
+import os
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app.adapters.driver.controllers.order_render import orders_json
+from app.adapters.driver.controllers.order_schemas import OrderItemOut, OrderOut
+from app.domain.entities.item import OrderItem
+from app.domain.entities.order import Order
+from app.shared.enums.order_status import OrderStatus
+
+SIZES = [int(n) for n in os.getenv("BENCH_SIZES", "1000,10000").split(",")]
+ITEMS_PER_ORDER = int(os.getenv("BENCH_ITEMS", "3"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "5"))
+
+_response_field = TypeAdapter(List[OrderOut])
+
+
+def legacy_to_out(order: Order) -> OrderOut:
+    """Conversão anterior do controller (_to_out), mantida só para comparação."""
+    return OrderOut(
+        id=order.id,
+        client_id=order.client_id,
+        status=order.status,
+        amount=order.amount,
+        items=[
+            OrderItemOut(product_id=i.product_id, name=i.name, quantity=i.quantity, price=i.price)
+            for i in order.items
+        ],
+    )
+
+
+def legacy_body(orders: List[Order]) -> bytes:
+    # o que o FastAPI fazia com o retorno: valida de novo contra o response_model,
+    # converte para tipos JSON e codifica com json.dumps
+    models = [legacy_to_out(o) for o in orders]
+    validated = _response_field.validate_python(models, from_attributes=True)
+    content = _response_field.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _orders(count: int) -> List[Order]:
+    statuses = list(OrderStatus)
+    return [
+        Order(
+            id=n,
+            client_id=n % 100,
+            status=statuses[n % len(statuses)],
+            amount=30.0,
+            items=[
+                OrderItem(product_id=f"SKU{k}", name=f"Item {k}", quantity=1, price=10.0)
+                for k in range(ITEMS_PER_ORDER)
+            ],
+        )
+        for n in range(1, count + 1)
+    ]
+
+
+def _best(fn, orders) -> float:
+    fn(orders)
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        fn(orders)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    print(f"{'pedidos':>8} {'antigo (ms)':>12} {'orjson (ms)':>12} {'ganho':>7}")
+    for size in SIZES:
+        orders = _orders(size)
+        assert json.loads(legacy_body(orders)) == json.loads(orders_json(orders))
+        before, after = _best(legacy_body, orders), _best(orders_json, orders)
+        print(f"{size:>8} {before * 1000:>12.1f} {after * 1000:>12.1f} {before / after:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import os
+from typing import Optional
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 load_dotenv()
 
@@ -12,14 +15,162 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASS")
 DB_NAME = os.getenv("DB_NAME")
 SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=False)
+# Réplica de leitura (opcional). Sem DB_READ_HOST as leituras vão para o primário.
+DB_READ_HOST = os.getenv("DB_READ_HOST")
+DB_READ_PORT = os.getenv("DB_READ_PORT", DB_PORT)
+READ_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_READ_HOST}:{DB_READ_PORT}/{DB_NAME}"
+ASYNC_READ_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_READ_HOST}:{DB_READ_PORT}/{DB_NAME}"
+
+# Pool e timeouts
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "2"))
+# réplica fora do ar é descoberta em segundos, não no timeout padrão do driver
+DB_REPLICA_CONNECT_TIMEOUT_SECONDS = int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT_SECONDS", "2"))
+
+
+def _engine_options(is_async: bool = False, connect_timeout: Optional[int] = None) -> dict:
+    options = dict(
+        echo=False,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    connect_args = {}
+    # statement_timeout vai no handshake da conexão, então vale para toda sessão
+    # que usar a conexão sem custar um SET extra por transação
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+    if connect_timeout:
+        connect_args["timeout" if is_async else "connect_timeout"] = connect_timeout
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Caminho assíncrono (ORDER_IO_MODE=async). expire_on_commit=False porque não há
+# lazy load em AsyncSession: atributos expirados não podem ser recarregados.
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **_engine_options(is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+read_engine = None
+ReadSessionLocal = None
+async_read_engine = None
+AsyncReadSessionLocal = None
+if DB_READ_HOST:
+    read_engine = create_engine(
+        READ_DATABASE_URL, **_engine_options(connect_timeout=DB_REPLICA_CONNECT_TIMEOUT_SECONDS)
+    )
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+    async_read_engine = create_async_engine(
+        ASYNC_READ_DATABASE_URL,
+        **_engine_options(is_async=True, connect_timeout=DB_REPLICA_CONNECT_TIMEOUT_SECONDS),
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_read_engine, autoflush=False, expire_on_commit=False
+    )
+
+
+# Atraso de replay da réplica em segundos; 0 quando já aplicou tudo o que recebeu
+# (sem isso uma réplica ociosa pareceria atrasada).
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaLagMonitor:
+    """
+    Último atraso medido da réplica e se ela pode atender leituras. A medição
+    (``check``/``check_async``) roda numa tarefa de fundo a cada
+    DB_REPLICA_LAG_CHECK_INTERVAL segundos; as requisições só consultam
+    ``healthy``, sem I/O. Erro na medição conta como réplica indisponível.
+    """
+
+    def __init__(self, max_lag: float):
+        self.max_lag = max_lag
+        self.lag: Optional[float] = None
+        self._healthy = False
+
+    def healthy(self) -> bool:
+        return self._healthy
+
+    def check(self, engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                lag = conn.execute(REPLICA_LAG_SQL).scalar()
+        except SQLAlchemyError:
+            lag = None
+        return self._record(lag)
+
+    async def check_async(self, engine) -> bool:
+        try:
+            async with engine.connect() as conn:
+                lag = (await conn.execute(REPLICA_LAG_SQL)).scalar()
+        except SQLAlchemyError:
+            lag = None
+        return self._record(lag)
+
+    def _record(self, lag) -> bool:
+        self.lag = None if lag is None else float(lag)
+        self._healthy = self.lag is not None and self.lag <= self.max_lag
+        return self._healthy
+
+
+replica_monitor = ReplicaLagMonitor(DB_REPLICA_MAX_LAG_SECONDS)
+
+
+def read_session() -> Session:
+    """Sessão para consultas somente leitura: réplica se estiver em dia, senão primário."""
+    if ReadSessionLocal is not None and replica_monitor.healthy():
+        return ReadSessionLocal()
+    return SessionLocal()
+
+
 def get_db_session():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db_session():
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db_session():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def async_read_session():
+    """Versão assíncrona de ``read_session``."""
+    if AsyncReadSessionLocal is not None and replica_monitor.healthy():
+        return AsyncReadSessionLocal()
+    return AsyncSessionLocal()
+
+
+async def get_async_read_db_session():
+    async with await async_read_session() as db:
+        yield db
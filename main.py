@@ -1,7 +1,18 @@
+import math
+import os
 import traceback
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.adapters.driver.admission import AdmissionMiddleware
+from app.adapters.driver.controllers.kitchen_stream_controller import router as kitchen_stream_router
+from app.adapters.driver.controllers.metrics_controller import router as metrics_router
 from app.adapters.driver.controllers.order_controller import router as order_router
+from app.adapters.driver.controllers.payment_webhook_controller import router as payment_webhook_router
+from app.adapters.driver.dependencias.container import REQUEST_DEADLINE_SECONDS, container
+from app.shared.exceptions.resilience import DependencyUnavailableError
+from app.shared.resilience import deadline
 from fastapi.security import OAuth2PasswordBearer, HTTPBearer
 
 from database import SQLALCHEMY_DATABASE_URL, engine
@@ -10,15 +21,45 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 bearer_scheme = HTTPBearer()
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # clientes HTTP, gateways e workers vivem o tempo da aplicação
+    await container.start()
+    try:
+        yield
+    finally:
+        await container.stop()
+
+
+async def request_deadline(request: Request, call_next):
+    # vale para todas as chamadas de saída feitas por esta requisição
+    with deadline(REQUEST_DEADLINE_SECONDS or None):
+        return await call_next(request)
+
+
+async def dependency_unavailable(request: Request, exc: DependencyUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="Order Service")
+    app = FastAPI(title="Order Service", lifespan=lifespan)
+    if container.admission is not None:
+        # dentro do deadline: o tempo na fila conta no orçamento da requisição
+        app.add_middleware(AdmissionMiddleware, controller=container.admission)
+    app.middleware("http")(request_deadline)
+    app.add_exception_handler(DependencyUnavailableError, dependency_unavailable)
     app.include_router(order_router, prefix="/api", tags=["orders"])
+    app.include_router(kitchen_stream_router, prefix="/api", tags=["orders"])
+    app.include_router(payment_webhook_router, prefix="/api", tags=["payments"])
+    app.include_router(metrics_router, prefix="/api", tags=["metrics"])
     return app
 
 app = create_app()
 
-import os
-
 for key in ["DB_USER", "DB_PASS", "DB_HOST", "DB_NAME"]:
     print(f"{key} = {repr(os.getenv(key))}")
 
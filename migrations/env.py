@@ -57,6 +57,13 @@ def run_migrations_online() -> None:
     Rodar migrações em modo 'online':
     Cria Engine e conecta de verdade no BD.
     """
+    # conexão entregue por quem chamou (ex.: testes de integração com
+    # command.upgrade); sem ela, conecta na URL montada acima
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with(connection)
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -64,9 +71,13 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-        with context.begin_transaction():
-            context.run_migrations()
+        _run_with(connection)
+
+
+def _run_with(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 # Alembic decide, em tempo de execução, se é offline ou online
@@ -0,0 +1,36 @@
+"""order payments projection
+
+Revision ID: 3f8a6c0d2b71
+Revises: 7d1e4c2b9a10
+Create Date: 2026-10-18 14:03:27.551902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8a6c0d2b71'
+down_revision: Union[str, None] = '7d1e4c2b9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('order_payments',
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PAID', 'FAILED', 'CANCELED', name='paymentstatus'), nullable=False),
+    sa.Column('event_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('order_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('order_payments')
+    sa.Enum(name='paymentstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,58 @@
+"""hot query indexes
+
+Revision ID: 7d1e4c2b9a10
+Revises: 62cc65aad4dc
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1e4c2b9a10'
+down_revision: Union[str, None] = '62cc65aad4dc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Precisa ser idêntica à expressão de app.adapters.driven.models.order.status_priority,
+# senão o planner não usa o índice para o ORDER BY da fila.
+ACTIVE_QUEUE_PRIORITY = (
+    "CASE WHEN (status = 'READY') THEN 1 "
+    "WHEN (status = 'IN_PROGRESS') THEN 2 "
+    "WHEN (status = 'RECEIVED') THEN 3 "
+    "ELSE 9999 END"
+)
+# idem para app.adapters.driven.models.order.active_queue_filter
+ACTIVE_QUEUE_WHERE = "active = true AND status != 'COMPLETED'"
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_order_items_order_id', 'order_items', ['order_id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_orders_client_id', 'orders', ['client_id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_orders_active_queue', 'orders', [sa.text(f"({ACTIVE_QUEUE_PRIORITY})"), 'id'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+            postgresql_where=sa.text(ACTIVE_QUEUE_WHERE),
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_orders_active_queue', table_name='orders',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_orders_client_id', table_name='orders',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_order_items_order_id', table_name='order_items',
+                      postgresql_concurrently=True, if_exists=True)
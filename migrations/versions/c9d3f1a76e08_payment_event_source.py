@@ -0,0 +1,30 @@
+"""payment event source
+
+Revision ID: c9d3f1a76e08
+Revises: e4a17c9b3f25
+Create Date: 2026-10-18 21:40:12.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d3f1a76e08'
+down_revision: Union[str, None] = 'e4a17c9b3f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PAYMENT_SOURCE = sa.Enum('WEBHOOK', 'POLL', name='paymentsource')
+
+
+def upgrade() -> None:
+    PAYMENT_SOURCE.create(op.get_bind(), checkfirst=True)
+    op.add_column('order_payments', sa.Column('source', PAYMENT_SOURCE, server_default='WEBHOOK', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('order_payments', 'source')
+    PAYMENT_SOURCE.drop(op.get_bind(), checkfirst=True)
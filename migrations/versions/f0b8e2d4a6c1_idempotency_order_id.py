@@ -0,0 +1,26 @@
+"""idempotency key order id
+
+Revision ID: f0b8e2d4a6c1
+Revises: c9d3f1a76e08
+Create Date: 2026-10-18 22:15:08.274113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f0b8e2d4a6c1'
+down_revision: Union[str, None] = 'c9d3f1a76e08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('idempotency_keys', sa.Column('order_id', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('idempotency_keys', 'order_id')
@@ -0,0 +1,29 @@
+Feature: Reservar estoque em lote
+
+  Scenario: Lote aceito com linhas repetidas somadas
+    Given o catálogo aceita reservas em lote
+    When eu reservar em lote "ABC:2, XYZ:1, ABC:1"
+    Then a reserva deve acontecer sem erros
+    And o catálogo deve receber um único lote com "ABC:3, XYZ:1"
+
+  Scenario: Lote recusado por falta de estoque
+    Given o catálogo recusa o lote por falta de estoque de "XYZ"
+    When eu reservar em lote "ABC:1, XYZ:5"
+    Then deve lançar erro "Estoque insuficiente para XYZ"
+
+  Scenario: Catálogo sem lote reserva item a item
+    Given o catálogo não suporta reservas em lote
+    And o produto "ABC" possui estoque
+    And o produto "XYZ" possui estoque
+    When eu reservar em lote "ABC:1, XYZ:2, ABC:1"
+    Then a reserva deve acontecer sem erros
+    And o catálogo deve receber as reservas "ABC:2, XYZ:2" item a item
+
+  Scenario: Falha no item a item devolve o que já foi reservado
+    Given o catálogo não suporta reservas em lote
+    And o produto "ABC" possui estoque
+    And o produto "XYZ" não possui estoque suficiente
+    And o catálogo aceita devolver "ABC"
+    When eu reservar em lote "ABC:2, XYZ:5"
+    Then deve lançar erro "Estoque insuficiente para XYZ"
+    And a reserva de 2 unidades de "ABC" deve ser devolvida
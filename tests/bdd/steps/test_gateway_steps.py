@@ -1,4 +1,5 @@
-from typing import Any, Dict
+import json
+from typing import Any, Dict, List, Tuple
 
 import pytest
 import responses
@@ -43,6 +44,18 @@ def _stub_reserve(rs, pid: str, qty: int, status: int):
         rs.add(responses.POST, url, json={"error": "no stock"}, status=status)
 
 
+def _parse_lines(spec: str) -> List[Tuple[str, int]]:
+    return [(pid.strip(), int(qty)) for pid, qty in (part.split(":") for part in spec.split(","))]
+
+
+def _bodies(rs, suffix: str) -> List[Dict[str, Any]]:
+    return [
+        json.loads(call.request.body)
+        for call in rs.calls
+        if call.request.method == "POST" and call.request.url.endswith(suffix)
+    ]
+
+
 # ───────────── GIVEN ─────────────
 @given(parsers.parse('um produto "{pid}" existe no catálogo'))
 def _(pid, mock_rs):
@@ -61,6 +74,31 @@ def _(pid, mock_rs):
     _stub_reserve(mock_rs, pid, qty=5, status=409)
 
 
+@given("o catálogo aceita reservas em lote")
+def _(mock_rs, ctx):
+    ctx["gateway"] = ProductCatalogGateway()
+    mock_rs.add(responses.POST, f"{CATALOG_BASE_URL}/products/reserve", status=204)
+
+@given(parsers.parse('o catálogo recusa o lote por falta de estoque de "{pid}"'))
+def _(pid, mock_rs, ctx):
+    ctx["gateway"] = ProductCatalogGateway()
+    mock_rs.add(
+        responses.POST,
+        f"{CATALOG_BASE_URL}/products/reserve",
+        json={"product_id": pid},
+        status=409,
+    )
+
+@given("o catálogo não suporta reservas em lote")
+def _(mock_rs, ctx):
+    ctx["gateway"] = ProductCatalogGateway()
+    mock_rs.add(responses.POST, f"{CATALOG_BASE_URL}/products/reserve", status=405)
+
+@given(parsers.parse('o catálogo aceita devolver "{pid}"'))
+def _(pid, mock_rs):
+    mock_rs.add(responses.POST, f"{CATALOG_BASE_URL}/products/{pid}/release", status=204)
+
+
 # ───────────── WHEN ─────────────
 @when(parsers.parse('eu chamar get_product com "{pid}"'))
 def _(pid, ctx):
@@ -77,6 +115,14 @@ def _(pid, qty: int, ctx):
         ctx["error"] = exc
 
 
+@when(parsers.parse('eu reservar em lote "{spec}"'))
+def _(spec, ctx):
+    try:
+        ctx["gateway"].reserve_many(_parse_lines(spec))
+    except Exception as exc:
+        ctx["error"] = exc
+
+
 # ───────────── THEN ─────────────
 @then("devo receber os dados do produto")
 def _(ctx):
@@ -91,3 +137,18 @@ def _(msg, ctx):
 @then("a reserva deve acontecer sem erros")
 def _(ctx):
     assert "error" not in ctx
+
+@then(parsers.parse('o catálogo deve receber um único lote com "{spec}"'))
+def _(spec, mock_rs):
+    expected = [{"product_id": p, "qty": q} for p, q in _parse_lines(spec)]
+    assert _bodies(mock_rs, "/products/reserve") == [{"items": expected}]
+
+@then(parsers.parse('o catálogo deve receber as reservas "{spec}" item a item'))
+def _(spec, mock_rs, ctx):
+    for pid, qty in _parse_lines(spec):
+        assert _bodies(mock_rs, f"/products/{pid}/reserve") == [{"qty": qty}]
+    assert ctx["gateway"].bulk_supported is False
+
+@then(parsers.parse('a reserva de {qty:d} unidades de "{pid}" deve ser devolvida'))
+def _(qty: int, pid, mock_rs):
+    assert _bodies(mock_rs, f"/products/{pid}/release") == [{"qty": qty}]
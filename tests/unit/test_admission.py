@@ -0,0 +1,120 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.adapters.driver.admission import AdmissionMiddleware, route_class
+from app.shared.resilience import AdmissionController, RouteBudget
+
+
+def _controller(max_concurrent=1, **limits):
+    budgets = {
+        "status": RouteBudget(limits.get("status", 4), max_wait=1.0, priority=0),
+        "create": RouteBudget(limits.get("create", 4), max_wait=1.0, priority=1),
+        "read": RouteBudget(limits.get("read", 4), max_wait=0.05, priority=2),
+    }
+    return AdmissionController(budgets, max_concurrent)
+
+
+def test_route_classes():
+    assert route_class("PATCH", "/api/orders/7/status") == "status"
+    assert route_class("POST", "/api/payments/webhook") == "status"
+    assert route_class("POST", "/api/orders") == "create"
+    assert route_class("GET", "/api/orders/active") == "read"
+    assert route_class("GET", "/api/orders/export") == "export"
+    assert route_class("GET", "/api/orders/42") == "read"
+    assert route_class("GET", "/api/orders/active/stream") is None
+    assert route_class("GET", "/api/metrics") is None
+
+
+def test_status_updates_jump_ahead_of_queued_reads():
+    async def scenario():
+        ctrl = _controller(max_concurrent=1)
+        assert await ctrl.acquire("read") is None  # ocupa a única vaga
+
+        granted = []
+
+        async def request(name):
+            assert await ctrl.acquire(name) is None
+            granted.append(name)
+
+        read = asyncio.create_task(request("read"))
+        await asyncio.sleep(0)
+        status = asyncio.create_task(request("status"))
+        await asyncio.sleep(0)
+        # com alguém na fila, a leitura nova não fura a fila
+        assert ctrl.stats()["routes"]["read"]["queued"] == 1
+
+        ctrl.release("read", 0.01)
+        await status
+        assert granted == ["status"]
+        ctrl.release("status", 0.01)
+        await read
+        assert granted == ["status", "read"]
+        ctrl.release("read", 0.01)
+        assert ctrl.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_sheds_after_wait_and_fast_when_queue_is_too_long():
+    async def scenario():
+        ctrl = _controller(max_concurrent=2, read=1)
+        assert await ctrl.acquire("read") is None
+        # limite da classe: espera até max_wait e desiste
+        assert await ctrl.acquire("read") == 1.0
+        # as outras classes ainda têm vaga no limite global
+        assert await ctrl.acquire("create") is None
+
+        ctrl.release("read", 10.0)  # tempo de serviço aprendido: leituras lentas
+        ctrl.release("create", 0.01)
+        assert await ctrl.acquire("read") is None
+        # espera estimada (10s * 0.2 de peso) passa do alvo: recusa sem esperar
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        assert await ctrl.acquire("read") == 2.0
+        assert loop.time() - started < 0.05
+
+        stats = ctrl.stats()["routes"]["read"]
+        assert stats["shed"] == 2 and stats["admitted"] == 2 and stats["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        ctrl = _controller(max_concurrent=1)
+        await ctrl.acquire("status")
+        waiting = asyncio.create_task(ctrl.acquire("create"))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert ctrl.stats()["routes"]["create"]["queued"] == 0
+
+        ctrl.release("status", 0.01)
+        assert ctrl.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_middleware_answers_503_with_retry_after():
+    ctrl = _controller(max_concurrent=1)
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=ctrl)
+
+    @app.get("/orders")
+    def orders():
+        return []
+
+    @app.get("/metrics")
+    def metrics():
+        return {}
+
+    client = TestClient(app)
+    assert client.get("/orders").status_code == 200
+    assert ctrl.in_flight == 0
+
+    ctrl.in_flight = 1  # vaga global ocupada por outra requisição
+    resp = client.get("/orders")
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
+    assert client.get("/metrics").status_code == 200  # fora do controle
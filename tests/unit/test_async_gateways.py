@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.adapters.driven.gateways.customer_auth_http import AsyncCustomerAuthHttp
+from app.adapters.driven.gateways.payment_status_http import (
+    IDEMPOTENCY_HEADER,
+    AsyncPaymentGatewayHttp,
+)
+from app.adapters.driven.gateways.product_catalog_gateway import (
+    CATALOG_BASE_URL,
+    AsyncProductCatalogGateway,
+)
+from app.shared.enums.payment_status import PaymentStatus
+from app.shared.exceptions.customer import InvalidTokenError
+from app.shared.exceptions.resilience import DependencyUnavailableError
+
+
+def _client(routes):
+    def handler(request: httpx.Request) -> httpx.Response:
+        status, body = routes[(request.method, str(request.url))]
+        return httpx.Response(status, json=body)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_catalog_get_and_reserve():
+    client = _client({
+        ("GET", f"{CATALOG_BASE_URL}/products/ABC"): (200, {"id": "ABC", "name": "Banana"}),
+        ("GET", f"{CATALOG_BASE_URL}/products/NOPE"): (404, {}),
+        ("POST", f"{CATALOG_BASE_URL}/products/ABC/reserve"): (204, None),
+        ("POST", f"{CATALOG_BASE_URL}/products/XYZ/reserve"): (409, {}),
+    })
+    gateway = AsyncProductCatalogGateway(client)
+
+    async def scenario():
+        assert (await gateway.get_product("ABC"))["name"] == "Banana"
+        with pytest.raises(ValueError, match="Produto NOPE não encontrado"):
+            await gateway.get_product("NOPE")
+        await gateway.reserve_stock("ABC", 2)
+        with pytest.raises(ValueError, match="Estoque insuficiente para XYZ"):
+            await gateway.reserve_stock("XYZ", 5)
+
+    asyncio.run(scenario())
+
+
+def test_payment_gateway():
+    client = _client({
+        ("GET", "http://pay/api/payment/7"): (200, {"status": "PAID"}),
+        ("POST", "http://pay/api/payment"): (201, {"qr_data": "QR"}),
+    })
+    gateway = AsyncPaymentGatewayHttp("http://pay/", client)
+
+    async def scenario():
+        assert await gateway.get_status(7) is PaymentStatus.PAID
+        assert await gateway.create_payment(7, 10.0) == ("QR", PaymentStatus.PENDING)
+
+    asyncio.run(scenario())
+
+
+def test_payment_creation_sends_the_order_idempotency_key():
+    keys = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        keys.append(request.headers.get(IDEMPOTENCY_HEADER))
+        return httpx.Response(201, json={"qr_data": "QR"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    gateway = AsyncPaymentGatewayHttp("http://pay", client)
+
+    async def scenario():
+        # reenvio do outbox: mesma chave, o gateway não cobra duas vezes
+        for _ in range(2):
+            await gateway.create_payment(7, 10.0)
+
+    asyncio.run(scenario())
+    assert keys == ["order-7", "order-7"]
+
+
+@pytest.mark.parametrize(
+    "status, outcome",
+    [
+        (200, 42),
+        (401, InvalidTokenError),
+        (404, "Cliente não encontrado ou inativo"),
+        (502, DependencyUnavailableError),
+    ],
+)
+def test_customer_auth(status, outcome):
+    client = _client({("POST", "http://customers/api/auth"): (status, {"id": 42})})
+    gateway = AsyncCustomerAuthHttp("http://customers", client)
+
+    async def scenario():
+        if isinstance(outcome, int):
+            assert await gateway.verify_token("tok") == outcome
+        elif isinstance(outcome, type):
+            with pytest.raises(outcome):
+                await gateway.verify_token("tok")
+        else:
+            with pytest.raises(ValueError, match=outcome):
+                await gateway.verify_token("tok")
+
+    asyncio.run(scenario())
@@ -0,0 +1,109 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.adapters.driven.gateways.cached_product_catalog import (
+    AsyncCachedProductCatalogGateway,
+    CachedProductCatalogGateway,
+)
+from app.shared.cache.ttl_lru import Freshness, TTLCache
+from app.shared.exceptions.catalog import ProductNotFoundError
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Catalog:
+    def __init__(self):
+        self.calls = []
+        self.price = 10
+
+    def get_product(self, pid):
+        self.calls.append(pid)
+        if pid == "missing":
+            raise ProductNotFoundError(f"Produto {pid} não encontrado")
+        return {"id": pid, "name": "Burger", "price": self.price, "stock": 3}
+
+    def list_products(self):
+        return [{"id": n, "name": f"P{n}", "price": n, "stock": 1} for n in range(3)]
+
+
+def _cache(clock, maxsize=10):
+    return TTLCache(maxsize=maxsize, ttl=10, stale_ttl=50, negative_ttl=5, clock=clock)
+
+
+def test_ttl_lru_freshness_and_eviction():
+    clock = _Clock()
+    cache = _cache(clock, maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.lookup("a")            # "a" passa a ser o mais recente
+    cache.put("c", 3)            # expulsa "b"
+    assert cache.lookup("b")[0] is Freshness.MISSING
+
+    clock.now = 11
+    assert cache.lookup("a") == (Freshness.STALE, 1, False)
+    clock.now = 61
+    assert cache.lookup("a")[0] is Freshness.MISSING
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["stale_hits"] == 1 and stats["expirations"] >= 1
+
+
+def test_cached_gateway_hits_negative_and_warm_up():
+    clock, inner = _Clock(), _Catalog()
+    gateway = CachedProductCatalogGateway(inner, _cache(clock))
+
+    assert gateway.get_product("A")["stock"] == 3      # miss: resposta completa
+    assert "stock" not in gateway.get_product("A")     # hit: estoque não é guardado
+    for _ in range(2):
+        with pytest.raises(ProductNotFoundError):
+            gateway.get_product("missing")
+    assert inner.calls == ["A", "missing"]
+
+    clock.now = 6                                      # negativo expira antes
+    with pytest.raises(ProductNotFoundError):
+        gateway.get_product("missing")
+
+    assert gateway.warm_up() == 3
+    assert gateway.get_product(1)["name"] == "P1"
+    assert inner.calls == ["A", "missing", "missing"]
+
+
+def test_stale_entry_is_served_while_refreshing():
+    clock, inner = _Clock(), _Catalog()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        gateway = CachedProductCatalogGateway(inner, _cache(clock), pool)
+        gateway.get_product("A")
+        inner.price = 20
+        clock.now = 15
+        assert gateway.get_product("A")["price"] == 10   # vencido, servido na hora
+    assert gateway.get_product("A")["price"] == 20       # já renovado
+    assert gateway.stats()["refreshes"] == 1
+
+
+def test_async_stale_entry_is_refreshed_in_background():
+    clock, inner = _Clock(), _Catalog()
+
+    class _Async:
+        async def get_product(self, pid):
+            return inner.get_product(pid)
+
+    gateway = AsyncCachedProductCatalogGateway(_Async(), _cache(clock))
+
+    async def scenario():
+        await gateway.get_product("A")
+        inner.price = 20
+        clock.now = 15
+        stale = await gateway.get_product("A")
+        await asyncio.gather(*gateway._refreshing.values())
+        return stale, await gateway.get_product("A")
+
+    stale, fresh = asyncio.run(scenario())
+    assert (stale["price"], fresh["price"]) == (10, 20)
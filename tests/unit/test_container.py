@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+import app.adapters.driver.dependencias.container as ct
+from app.shared import metrics
+from app.domain.services.create_order_service import CreateOrderService
+from app.domain.services.update_order_service import UpdateOrderStatusService
+
+
+@pytest.fixture
+def container(monkeypatch):
+    monkeypatch.setattr(ct, "KITCHEN_QUEUE_ENABLED", False)
+    monkeypatch.setattr(ct, "PAYMENT_RECONCILE_ENABLED", False)
+    monkeypatch.setattr(ct, "CATALOG_CACHE_WARM_UP", False)
+    monkeypatch.setattr(ct, "build_verifier", lambda fetch=None: None)
+    monkeypatch.setattr(ct, "container", ct.Container())
+    return ct.container
+
+
+def test_gateways_share_app_scoped_clients(container):
+    with pytest.raises(RuntimeError):
+        ct._started_container()
+
+    asyncio.run(container.start())
+    http = container.http_client
+    assert container.payment_gateway.client is http
+    assert container.customer_auth.client is http
+    assert container.catalog.inner.session is container.catalog_session
+    if not ct.ASYNC_IO:
+        # cobranças do outbox em threads próprias, fora do pool das requisições
+        assert container.payment_outbox_executor is not None
+    assert "catalog_cache" in metrics.snapshot()
+
+    started = ct._started_container()
+    create = ct.get_create_order_service(repo="repo", c=started)
+    update = ct.get_update_order_status_service(repo="repo", payments=None, c=started)
+    assert isinstance(create, CreateOrderService) and create.catalog is container.catalog
+    assert isinstance(update, UpdateOrderStatusService)
+    assert update.kitchen_queue is container.kitchen_queue
+
+    asyncio.run(container.stop())
+    assert http.is_closed
+    assert container.http_client is None and not container.started
+    assert container.payment_outbox_executor is None
+    assert "catalog_cache" not in metrics.snapshot()
@@ -0,0 +1,119 @@
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+
+from sqlalchemy.exc import OperationalError
+
+import database as db
+from app.adapters.driver.workers.replica_lag import ReplicaLagProbe
+
+
+class _FakeEngine:
+    def __init__(self, lag):
+        self.lag = lag
+        self.checks = 0
+
+    def _result(self):
+        self.checks += 1
+        if isinstance(self.lag, Exception):
+            raise self.lag
+        return self
+
+    def scalar(self):
+        return self.lag
+
+    @contextmanager
+    def connect(self):
+        yield self
+
+    def execute(self, _):
+        return self._result()
+
+
+class _FakeAsyncEngine(_FakeEngine):
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+
+    async def execute(self, _):
+        return self._result()
+
+
+def test_monitor_compares_lag_with_threshold():
+    monitor = db.ReplicaLagMonitor(max_lag=5)
+    assert monitor.healthy() is False  # antes da primeira medição
+    assert monitor.check(_FakeEngine(1.5)) is True and monitor.lag == 1.5
+    assert monitor.healthy() is True
+    assert monitor.check(_FakeEngine(30)) is False and monitor.healthy() is False
+
+
+def test_monitor_treats_errors_as_unhealthy():
+    monitor = db.ReplicaLagMonitor(max_lag=5)
+    assert monitor.check(_FakeEngine(OperationalError("SELECT", {}, Exception("down")))) is False
+    assert monitor.lag is None
+
+
+def test_monitor_async():
+    monitor = db.ReplicaLagMonitor(max_lag=5)
+    assert asyncio.run(monitor.check_async(_FakeAsyncEngine(0))) is True
+    assert asyncio.run(monitor.check_async(_FakeAsyncEngine(10))) is False
+
+
+def test_probe_measures_in_background_and_reads_never_connect(monkeypatch):
+    monitor = db.ReplicaLagMonitor(max_lag=5)
+    engine = _FakeEngine(0.5)
+    monkeypatch.setattr(db, "read_engine", engine)
+    monkeypatch.setattr(db, "SessionLocal", lambda: "primary")
+    monkeypatch.setattr(db, "ReadSessionLocal", lambda: "replica")
+    monkeypatch.setattr(db, "replica_monitor", monitor)
+
+    async def scenario():
+        probe = ReplicaLagProbe.for_mode(monitor, 0.01, async_io=False)
+        await probe.start()
+        for _ in range(100):
+            if probe.checks >= 2:
+                break
+            await asyncio.sleep(0.01)
+        await probe.stop()
+        return probe
+
+    probe = asyncio.run(scenario())
+    assert probe.checks >= 2 and engine.checks == probe.checks
+    assert probe.stats()["healthy"] is True
+
+    for _ in range(5):
+        assert db.read_session() == "replica"
+    assert engine.checks == probe.checks
+
+
+def test_read_session_routes_by_replica_health(monkeypatch):
+    primary, replica = object(), object()
+    monkeypatch.setattr(db, "SessionLocal", lambda: primary)
+
+    monkeypatch.setattr(db, "ReadSessionLocal", None)
+    assert db.read_session() is primary
+
+    monitor = db.ReplicaLagMonitor(max_lag=5)
+    monkeypatch.setattr(db, "ReadSessionLocal", lambda: replica)
+    monkeypatch.setattr(db, "replica_monitor", monitor)
+    monitor.check(_FakeEngine(0.2))
+    assert db.read_session() is replica
+
+    monitor.check(_FakeEngine(12))
+    assert db.read_session() is primary
+
+
+def test_statement_timeout_is_set_on_connect(monkeypatch):
+    monkeypatch.setattr(db, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    assert db._engine_options()["connect_args"] == {"options": "-c statement_timeout=1500"}
+    assert db._engine_options(is_async=True)["connect_args"] == {
+        "server_settings": {"statement_timeout": "1500"}
+    }
+
+    monkeypatch.setattr(db, "DB_STATEMENT_TIMEOUT_MS", 0)
+    assert "connect_args" not in db._engine_options()
+
+
+def test_replica_engine_gets_a_short_connect_timeout(monkeypatch):
+    monkeypatch.setattr(db, "DB_STATEMENT_TIMEOUT_MS", 0)
+    assert db._engine_options(connect_timeout=2)["connect_args"] == {"connect_timeout": 2}
+    assert db._engine_options(is_async=True, connect_timeout=2)["connect_args"] == {"timeout": 2}
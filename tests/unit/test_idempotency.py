@@ -0,0 +1,264 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+import anyio.to_thread
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.adapters.driver.controllers.order_controller as oc
+from app.adapters.driven.repositories.idempotency import IdempotencyRepository
+from app.adapters.driven.repositories.idempotency_async import AsyncIdempotencyRepository
+from app.adapters.driven.repositories.order import OrderRepository
+from app.domain.entities.idempotency import StoredResponse
+from app.domain.entities.order import Order
+from app.domain.services.idempotency_service import (
+    AsyncIdempotentRequests,
+    IdempotentRequests,
+    scoped_key,
+)
+from app.domain.services.payment_status_service import now_utc
+from app.shared.enums.idempotency_status import IdempotencyStatus
+from app.shared.enums.order_status import OrderStatus
+from app.shared.exceptions.idempotency import IdempotencyInProgressError, IdempotencyKeyReusedError
+from database import Base
+
+
+@pytest.fixture
+def sessions():
+    engine = create_engine(
+        "sqlite://",
+        future=True,
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, future=True)
+
+
+def _window(now, lock=30, ttl=3600):
+    return now, now + timedelta(seconds=lock), now + timedelta(seconds=ttl)
+
+
+# ------------------------------------------------------------------ repositório
+def test_claim_complete_and_conflicts(sessions):
+    repo = IdempotencyRepository(sessions())
+    now = now_utc()
+
+    assert repo.claim("k", "fp", *_window(now)) is None
+    pending = repo.claim("k", "fp", *_window(now))
+    assert pending.status is IdempotencyStatus.IN_PROGRESS and pending.response is None
+
+    repo.complete("k", StoredResponse(201, b'{"id":1}'))
+    done = repo.claim("k", "fp", *_window(now))
+    assert done.status is IdempotencyStatus.COMPLETED
+    assert done.response == StoredResponse(201, b'{"id":1}')
+
+    # resposta guardada não é apagada por release
+    repo.release("k")
+    assert repo.find("k").status is IdempotencyStatus.COMPLETED
+
+
+def test_claim_takes_over_abandoned_or_expired_keys(sessions):
+    repo = IdempotencyRepository(sessions())
+    now = now_utc()
+    repo.claim("k", "fp", *_window(now, lock=-1))
+
+    # lock vencido: só a mesma requisição retoma a chave
+    assert repo.claim("k", "outro", *_window(now)).fingerprint == "fp"
+    assert repo.claim("k", "fp", *_window(now)) is None
+
+    repo.complete("k", StoredResponse(201, b"{}"))
+    later = now + timedelta(hours=2)
+    assert repo.claim("k", "novo", *_window(later)) is None
+    assert repo.find("k").fingerprint == "novo"
+
+
+def test_release_and_purge(sessions):
+    repo = IdempotencyRepository(sessions())
+    now = now_utc()
+    repo.claim("a", "fp", *_window(now))
+    repo.release("a")
+    assert repo.find("a") is None
+
+    for key in "bcd":
+        repo.claim(key, "fp", *_window(now, ttl=-1))
+    repo.claim("e", "fp", *_window(now))
+    assert repo.purge_expired(now, limit=2) == 2
+    assert repo.purge_expired(now, limit=2) == 1
+    assert repo.find("e") is not None
+
+
+# ------------------------------------------------------------------ serviço
+def test_retry_replays_without_running_again(sessions):
+    service = IdempotentRequests(IdempotencyRepository(sessions()))
+    calls = []
+
+    def produce():
+        calls.append(1)
+        return StoredResponse(201, b'{"id":7}')
+
+    assert service.run("k", "fp", produce) == (StoredResponse(201, b'{"id":7}'), False)
+    assert service.run("k", "fp", produce) == (StoredResponse(201, b'{"id":7}'), True)
+    assert len(calls) == 1
+
+    with pytest.raises(IdempotencyKeyReusedError):
+        service.run("k", "outro", produce)
+
+
+def test_failure_releases_the_key(sessions):
+    service = IdempotentRequests(IdempotencyRepository(sessions()))
+
+    def boom():
+        raise ValueError("sem estoque")
+
+    with pytest.raises(ValueError):
+        service.run("k", "fp", boom)
+    assert service.run("k", "fp", lambda: StoredResponse(201, b"{}"))[1] is False
+
+
+def test_crash_after_the_order_commit_replays_from_the_order(sessions):
+    store = IdempotencyRepository(sessions())
+    now = now_utc()
+    # a execução original reservou a chave e gravou o pedido, mas caiu antes do complete
+    store.claim("k", "fp", *_window(now, lock=-1))
+    order = OrderRepository(sessions()).create(Order(client_id=1, amount=5.0), idempotency_key="k")
+    store.release("k")  # nem a liberação apaga uma reserva que já criou o pedido
+    assert store.find("k").order_id == order.id
+    assert store.claim("k", "fp", *_window(now)).order_id == order.id
+
+    service = IdempotentRequests(store)
+    recovered = service.run(
+        "k",
+        "fp",
+        lambda: pytest.fail("executou de novo"),
+        lambda order_id: StoredResponse(201, str(order_id).encode()),
+    )
+    assert recovered == (StoredResponse(201, str(order.id).encode()), True)
+    assert store.find("k").status is IdempotencyStatus.COMPLETED
+
+
+def test_concurrent_retry_waits_for_the_original(sessions):
+    started, finish = threading.Event(), threading.Event()
+    results = {}
+
+    def slow():
+        started.set()
+        finish.wait(2)
+        return StoredResponse(201, b'{"id":1}')
+
+    def original():
+        service = IdempotentRequests(IdempotencyRepository(sessions()))
+        results["original"] = service.run("k", "fp", slow)
+
+    thread = threading.Thread(target=original)
+    thread.start()
+    started.wait(2)
+
+    impatient = IdempotentRequests(IdempotencyRepository(sessions()), wait=0.05, poll=0.01)
+    with pytest.raises(IdempotencyInProgressError):
+        impatient.run("k", "fp", slow)
+
+    threading.Timer(0.05, finish.set).start()
+    patient = IdempotentRequests(IdempotencyRepository(sessions()), wait=2, poll=0.01)
+    replay = patient.run("k", "fp", lambda: pytest.fail("executou de novo"))
+    thread.join()
+
+    assert replay == (StoredResponse(201, b'{"id":1}'), True)
+    assert results["original"][1] is False
+
+
+def test_async_service_replays_and_releases():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        try:
+            async with Session() as s:
+                service = AsyncIdempotentRequests(AsyncIdempotencyRepository(s))
+                calls = []
+
+                async def produce():
+                    calls.append(1)
+                    return StoredResponse(201, b"{}")
+
+                async def boom():
+                    raise ValueError("sem estoque")
+
+                with pytest.raises(ValueError):
+                    await service.run("k", "fp", boom)
+                assert (await service.run("k", "fp", produce))[1] is False
+                assert (await service.run("k", "fp", produce))[1] is True
+                assert len(calls) == 1
+                assert await AsyncIdempotencyRepository(s).purge_expired(
+                    now_utc() + timedelta(days=2), 10
+                ) == 1
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+# ------------------------------------------------------------------ endpoint
+class _Create:
+    def __init__(self):
+        self.calls = 0
+
+    def execute(self, order, token=None, idempotency_key=None):
+        self.calls += 1
+        return Order(id=self.calls, client_id=None, status=OrderStatus.RECEIVED, amount=0.0), "QR"
+
+
+def test_post_orders_with_idempotency_key(monkeypatch, sessions):
+    app = FastAPI()
+    app.include_router(oc.router)
+    create = _Create()
+    requests = IdempotentRequests(IdempotencyRepository(sessions()))
+    monkeypatch.setitem(app.dependency_overrides, oc.get_create_order_service, lambda: create)
+    monkeypatch.setitem(app.dependency_overrides, oc.get_idempotent_requests, lambda: requests)
+    client = TestClient(app)
+    body = {"items": [{"product_id": "P", "quantity": 1}]}
+
+    first = client.post("/orders", json=body, headers={"Idempotency-Key": "abc"})
+    retry = client.post("/orders", json=body, headers={"Idempotency-Key": "abc"})
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json() and retry.json()["id"] == 1
+    assert oc.REPLAYED_HEADER not in first.headers
+    assert retry.headers[oc.REPLAYED_HEADER] == "true"
+    assert create.calls == 1
+
+    reused = client.post(
+        "/orders", json={"items": [{"product_id": "P", "quantity": 2}]}, headers={"Idempotency-Key": "abc"}
+    )
+    assert reused.status_code == 422
+
+    # sem a chave nada muda; com outro token a mesma chave é outra reserva
+    assert client.post("/orders", json=body).json()["id"] == 2
+    assert scoped_key("abc", "t1") != scoped_key("abc", "t2")
+
+
+def test_sync_create_with_key_uses_a_single_pool_thread(monkeypatch, sessions):
+    @asynccontextmanager
+    async def one_thread(app):
+        # com o pool cheio, pedir uma segunda thread para o serviço travaria a requisição
+        anyio.to_thread.current_default_thread_limiter().total_tokens = 1
+        yield
+
+    app = FastAPI(lifespan=one_thread)
+    app.include_router(oc.router)
+    create = _Create()
+    requests = IdempotentRequests(IdempotencyRepository(sessions()))
+    monkeypatch.setitem(app.dependency_overrides, oc.get_create_order_service, lambda: create)
+    monkeypatch.setitem(app.dependency_overrides, oc.get_idempotent_requests, lambda: requests)
+
+    body = {"items": [{"product_id": "P", "quantity": 1}]}
+    with TestClient(app) as client:
+        resp = client.post("/orders", json=body, headers={"Idempotency-Key": "abc"})
+    assert resp.status_code == 201 and create.calls == 1
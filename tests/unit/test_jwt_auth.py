@@ -0,0 +1,196 @@
+import asyncio
+import base64
+import json
+import time
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.jwk import OctetJWK, RSAJWK
+
+from app.adapters.driven.gateways.customer_auth_jwt import (
+    AsyncLocalJwtCustomerAuth,
+    LocalJwtCustomerAuth,
+)
+from app.shared.cache.ttl_lru import TTLCache
+from app.shared.exceptions.customer import InvalidTokenError
+from app.shared.exceptions.resilience import DependencyUnavailableError
+from app.shared.handlers.jwt_user import (
+    JwksKeySet,
+    JwtVerifier,
+    StaticKeySet,
+    jwks_fetcher,
+    looks_like_jwt,
+)
+from app.shared.resilience import Resilience
+
+SECRET = OctetJWK(b"segredo-de-teste")
+
+
+def _token(payload, key=SECRET, alg="HS256", kid=None):
+    headers = {"kid": kid} if kid else None
+    return jwt.JWT().encode(payload, key, alg=alg, optional_headers=headers)
+
+
+def _unsigned(payload):
+    part = lambda d: base64.urlsafe_b64encode(json.dumps(d).encode()).rstrip(b"=").decode()
+    return f"{part({'alg': 'none'})}.{part(payload)}."
+
+
+def _hs256():
+    return JwtVerifier(StaticKeySet(SECRET), {"HS256"})
+
+
+class _Remote:
+    def __init__(self):
+        self.calls = 0
+
+    def verify_token(self, token):
+        self.calls += 1
+        if token == "recusado":
+            raise InvalidTokenError("Token inválido")
+        if token == "fora-do-ar":
+            raise DependencyUnavailableError("customer", "Serviço de clientes indisponível")
+        if token == "inativo":
+            raise ValueError("Cliente não encontrado ou inativo")
+        return 7
+
+
+def _auth(remote=None, verifier=None):
+    cache = TTLCache(maxsize=10, ttl=60, negative_ttl=10)
+    return LocalJwtCustomerAuth(verifier or _hs256(), remote or _Remote(), cache)
+
+
+def test_verifier_rejects_expired_forged_and_none_alg():
+    verifier = _hs256()
+    assert verifier.verify(_token({"id": 1}))["id"] == 1
+
+    with pytest.raises(ValueError, match="expirado"):
+        verifier.verify(_token({"id": 1, "exp": int(time.time()) - 10}))
+    with pytest.raises(ValueError, match="inválido"):
+        verifier.verify(_token({"id": 1}, key=OctetJWK(b"outra-chave")))
+    with pytest.raises(ValueError, match="inválido"):
+        JwtVerifier(StaticKeySet(SECRET), {"none", "HS256"}).verify(
+            _unsigned({"id": 1})
+        )
+    assert not looks_like_jwt("token-opaco")
+
+
+def test_jwt_is_verified_locally_and_cached_until_expiry():
+    remote = _Remote()
+    auth = _auth(remote)
+    token = _token({"id": 42, "exp": int(time.time()) + 3600})
+
+    assert auth.verify_token(token) == 42
+    assert auth.verify_token(token) == 42
+    assert remote.calls == 0
+    assert auth.stats()["hits"] == 1 and auth.local == 1
+
+    with pytest.raises(ValueError, match="ID do cliente"):
+        auth.verify_token(_token({"sub": "x"}))
+
+
+def test_opaque_tokens_fall_back_to_remote_with_cache():
+    remote = _Remote()
+    auth = _auth(remote)
+
+    assert auth.verify_token("opaco") == 7
+    assert auth.verify_token("opaco") == 7
+    for _ in range(2):
+        with pytest.raises(ValueError, match="inválido"):
+            auth.verify_token("recusado")
+    assert remote.calls == 2
+
+    # só a recusa do token vai para o cache negativo; queda do serviço não
+    for _ in range(2):
+        with pytest.raises(DependencyUnavailableError):
+            auth.verify_token("fora-do-ar")
+        with pytest.raises(ValueError, match="inativo"):
+            auth.verify_token("inativo")
+    assert remote.calls == 6
+
+
+def _rsa_jwk(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return RSAJWK(private, kid=kid), RSAJWK(private.public_key(), kid=kid).to_dict()
+
+
+def test_jwks_picks_up_rotated_key_and_async_auth():
+    (old, old_public), (new, new_public) = _rsa_jwk("k1"), _rsa_jwk("k2")
+    published = [old_public]
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return {"keys": list(published)}
+
+    keys = JwksKeySet(fetch, refresh=3600, min_refresh=0)
+    verifier = JwtVerifier(keys, {"RS256"})
+    assert verifier.verify(_token({"id": 1}, old, "RS256", "k1"))["id"] == 1
+
+    published.append(new_public)  # rotação: "k2" só aparece no JWKS depois
+    rotated = _token({"id": 2}, new, "RS256", "k2")
+    assert not verifier.can_verify_now(rotated)
+
+    auth = AsyncLocalJwtCustomerAuth(verifier, None, TTLCache(maxsize=10, ttl=60))
+    assert asyncio.run(auth.verify_token(rotated)) == 2
+    assert verifier.can_verify_now(rotated)
+    assert len(fetches) == 2
+
+
+def test_jwks_outage_keeps_old_keys_and_backs_off():
+    (old, old_public), (new, _) = _rsa_jwk("k1"), _rsa_jwk("k2")
+    now = [0.0]
+    fetches = []
+
+    def fetch():
+        fetches.append(now[0])
+        if len(fetches) > 1:
+            raise httpx.ConnectError("JWKS fora do ar")
+        return {"keys": [old_public]}
+
+    keys = JwksKeySet(fetch, refresh=60, min_refresh=30, clock=lambda: now[0])
+    verifier = JwtVerifier(keys, {"RS256"})
+    old_token = _token({"id": 1}, old, "RS256", "k1")
+    assert verifier.verify(old_token)["id"] == 1
+
+    now[0] = 61.0  # JWKS vencido e o endpoint caiu: segue com a chave anterior
+    assert verifier.verify(old_token)["id"] == 1
+    assert verifier.can_verify_now(old_token)
+    # kid desconhecido durante o backoff: 503, não token inválido, e sem nova busca
+    with pytest.raises(DependencyUnavailableError) as exc:
+        verifier.verify(_token({"id": 2}, new, "RS256", "k2"))
+    assert exc.value.retry_after == 30
+    assert fetches == [0.0, 61.0] and keys.failures == 1
+
+    now[0] = 91.0  # backoff vencido: tenta de novo
+    assert verifier.verify(old_token)["id"] == 1
+    assert fetches == [0.0, 61.0, 91.0]
+
+
+def test_jwks_unreachable_from_start_is_dependency_unavailable():
+    def fetch():
+        raise httpx.ConnectTimeout("timeout")
+
+    auth = _auth(verifier=JwtVerifier(JwksKeySet(fetch), {"RS256"}))
+    key, _ = _rsa_jwk("k1")
+    with pytest.raises(DependencyUnavailableError):
+        auth.verify_token(_token({"id": 1}, key, "RS256", "k1"))
+
+
+def test_jwks_fetcher_goes_through_client_and_policy(monkeypatch):
+    import app.shared.handlers.jwt_user as jwt_user
+
+    monkeypatch.setattr(jwt_user, "JWKS_URL", "http://clientes/.well-known/jwks.json")
+    _, public = _rsa_jwk("k1")
+    seen = []
+
+    def handler(request):
+        seen.append(str(request.url))
+        return httpx.Response(200, json={"keys": [public]})
+
+    policy = Resilience("customer", timeout=2)
+    fetch = jwks_fetcher(httpx.Client(transport=httpx.MockTransport(handler)), policy)
+    assert JwksKeySet(fetch).load() == 1
+    assert seen == ["http://clientes/.well-known/jwks.json"] and policy.calls == 1
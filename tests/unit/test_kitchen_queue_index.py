@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from app.adapters.driver.workers.kitchen_queue import KitchenQueueReconciler
+from app.domain.entities.order import Order
+from app.domain.services.kitchen_queue_index import KitchenQueueIndex
+from app.domain.services.list_order_service import ListOrdersService
+from app.shared.enums.order_status import OrderStatus
+
+
+def _order(oid: int, status: OrderStatus = OrderStatus.RECEIVED) -> Order:
+    return Order(id=oid, client_id=1, status=status, amount=10.0)
+
+
+def _ids(index: KitchenQueueIndex):
+    return [o.id for o in index.snapshot()]
+
+
+def test_apply_keeps_queue_priority_order():
+    index = KitchenQueueIndex()
+    index.reload([_order(1), _order(2, OrderStatus.IN_PROGRESS), _order(3, OrderStatus.READY)], 0)
+    assert _ids(index) == [3, 2, 1]
+
+    index.apply(_order(4))
+    index.apply(_order(1, OrderStatus.READY))
+    assert _ids(index) == [1, 3, 2, 4]
+
+    version = index.version
+    index.apply(_order(3, OrderStatus.COMPLETED))
+    assert _ids(index) == [1, 2, 4]
+    assert index.version == version + 1
+
+    # pedido fora da fila que continua fora não muda a versão
+    index.apply(_order(3, OrderStatus.COMPLETED))
+    assert index.version == version + 1
+
+
+def test_page_walks_the_queue_with_cursor():
+    index = KitchenQueueIndex()
+    index.reload([_order(i, OrderStatus.READY if i % 2 else OrderStatus.RECEIVED) for i in range(1, 6)], 0)
+
+    seen, after = [], None
+    while True:
+        page = index.page(2, after)
+        seen += [o.id for o in page.items]
+        if not page.next_cursor:
+            break
+        after = page.next_cursor
+    assert seen == [1, 3, 5, 2, 4]
+
+    with pytest.raises(ValueError):
+        index.page(2, "bogus")
+
+
+def test_reload_does_not_undo_newer_local_changes():
+    index = KitchenQueueIndex()
+    index.reload([_order(1), _order(2)], 0)
+
+    since = index.version
+    # a consulta da reconciliação começou antes destas atualizações
+    index.apply(_order(1, OrderStatus.COMPLETED))
+    index.apply(_order(3))
+    index.reload([_order(1), _order(2), _order(4)], since)
+    assert _ids(index) == [2, 3, 4]
+
+    # numa reconciliação seguinte o banco volta a ser a fonte da verdade
+    index.reload([_order(2)], index.version)
+    assert _ids(index) == [2]
+
+
+def test_list_service_reads_from_ready_index_only():
+    class _Repo:
+        calls = 0
+
+        def find_active_sorted_orders(self, with_items=True):
+            self.calls += 1
+            return [_order(9)]
+
+    repo, index = _Repo(), KitchenQueueIndex()
+    service = ListOrdersService(repo, index)
+
+    assert [o.id for o in service.execute(prioritized=True)] == [9]
+    index.reload([_order(1)], 0)
+    assert [o.id for o in service.execute(prioritized=True)] == [1]
+    assert repo.calls == 1
+
+
+def test_reconciler_keeps_last_state_when_load_fails():
+    index = KitchenQueueIndex()
+    results = [[_order(1)], RuntimeError("db down")]
+
+    async def load():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    reconciler = KitchenQueueReconciler(index, interval=60, load=load)
+
+    async def run():
+        await reconciler.start()
+        ok = await reconciler.reconcile()
+        await reconciler.stop()
+        return ok
+
+    assert asyncio.run(run()) is False
+    assert index.ready and _ids(index) == [1]
@@ -0,0 +1,229 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.adapters.driver.controllers.kitchen_stream_controller as ks
+from app.domain.entities.order import Order
+from app.domain.services.kitchen_queue_feed import KitchenQueueFeed, QueueSnapshot
+from app.domain.services.kitchen_queue_index import KitchenQueueIndex, QueueChangeKind
+from app.shared.broadcast import BroadcastHub, HubFullError, SubscriberLagged
+from app.shared.enums.order_status import OrderStatus
+
+
+def _order(oid: int, status: OrderStatus = OrderStatus.RECEIVED) -> Order:
+    return Order(id=oid, client_id=1, status=status, amount=10.0)
+
+
+def _kinds(changes):
+    return [(c.kind, c.order_id, c.version) for c in changes]
+
+
+def test_index_reports_each_effective_change():
+    published = []
+    index = KitchenQueueIndex(on_change=published.append)
+
+    index.reload([_order(1), _order(2)], 0)
+    index.apply(_order(3))
+    index.apply(_order(1, OrderStatus.READY))
+    index.apply(_order(2, OrderStatus.COMPLETED))
+    index.apply(_order(9, OrderStatus.COMPLETED))  # nunca esteve na fila: nada muda
+    # reconciliação: 3 sumiu em outra instância, 4 apareceu, 1 mudou de novo
+    index.reload([_order(1, OrderStatus.IN_PROGRESS), _order(4)], index.version)
+
+    assert [_kinds(batch) for batch in published] == [
+        [(QueueChangeKind.ADDED, 1, 1), (QueueChangeKind.ADDED, 2, 1)],
+        [(QueueChangeKind.ADDED, 3, 2)],
+        [(QueueChangeKind.CHANGED, 1, 3)],
+        [(QueueChangeKind.REMOVED, 2, 4)],
+        [
+            (QueueChangeKind.CHANGED, 1, 5),
+            (QueueChangeKind.REMOVED, 3, 5),
+            (QueueChangeKind.ADDED, 4, 5),
+        ],
+    ]
+    assert published[2][0].order.status == OrderStatus.READY
+    assert index.version == 5
+
+
+def test_index_write_survives_failing_listener():
+    def boom(_):
+        raise RuntimeError("hub fora")
+
+    index = KitchenQueueIndex(on_change=boom)
+    index.apply(_order(1))
+    assert [o.id for o in index.snapshot()] == [1]
+
+
+def test_slow_subscriber_lags_without_holding_back_the_others():
+    async def scenario():
+        hub = BroadcastHub(buffer_size=2)
+        slow, fast = hub.subscribe(), hub.subscribe()
+
+        for n in range(3):
+            hub.publish(n)
+            assert await fast.receive(0.1) == [n]
+        await asyncio.sleep(0)
+
+        with pytest.raises(SubscriberLagged):
+            await slow.receive(0.1)
+        hub.publish(3)
+        assert await slow.receive(0.1) == [3]
+        assert await slow.receive(0.01) == []
+        assert hub.stats()["lagged"] == 1
+
+        hub.close()
+        assert await fast.receive(0.1) == [3]  # o que já estava no buffer ainda sai
+        assert await fast.receive(0.1) is None
+        assert hub.stats()["subscribers"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_hub_keeps_order_across_threads_and_limits_subscribers():
+    async def scenario():
+        hub = BroadcastHub(buffer_size=1000, max_subscribers=1)
+        sub = hub.subscribe()
+        with pytest.raises(HubFullError):
+            hub.subscribe()
+
+        lock = threading.Lock()
+        counter = iter(range(400))
+
+        def worker():
+            for _ in range(100):
+                with lock:  # como o índice: publica dentro do lock, na ordem das versões
+                    hub.publish(next(counter))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        received = []
+        while len(received) < 400:
+            received += await sub.receive(1)
+        for t in threads:
+            t.join()
+        assert received == list(range(400))
+
+        sub.close()
+        assert hub.subscribe() is not None
+
+    asyncio.run(scenario())
+
+
+def test_feed_sends_snapshot_then_newer_deltas_and_resyncs_after_lag():
+    async def scenario():
+        hub = BroadcastHub(buffer_size=1)
+        index = KitchenQueueIndex(on_change=hub.publish)
+        index.reload([_order(1)], 0)
+        feed = KitchenQueueFeed(index, hub)
+        events = feed.events(feed.subscribe(), heartbeat=0.01)
+
+        first = await events.__anext__()
+        assert isinstance(first, QueueSnapshot) and [o.id for o in first.orders] == [1]
+        assert await events.__anext__() is None  # batida sem mudanças
+
+        index.apply(_order(2))
+        change = await events.__anext__()
+        assert (change.kind, change.order_id, change.version) == (QueueChangeKind.ADDED, 2, 2)
+
+        # duas mudanças com buffer de uma: a tela recebe um snapshot novo
+        index.apply(_order(3))
+        index.apply(_order(1, OrderStatus.COMPLETED))
+        await asyncio.sleep(0)
+        resync = await events.__anext__()
+        assert isinstance(resync, QueueSnapshot) and [o.id for o in resync.orders] == [2, 3]
+
+        await events.aclose()
+        assert hub.stats()["subscribers"] == 0
+
+    asyncio.run(scenario())
+
+
+# ------------------------------------------------------------------ endpoints
+def _client(monkeypatch, feed):
+    app = FastAPI()
+    app.include_router(ks.router)
+    monkeypatch.setitem(app.dependency_overrides, ks.get_kitchen_queue_feed, lambda: feed)
+    return TestClient(app)
+
+
+def test_endpoints_unavailable_before_index_loads(monkeypatch):
+    from starlette.websockets import WebSocketDisconnect
+
+    client = _client(monkeypatch, KitchenQueueFeed(KitchenQueueIndex(), BroadcastHub()))
+    resp = client.get("/orders/active/stream")
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/orders/active/ws") as ws:
+            ws.receive_json()
+    assert exc.value.code == ks.WS_TRY_AGAIN_LATER
+
+
+def test_endpoints_refuse_when_the_last_slot_is_taken(monkeypatch):
+    from starlette.websockets import WebSocketDisconnect
+
+    index = KitchenQueueIndex()
+    index.reload([_order(1)], 0)
+    hub = BroadcastHub(max_subscribers=1)
+    feed = KitchenQueueFeed(index, hub)
+    # outro cliente pega a última vaga entre o available() e a assinatura
+    monkeypatch.setattr(feed, "available", lambda: True)
+    monkeypatch.setattr(hub, "_subscribers", {object()})
+    client = _client(monkeypatch, feed)
+
+    resp = client.get("/orders/active/stream")
+    assert resp.status_code == 503 and resp.headers["Retry-After"] == "1"
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect("/orders/active/ws") as ws:
+            ws.receive_json()
+    assert exc.value.code == ks.WS_TRY_AGAIN_LATER
+    assert hub.stats()["rejected"] == 2
+
+
+def test_websocket_pushes_snapshot_and_deltas(monkeypatch):
+    hub = BroadcastHub()
+    index = KitchenQueueIndex(on_change=hub.publish)
+    index.reload([_order(1)], 0)
+    client = _client(monkeypatch, KitchenQueueFeed(index, hub))
+
+    with client.websocket_connect("/orders/active/ws") as ws:
+        snapshot = ws.receive_json()
+        assert snapshot["event"] == "snapshot" and [o["id"] for o in snapshot["orders"]] == [1]
+
+        index.apply(_order(1, OrderStatus.READY))
+        index.apply(_order(1, OrderStatus.COMPLETED))
+        changed, removed = ws.receive_json(), ws.receive_json()
+        assert changed["event"] == "changed" and changed["order"]["status"] == OrderStatus.READY.value
+        assert removed == {"event": "removed", "version": 3, "id": 1}
+
+    # a desconexão libera a assinatura (o app roda em outra thread do TestClient)
+    for _ in range(100):
+        if hub.stats()["subscribers"] == 0:
+            break
+        time.sleep(0.01)
+    assert hub.stats()["subscribers"] == 0
+
+
+def test_sse_stream_ends_when_hub_closes(monkeypatch):
+    hub = BroadcastHub()
+    index = KitchenQueueIndex(on_change=hub.publish)
+    index.reload([_order(1)], 0)
+    client = _client(monkeypatch, KitchenQueueFeed(index, hub))
+
+    def later():
+        index.apply(_order(2))
+        hub.close()
+
+    timer = threading.Timer(0.2, later)
+    timer.start()
+    resp = client.get("/orders/active/stream")
+    timer.join()
+
+    assert resp.headers["content-type"].startswith(ks.SSE_MEDIA_TYPE)
+    blocks = [b for b in resp.text.split("\n\n") if b]
+    assert blocks[0].startswith("id: 1\nevent: snapshot\ndata: ")
+    assert blocks[1].startswith("id: 2\nevent: added\ndata: ")
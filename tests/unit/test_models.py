@@ -68,3 +68,26 @@ def test_item_relationship_and_repr(session):
     # __repr__
     rep = repr(item)
     assert "order_id" in rep and "SKU123" in rep and "quantity=2" in rep
+
+
+def test_active_queue_index_migration_matches_model_expressions():
+    # o planner só usa ix_orders_active_queue no ORDER BY se a expressão da
+    # migração for idêntica à que o repositório gera
+    import importlib.util
+    from pathlib import Path
+
+    from sqlalchemy.dialects import postgresql
+
+    from app.adapters.driven.models.order import active_queue_filter, status_priority
+
+    path = Path(__file__).resolve().parents[2] / "migrations/versions/7d1e4c2b9a10_hot_query_indexes.py"
+    spec = importlib.util.spec_from_file_location("hot_query_indexes", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    def sql(expr):
+        compiled = expr.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        return str(compiled).replace("orders.", "")
+
+    assert sql(status_priority) == migration.ACTIVE_QUEUE_PRIORITY
+    assert sql(active_queue_filter) == migration.ACTIVE_QUEUE_WHERE
@@ -33,6 +33,8 @@ class _OKGet:  # para Get/List services
     def __init__(self, *_, **__): ...
     def execute(self, *_, **__):
         return _order()
+    def queue_tag(self):
+        return None  # fila lida do banco
 
 
 class _OKUpdate:
@@ -47,29 +49,10 @@ class _Err:
         raise ValueError("boom")
 
 
-# ------------------------------------------------------------------ dummies de gateways (HTTP)
-class _DummyPaymentGateway:
-    def __init__(self, *_, **__): ...
-    def create_payment(self, *_):        # usado em POST /orders
-        return "QR-DUMMY", None
-    def get_status(self, *_):            # usado em PATCH /orders/{id}/status
-        from app.shared.enums.payment_status import PaymentStatus
-        return PaymentStatus.PAID
-
-
-class _DummyAuthGateway:
-    def __init__(self, *_, **__): ...
-    def verify_token(self, *_):          # nunca falha nos testes
-        return 42
-
-
 # ------------------------------------------------------------------ wiring do FastAPI
 app = FastAPI()
 app.include_router(oc.router)
 
-# ignora acesso ao banco
-app.dependency_overrides[oc.get_db_session] = lambda: None
-
 # stub global do bearer (sem token)
 class _FakeSecurity:
     async def __call__(self, *_, **__):
@@ -77,16 +60,17 @@ class _FakeSecurity:
 
 oc.security = _FakeSecurity()
 
-# gateways HTTP padrão para qualquer rota que não seja monkey-patched
-oc.PaymentGatewayHttp = _DummyPaymentGateway
-oc.CustomerAuthHttp = _DummyAuthGateway
-
 client = TestClient(app)
 
 
+def _use(monkeypatch, provider, service) -> None:
+    """Troca o serviço entregue pelo container (desfeito ao fim do teste)."""
+    monkeypatch.setitem(app.dependency_overrides, provider, lambda: service)
+
+
 # ------------------------------------------------------------------ testes
 def test_create_order_ok(monkeypatch):
-    monkeypatch.setattr(oc, "CreateOrderService", lambda *_: _OKCreate())
+    _use(monkeypatch, oc.get_create_order_service, _OKCreate())
     resp = client.post("/orders", json={"items": [{"product_id": "P", "quantity": 1}]})
     assert resp.status_code == 201
     body = resp.json()
@@ -95,7 +79,7 @@ def test_create_order_ok(monkeypatch):
 
 
 def test_create_order_error(monkeypatch):
-    monkeypatch.setattr(oc, "CreateOrderService", lambda *_: _Err())
+    _use(monkeypatch, oc.get_create_order_service, _Err())
     resp = client.post("/orders", json={"items": [{"product_id": "P", "quantity": 1}]})
     assert resp.status_code == 400
     assert resp.json()["detail"] == "boom"
@@ -103,11 +87,11 @@ def test_create_order_error(monkeypatch):
 
 def test_list_orders(monkeypatch):
     class _List(_OKGet):
-        def execute(self, status=None, prioritized=False):
-            assert status in (None, OrderStatus.READY)
+        def execute(self, status=None, prioritized=False, with_items=True):
+            assert status in (None, OrderStatus.READY) and with_items
             return [_order(status=status or OrderStatus.RECEIVED)]
 
-    monkeypatch.setattr(oc, "ListOrdersService", lambda repo: _List())
+    _use(monkeypatch, oc.get_list_orders_service, _List())
 
     # todos
     assert client.get("/orders").status_code == 200
@@ -120,8 +104,70 @@ def test_list_orders(monkeypatch):
     assert client.get("/orders/active").status_code == 200
 
 
+def test_list_orders_paginated(monkeypatch):
+    from app.domain.entities.page import Page
+
+    calls = []
+
+    class _Paged(_OKGet):
+        def paginate(self, limit, after=None, **filters):
+            calls.append((limit, after, filters))
+            return Page(items=[_order()], next_cursor="CUR" if after is None else None)
+
+    _use(monkeypatch, oc.get_list_orders_service, _Paged())
+
+    resp = client.get("/orders", params={"limit": 1})
+    assert resp.status_code == 200 and len(resp.json()) == 1
+    assert resp.headers["X-Next-Cursor"] == "CUR"
+
+    resp = client.get("/orders/active", params={"after": "CUR"})
+    assert "X-Next-Cursor" not in resp.headers
+    assert calls == [
+        (1, None, {"status": None, "with_items": True}),
+        (oc.DEFAULT_PAGE_SIZE, "CUR", {"prioritized": True, "with_items": True}),
+    ]
+
+    assert client.get("/orders", params={"limit": 0}).status_code == 422
+
+
+def test_list_orders_sparse_fields(monkeypatch):
+    calls = []
+
+    class _List(_OKGet):
+        def execute(self, **filters):
+            calls.append(filters["with_items"])
+            return [_order()]
+
+    _use(monkeypatch, oc.get_list_orders_service, _List())
+
+    resp = client.get("/orders", params={"fields": "amount, status,id"})
+    assert resp.json() == [{"id": 1, "status": OrderStatus.RECEIVED.value, "amount": 20.0}]
+
+    resp = client.get("/orders/active", params={"fields": "id", "include": "items"})
+    assert list(resp.json()[0]) == ["id", "items"]
+
+    # include sozinho mantém o pedido completo
+    resp = client.get("/orders", params={"include": "items"})
+    assert list(resp.json()[0]) == ["id", "client_id", "status", "items", "amount"]
+    assert calls == [False, True, True]
+
+    for params in ({"fields": "id,coupon"}, {"fields": ""}, {"include": "client"}):
+        resp = client.get("/orders", params=params)
+        assert resp.status_code == 400, params
+
+
+def test_list_orders_bad_cursor(monkeypatch):
+    class _BadCursor(_OKGet):
+        def paginate(self, *_, **__):
+            raise ValueError("Cursor inválido")
+
+    _use(monkeypatch, oc.get_list_orders_service, _BadCursor())
+    resp = client.get("/orders", params={"after": "x"})
+    assert resp.status_code == 400 and resp.json()["detail"] == "Cursor inválido"
+
+
 def test_get_order_found(monkeypatch):
-    monkeypatch.setattr(oc, "GetOrderByIdService", lambda repo: _OKGet())
+    _use(monkeypatch, oc.get_order_by_id_service, _OKGet())
     resp = client.get("/orders/1")
     assert resp.status_code == 200 and resp.json()["id"] == 1
 
@@ -131,12 +177,12 @@ def test_get_order_not_found(monkeypatch):
         def __init__(self, *_, **__): ...
         def execute(self, *_, **__): return None
 
-    monkeypatch.setattr(oc, "GetOrderByIdService", lambda repo: _NoneSvc())
+    _use(monkeypatch, oc.get_order_by_id_service, _NoneSvc())
     assert client.get("/orders/999").status_code == 404
 
 
 def test_update_status_ok(monkeypatch):
-    monkeypatch.setattr(oc, "UpdateOrderStatusService", lambda repo, pay: _OKUpdate())
+    _use(monkeypatch, oc.get_update_order_status_service, _OKUpdate())
     resp = client.patch(
         "/orders/1/status", params={"status": OrderStatus.IN_PROGRESS.value}
     )
@@ -145,8 +191,154 @@ def test_update_status_ok(monkeypatch):
 
 
 def test_update_status_error(monkeypatch):
-    monkeypatch.setattr(oc, "UpdateOrderStatusService", lambda repo, pay: _Err())
+    _use(monkeypatch, oc.get_update_order_status_service, _Err())
     resp = client.patch(
         "/orders/1/status", params={"status": OrderStatus.IN_PROGRESS.value}
     )
     assert resp.status_code == 400 and resp.json()["detail"] == "boom"
+
+
+def test_async_mode_awaits_async_services(monkeypatch):
+    class _AsyncGet:
+        def __init__(self, *_, **__): ...
+        async def execute(self, *_, **__):
+            return _order()
+
+    class _AsyncList(_AsyncGet):
+        async def execute(self, *_, **__):
+            return [_order()]
+        def queue_tag(self):
+            return None
+
+    _use(monkeypatch, oc.get_order_by_id_service, _AsyncGet())
+    _use(monkeypatch, oc.get_list_orders_service, _AsyncList())
+
+    assert client.get("/orders/1").json()["id"] == 1
+    assert client.get("/orders/active").json()[0]["id"] == 1
+
+
+def test_get_order_conditional(monkeypatch):
+    from datetime import datetime, timezone
+
+    stamp = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    calls = []
+
+    class _Versioned:
+        def header(self, order_id):
+            calls.append("header")
+            order = _order(order_id)
+            order.items, order.updated_at = [], stamp
+            return order
+
+        def execute(self, order_id):
+            calls.append("execute")
+            order = _order(order_id)
+            order.updated_at = stamp
+            return order
+
+    _use(monkeypatch, oc.get_order_by_id_service, _Versioned())
+
+    first = client.get("/orders/1")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and calls == ["execute"]
+
+    calls.clear()
+    resp = client.get("/orders/1", headers={"If-None-Match": f'"x", W/{etag}'})
+    assert resp.status_code == 304 and resp.headers["ETag"] == etag and resp.content == b""
+    assert calls == ["header"]  # sem carregar itens nem serializar
+
+    # outra versão: resposta completa
+    stamp = datetime(2024, 1, 1, 12, 1, tzinfo=timezone.utc)
+    calls.clear()
+    resp = client.get("/orders/1", headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.headers["ETag"] != etag
+    assert calls == ["header", "execute"]
+
+
+def test_active_queue_conditional(monkeypatch):
+    from app.domain.services.kitchen_queue_index import KitchenQueueIndex
+    from app.domain.services.list_order_service import ListOrdersService
+
+    class _NoDb:
+        def find_active_sorted_orders(self):
+            raise AssertionError("a fila deve sair do índice")
+
+    index = KitchenQueueIndex()
+    index.reload([_order(1), _order(2)], since_version=0)
+    _use(monkeypatch, oc.get_list_orders_service, ListOrdersService(_NoDb(), kitchen_queue=index))
+
+    first = client.get("/orders/active")
+    etag = first.headers["ETag"]
+    assert [o["id"] for o in first.json()] == [1, 2]
+
+    assert client.get("/orders/active", headers={"If-None-Match": etag}).status_code == 304
+    # outra página tem outro ETag
+    assert client.get("/orders/active", params={"limit": 1}).headers["ETag"] != etag
+
+    index.apply(_order(3))
+    resp = client.get("/orders/active", headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and len(resp.json()) == 3
+    assert client.get("/orders/active", headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_active_queue_from_db_uses_content_etag(monkeypatch):
+    class _List(_OKGet):
+        def execute(self, *_, **__):
+            return [_order()]
+
+    _use(monkeypatch, oc.get_list_orders_service, _List())
+    etag = client.get("/orders/active").headers["ETag"]
+    assert client.get("/orders/active", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_export_streams_ndjson_and_csv(monkeypatch):
+    import json
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.adapters.driven.repositories.order import OrderRepository
+    from database import Base
+
+    # StaticPool: o gerador roda em outra thread e precisa ver o mesmo SQLite em memória
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as s:
+        repo = OrderRepository(s)
+        repo.create(_order(order_id=None))
+        repo.create(_order(order_id=None, status=OrderStatus.READY))
+    monkeypatch.setattr(oc, "read_session", Session)
+
+    resp = client.get("/orders/export", params={"status": "Pronto"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [(o["status"], o["items"][0]["name"]) for o in lines] == [("Pronto", "Burger")]
+
+    resp = client.get("/orders/export", params={"format": "csv"})
+    rows = resp.text.splitlines()
+    assert rows[0].startswith("order_id,client_id,status")
+    assert len(rows) == 3
+
+    bad = client.get(
+        "/orders/export",
+        params={"created_from": "2024-02-01T00:00:00", "created_to": "2024-01-01T00:00:00"},
+    )
+    assert bad.status_code == 400
+
+
+def test_get_order_payment(monkeypatch):
+    from app.domain.entities.payment import PaymentOutboxEntry
+    from app.shared.enums.outbox_status import OutboxStatus
+
+    class _Store:
+        def find(self, order_id):
+            if order_id == 1:
+                return PaymentOutboxEntry(1, 20.0, OutboxStatus.SENT, attempts=1, qr_code="QR")
+            return None
+
+    _use(monkeypatch, oc.get_payment_outbox_store, _Store())
+    resp = client.get("/orders/1/payment")
+    assert resp.status_code == 200
+    assert resp.json() == {"order_id": 1, "status": "SENT", "qr_code": "QR", "attempts": 1}
+    assert client.get("/orders/2/payment").status_code == 404
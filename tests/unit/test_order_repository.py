@@ -1,11 +1,12 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
-from app.adapters.driven.repositories.order import OrderRepository
+from app.adapters.driven.repositories.order import ItemLoading, OrderRepository
 from app.domain.entities.order import Order
 from app.domain.entities.item import OrderItem
 from app.shared.enums.order_status import OrderStatus
+from app.shared.handlers.cursor import encode_cursor
 from database import Base
 
 
@@ -72,3 +73,276 @@ def test_delete_nonexistent_is_noop(session):
     repo = OrderRepository(session)
     repo.delete(123)
     assert repo.find_by_id(123) is None
+
+
+def _capture(session, fn):
+    statements = []
+
+    def _on_execute(conn, cursor, statement, *_):
+        statements.append(statement.strip())
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
+    return result, statements
+
+
+def _count_selects(session, fn):
+    result, statements = _capture(session, fn)
+    return result, sum(1 for s in statements if s.startswith("SELECT"))
+
+
+@pytest.mark.parametrize(
+    "loading, expected",
+    [
+        (ItemLoading.SELECTIN, 2),
+        (ItemLoading.JOINED, 1),
+        (ItemLoading.BATCH, 2),
+        (ItemLoading.CORE, 2),
+    ],
+)
+@pytest.mark.parametrize(
+    "finder",
+    [
+        lambda repo, loading: repo.find_all(loading=loading),
+        lambda repo, loading: repo.find_active_sorted_orders(loading=loading),
+        lambda repo, loading: repo.find_by_client(1, loading=loading),
+    ],
+)
+def test_list_queries_have_fixed_query_count(session, loading, expected, finder):
+    repo = OrderRepository(session)
+    counts = []
+    for total in (1, 12):
+        while len(repo.find_all()) < total:
+            repo.create(_sample_order(client=1))
+        session.expire_all()
+
+        orders, selects = _count_selects(session, lambda: finder(repo, loading))
+        assert len(orders) == total
+        assert all(o.items[0].name == "Burger" for o in orders)
+        counts.append(selects)
+
+    assert counts == [expected, expected]
+
+
+def test_core_loading_builds_no_orm_objects(session):
+    repo = OrderRepository(session)
+    for client in (1, 2):
+        repo.create(_sample_order(client=client))
+    session.expunge_all()
+
+    orders = repo.find_all(loading=ItemLoading.CORE)
+    assert [(o.client_id, o.items[0].name) for o in orders] == [(1, "Burger"), (2, "Burger")]
+    assert orders[0].status is OrderStatus.RECEIVED
+    assert len(session.identity_map) == 0
+
+    page = repo.find_active_sorted_page(limit=1, loading=ItemLoading.CORE)
+    assert [o.client_id for o in page.items] == [1] and page.next_cursor
+
+
+def test_lazy_loading_is_n_plus_one(session):
+    repo = OrderRepository(session, loading=ItemLoading.LAZY)
+    for _ in range(3):
+        repo.create(_sample_order())
+    session.expire_all()
+
+    _, selects = _count_selects(session, repo.find_all)
+    assert selects == 4
+
+
+def _walk(fetch):
+    seen, after = [], None
+    while True:
+        page = fetch(after)
+        seen.extend(o.id for o in page.items)
+        if page.next_cursor is None:
+            return seen
+        after = page.next_cursor
+
+
+def test_find_page_walks_all_orders_by_id(session):
+    repo = OrderRepository(session)
+    ids = [repo.create(_sample_order()).id for _ in range(7)]
+
+    assert _walk(lambda after: repo.find_page(None, limit=3, after=after)) == ids
+    assert repo.find_page(OrderStatus.READY, limit=3).items == []
+
+
+def test_find_active_sorted_page_follows_queue_priority(session):
+    repo = OrderRepository(session)
+    statuses = [
+        OrderStatus.RECEIVED, OrderStatus.READY, OrderStatus.COMPLETED,
+        OrderStatus.IN_PROGRESS, OrderStatus.READY, OrderStatus.RECEIVED,
+    ]
+    for st in statuses:
+        repo.create(_sample_order(status=st))
+
+    expected = [o.id for o in repo.find_active_sorted_orders()]
+    assert len(expected) == 5
+    for limit in (1, 2, 5):
+        assert _walk(lambda after: repo.find_active_sorted_page(limit, after)) == expected
+
+
+def test_find_page_rejects_bad_cursor(session):
+    repo = OrderRepository(session)
+    with pytest.raises(ValueError, match="Cursor inválido"):
+        repo.find_page(None, limit=3, after="not-a-cursor")
+    with pytest.raises(ValueError, match="Cursor inválido"):
+        repo.find_active_sorted_page(3, after=encode_cursor(1))
+    # bem formado, mas adulterado: tipos errados não chegam ao SQL
+    for tampered in (encode_cursor("1"), encode_cursor(1.5), encode_cursor(None)):
+        with pytest.raises(ValueError, match="Cursor inválido"):
+            repo.find_page(None, limit=3, after=tampered)
+    with pytest.raises(ValueError, match="Cursor inválido"):
+        repo.find_active_sorted_page(3, after=encode_cursor(1, "x"))
+
+
+def _verbs(statements):
+    return [s.split(None, 1)[0] for s in statements]
+
+
+def test_update_status_is_a_single_conditional_update(session):
+    repo = OrderRepository(session)
+    created = repo.create(_sample_order())
+
+    updated, statements = _capture(
+        session,
+        lambda: repo.update_status(created.id, OrderStatus.RECEIVED, OrderStatus.IN_PROGRESS),
+    )
+    assert updated.status == OrderStatus.IN_PROGRESS
+    assert updated.items[0].name == "Burger"
+    assert _verbs(statements) == ["UPDATE", "SELECT"]
+    assert "RETURNING" in statements[0]
+
+    # status esperado não confere (outra requisição já alterou) -> nada muda
+    assert repo.update_status(created.id, OrderStatus.RECEIVED, OrderStatus.READY) is None
+    assert repo.update_status(999, OrderStatus.RECEIVED, OrderStatus.READY) is None
+    assert repo.find_by_id(created.id).status == OrderStatus.IN_PROGRESS
+
+
+def test_status_change_service_issues_no_read_before_the_update(session):
+    from app.domain.services.update_order_service import UpdateOrderStatusService
+
+    repo = OrderRepository(session)
+    created = repo.create(_sample_order(status=OrderStatus.IN_PROGRESS))
+    service = UpdateOrderStatusService(repo, payment_port=None)
+
+    updated, statements = _capture(
+        session, lambda: service.execute(created.id, OrderStatus.READY)
+    )
+    assert updated.status == OrderStatus.READY
+    assert _verbs(statements) == ["UPDATE", "SELECT"]
+
+    # UPDATE direto não casou: só então o cabeçalho (sem itens) explica o erro
+    with pytest.raises(ValueError, match="inválida"):
+        service.execute(created.id, OrderStatus.READY)
+    with pytest.raises(ValueError, match="não encontrado"):
+        service.execute(999, OrderStatus.READY)
+
+
+def test_update_only_rewrites_changed_items(session):
+    repo = OrderRepository(session)
+    order = _sample_order()
+    order.items.append(OrderItem(product_id="COKE", name="Coke", quantity=1, price=5.0))
+    created = repo.create(order)
+    burger_id, coke_id = (i.id for i in created.items)
+
+    # só o status muda: nenhum comando em order_items
+    created.status = OrderStatus.IN_PROGRESS
+    _, statements = _capture(session, lambda: repo.update(created))
+    assert not any("order_items" in s and not s.startswith("SELECT") for s in statements)
+
+    # um item alterado, um removido, um novo
+    created.items[0].quantity = 2
+    created.items = [created.items[0], OrderItem(product_id="FRIES", name="Fries", quantity=1, price=7.0)]
+    updated, statements = _capture(session, lambda: repo.update(created))
+    writes = [s for s in statements if "order_items" in s and not s.startswith("SELECT")]
+    assert sorted(_verbs(writes)) == ["DELETE", "INSERT", "UPDATE"]
+
+    assert [(i.id == burger_id, i.product_id, i.quantity) for i in updated.items] == [
+        (True, "SKU", 2),
+        (False, "FRIES", 1),
+    ]
+    assert coke_id not in {i.id for i in updated.items}
+
+
+@pytest.mark.parametrize("lines", [0, 1, 20])
+def test_create_uses_two_statements_and_no_refresh(session, lines):
+    repo = OrderRepository(session)
+    order = _sample_order()
+    order.items = [
+        OrderItem(product_id=f"SKU{n}", name=f"Item {n}", quantity=n + 1, price=1.5)
+        for n in range(lines)
+    ]
+
+    created, statements = _capture(session, lambda: repo.create(order))
+
+    # No Postgres o INSERT dos itens sai em um único comando (sentinela implícita);
+    # o SQLite não garante a ordem do RETURNING e o SQLAlchemy insere linha a linha.
+    single_batch = session.get_bind().dialect.name == "postgresql"
+    item_inserts = (1 if single_batch else lines) if lines else 0
+    assert _verbs(statements) == ["INSERT"] * (1 + item_inserts)
+    assert all("RETURNING" in s for s in statements)
+    assert [i.product_id for i in created.items] == [f"SKU{n}" for n in range(lines)]
+    assert [i.id for i in created.items] == [i.id for i in repo.find_by_id(created.id).items]
+
+
+def test_find_header_reads_only_the_order_row(session):
+    repo = OrderRepository(session)
+    created = repo.create(_sample_order())
+    assert created.updated_at is not None
+
+    header, statements = _capture(session, lambda: repo.find_header(created.id))
+    assert len(statements) == 1 and "order_items" not in statements[0]
+    assert (header.id, header.status, header.items) == (created.id, OrderStatus.RECEIVED, [])
+    assert header.updated_at == repo.find_by_id(created.id).updated_at
+    assert repo.find_header(999) is None
+
+    # update devolve o updated_at novo no próprio RETURNING, sem SELECT de refresh
+    created.status = OrderStatus.IN_PROGRESS
+    updated, statements = _capture(session, lambda: repo.update(created))
+    assert updated.updated_at is not None
+    assert "RETURNING" in next(s for s in statements if s.startswith("UPDATE orders"))
+
+
+@pytest.mark.parametrize(
+    "finder",
+    [
+        lambda repo: repo.find_all(with_items=False),
+        lambda repo: repo.find_active_sorted_orders(with_items=False),
+        lambda repo: repo.find_page(None, limit=10, with_items=False).items,
+        lambda repo: repo.find_active_sorted_page(limit=10, with_items=False).items,
+    ],
+)
+def test_item_less_reads_skip_order_items(session, finder):
+    repo = OrderRepository(session)
+    for client in (1, 2):
+        repo.create(_sample_order(client))
+
+    orders, statements = _capture(session, lambda: finder(repo))
+    assert len(statements) == 1 and "order_items" not in statements[0]
+    assert [(o.client_id, o.items) for o in orders] == [(1, []), (2, [])]
+
+
+def test_stream_reads_in_batches_without_identity_map(session):
+    repo = OrderRepository(session)
+    for client in range(5):
+        repo.create(_sample_order(client=client))
+    repo.create(_sample_order(client=9, status=OrderStatus.READY))
+    session.expunge_all()
+
+    streamed, statements = _capture(session, lambda: list(repo.stream(batch_size=2)))
+
+    assert [o.client_id for o in streamed] == [0, 1, 2, 3, 4, 9]
+    assert all(o.items[0].name == "Burger" and o.created_at for o in streamed)
+    # 1 SELECT de pedidos + 1 de itens por lote de 2
+    assert len(statements) == 1 + 3
+    assert len(session.identity_map) == 0
+
+    ready = list(repo.stream(status=OrderStatus.READY))
+    assert [o.client_id for o in ready] == [9]
+    future = streamed[0].created_at.replace(year=streamed[0].created_at.year + 1)
+    assert list(repo.stream(created_from=future)) == []
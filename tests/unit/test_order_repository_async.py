@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.adapters.driven.repositories.order import ItemLoading
+from app.adapters.driven.repositories.order_async import AsyncOrderRepository
+from app.domain.entities.item import OrderItem
+from app.domain.entities.order import Order
+from app.shared.enums.order_status import OrderStatus
+from database import Base
+
+
+def _run(scenario):
+    async def _main():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        try:
+            async with Session() as s:
+                await scenario(AsyncOrderRepository(s))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(_main())
+
+
+def _sample_order(client: int | None = 1, status=OrderStatus.RECEIVED) -> Order:
+    return Order(
+        client_id=client,
+        status=status,
+        amount=10.0,
+        items=[OrderItem(product_id="SKU", name="Burger", quantity=1, price=10.0)],
+    )
+
+
+def test_lazy_loading_is_rejected():
+    with pytest.raises(ValueError):
+        AsyncOrderRepository(None, loading=ItemLoading.LAZY)
+
+
+def test_crud_flow():
+    async def scenario(repo):
+        created = await repo.create(_sample_order())
+        assert created.id is not None and created.items[0].id is not None
+
+        fetched = await repo.find_by_id(created.id)
+        assert fetched.items[0].name == "Burger"
+        header = await repo.find_header(created.id)
+        assert header.items == [] and header.updated_at == fetched.updated_at
+
+        for loading in (ItemLoading.SELECTIN, ItemLoading.JOINED, ItemLoading.BATCH):
+            orders = await repo.find_all(loading=loading)
+            assert [o.items[0].name for o in orders] == ["Burger"]
+        assert await repo.find_all(status=OrderStatus.READY) == []
+        assert len(await repo.find_by_client(1)) == 1
+
+        created.items[0].quantity = 3
+        created.items.append(OrderItem(product_id="COKE", name="Coke", quantity=1, price=5.0))
+        updated = await repo.update(created)
+        assert [(i.product_id, i.quantity) for i in updated.items] == [("SKU", 3), ("COKE", 1)]
+        assert updated.updated_at is not None  # sem lazy load fora do greenlet
+
+        moved = await repo.update_status(created.id, OrderStatus.RECEIVED, OrderStatus.IN_PROGRESS)
+        assert moved.status == OrderStatus.IN_PROGRESS and len(moved.items) == 2
+        assert await repo.update_status(created.id, OrderStatus.RECEIVED, OrderStatus.READY) is None
+
+        await repo.delete(created.id)
+        assert await repo.find_by_id(created.id) is None
+
+    _run(scenario)
+
+
+def test_update_nonexistent():
+    async def scenario(repo):
+        with pytest.raises(ValueError):
+            await repo.update(Order(id=999, items=[]))
+
+    _run(scenario)
+
+
+def test_pages_follow_queue_priority():
+    async def scenario(repo):
+        for st in (OrderStatus.RECEIVED, OrderStatus.READY, OrderStatus.COMPLETED, OrderStatus.IN_PROGRESS):
+            await repo.create(_sample_order(status=st))
+
+        expected = [o.id for o in await repo.find_active_sorted_orders()]
+        seen, after = [], None
+        while True:
+            page = await repo.find_active_sorted_page(1, after)
+            seen.extend(o.id for o in page.items)
+            if not page.next_cursor:
+                break
+            after = page.next_cursor
+        assert seen == expected == [2, 4, 1]
+
+        first = await repo.find_page(None, limit=3)
+        rest = await repo.find_page(None, limit=3, after=first.next_cursor)
+        assert [o.id for o in first.items + rest.items] == [1, 2, 3, 4]
+
+    _run(scenario)
@@ -1,7 +1,11 @@
 import pytest
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
+from app.adapters.driver.controllers.order_render import order_out_qr, orders_json
 from app.adapters.driver.controllers.order_schemas import OrderItemIn, OrderIn, OrderItemOut, OrderOut
+from app.adapters.driver.controllers.order_schemas import OrderOutQrCode
+from app.domain.entities.item import OrderItem
+from app.domain.entities.order import Order
 from app.shared.enums.order_status import OrderStatus
 
 
@@ -62,3 +66,16 @@ def test_order_out_without_client():
     )
     assert order_out.client_id is None
     assert order_out.status == OrderStatus.READY
+
+
+def test_rendered_orders_match_response_models():
+    order = Order(
+        id=3, client_id=None, status=OrderStatus.READY, amount=20,
+        items=[OrderItem(product_id="A", name="Fries", quantity=2, price=10)],
+    )
+    adapter = TypeAdapter(list[OrderOut])
+    expected = adapter.dump_json(adapter.validate_python([order], from_attributes=True))
+    assert orders_json([order]) == expected
+
+    qr = OrderOutQrCode.model_validate(order_out_qr(order, "QR"))
+    assert order_out_qr(order, "QR") == qr.model_dump(mode="json")
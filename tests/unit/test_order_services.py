@@ -1,16 +1,23 @@
+import asyncio
+
 import pytest
 
 from app.domain.entities.order import Order
 from app.domain.entities.item import OrderItem
 from app.shared.enums.order_status import OrderStatus
 
-from app.domain.services.create_order_service import CreateOrderService
+from app.domain.services.create_order_service import AsyncCreateOrderService, CreateOrderService
 from app.domain.services.list_order_service import (
+    AsyncGetOrderByIdService,
+    AsyncListOrdersService,
     ListOrdersService,
     GetOrderByIdService,
     ListOrdersByClientService,
 )
-from app.domain.services.update_order_service import UpdateOrderStatusService
+from app.domain.services.update_order_service import (
+    AsyncUpdateOrderStatusService,
+    UpdateOrderStatusService,
+)
 from app.domain.ports.order_repository_port import OrderRepositoryPort
 from app.domain.ports.payment_status_port import PaymentGatewayPort
 from app.domain.ports.customer_auth_port import CustomerAuthPort
@@ -34,7 +41,7 @@ class DummyRepo(OrderRepositoryPort):
     def find_by_id(self, oid: int):
         return self.store.get(oid)
 
-    def find_all(self, status=None):
+    def find_all(self, status=None, with_items=True):
         self.last_status = status
         return [o for o in self.store.values() if status is None or o.status == status]
 
@@ -50,7 +57,7 @@ class DummyRepo(OrderRepositoryPort):
     def delete(self, oid: int):
         self.store.pop(oid, None)
 
-    def find_active_sorted_orders(self):
+    def find_active_sorted_orders(self, with_items=True):
         return sorted(
             [o for o in self.store.values() if o.status != OrderStatus.COMPLETED],
             key=lambda o: (
@@ -63,18 +70,41 @@ class DummyRepo(OrderRepositoryPort):
 
 
 class DummyCatalog:
-    def __init__(self, stock=10, price=5):
+    def __init__(self, stock=10, price=5, fail_on=None):
         self.stock = stock
         self.price = price
         self.reserved = 0
+        self.released = []
+        self.batches = []
+        self.fail_on = fail_on
 
     def get_product(self, pid):
         return {"id": pid, "name": "Burger", "stock": self.stock, "price": self.price}
 
     def reserve_stock(self, pid, qty):
+        if pid == self.fail_on:
+            raise ValueError(f"Estoque insuficiente para {pid}")
         self.stock -= qty
         self.reserved += qty
 
+    def release_stock(self, pid, qty):
+        self.stock += qty
+        self.reserved -= qty
+        self.released.append(pid)
+
+    # o gateway real soma as linhas e reserva tudo ou nada
+    def reserve_many(self, lines):
+        lines = list(lines)
+        self.batches.append(lines)
+        if any(pid == self.fail_on for pid, _ in lines):
+            raise ValueError(f"Estoque insuficiente para {self.fail_on}")
+        for pid, qty in lines:
+            self.reserve_stock(pid, qty)
+
+    def release_many(self, lines):
+        for pid, qty in lines:
+            self.release_stock(pid, qty)
+
 
 class DummyPayment(PaymentGatewayPort):
     def create_payment(self, order_id: int, amount: float):
@@ -104,6 +134,17 @@ def test_create_order_success():
     assert catalog.reserved == 2
 
 
+def test_create_order_recover_answers_from_the_stored_order():
+    repo = DummyRepo()
+    service = CreateOrderService(repo, DummyCatalog(), DummyPayment(), DummyAuth())
+    created, _ = service.execute(_lines("A"), token=None)
+
+    # sem reservar estoque nem cobrar de novo; o QR fica para GET /orders/{id}/payment
+    assert service.recover(created.id) == [created, None]
+    with pytest.raises(ValueError, match="não encontrado"):
+        service.recover(999)
+
+
 def test_create_order_insufficient_stock():
     repo = DummyRepo()
     catalog = DummyCatalog(stock=1, price=3)
@@ -113,6 +154,48 @@ def test_create_order_insufficient_stock():
         service.execute(Order(items=[OrderItem(product_id="SKU", quantity=5)]), token=None)
 
 
+def _lines(*pids):
+    return Order(items=[OrderItem(product_id=pid, quantity=1) for pid in pids])
+
+
+def test_create_order_fans_out_on_executor():
+    from concurrent.futures import ThreadPoolExecutor
+
+    repo, catalog = DummyRepo(), DummyCatalog(price=2)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        service = CreateOrderService(repo, catalog, DummyPayment(), DummyAuth(), executor=pool)
+        created, _ = service.execute(_lines("A", "B", "C", "A"), token="tok")
+
+    assert created.client_id == 99 and created.amount == 8.0
+    assert catalog.reserved == 4 and catalog.released == []
+    assert catalog.batches == [[("A", 1), ("B", 1), ("C", 1), ("A", 1)]]
+
+
+def test_create_order_reserves_all_lines_in_one_batch():
+    repo, catalog = DummyRepo(), DummyCatalog(stock=3, fail_on="C")
+    service = CreateOrderService(repo, catalog, DummyPayment(), DummyAuth())
+
+    with pytest.raises(ValueError, match="Estoque insuficiente para C"):
+        service.execute(_lines("A", "B", "C"), token=None)
+    assert len(catalog.batches) == 1 and catalog.reserved == 0 and repo.store == {}
+
+    # linhas repetidas somam antes da checagem de estoque
+    with pytest.raises(ValueError, match="disponível 3"):
+        service.execute(Order(items=[OrderItem(product_id="A", quantity=2)] * 2), token=None)
+
+
+def test_create_order_releases_reservations_when_persisting_fails():
+    class _BrokenRepo(DummyRepo):
+        def create(self, order):
+            raise RuntimeError("db down")
+
+    catalog = DummyCatalog()
+    service = CreateOrderService(_BrokenRepo(), catalog, DummyPayment(), DummyAuth())
+    with pytest.raises(RuntimeError):
+        service.execute(_lines("A", "B"), token=None)
+    assert catalog.reserved == 0 and catalog.released == ["A", "B"]
+
+
 def test_list_services():
     repo = DummyRepo()
     repo.create(Order(client_id=1, status=OrderStatus.RECEIVED))
@@ -154,3 +237,95 @@ def test_update_status_not_found():
     repo = DummyRepo()
     with pytest.raises(ValueError, match="Pedido não encontrado"):
         UpdateOrderStatusService(repo, DummyPayment()).execute(999, OrderStatus.READY)
+
+
+def test_paginate_falls_back_to_in_memory_keyset():
+    repo = DummyRepo()
+    for st in (OrderStatus.RECEIVED, OrderStatus.READY, OrderStatus.IN_PROGRESS):
+        repo.create(Order(status=st))
+    service = ListOrdersService(repo)
+
+    first = service.paginate(limit=2)
+    assert [o.id for o in first.items] == [1, 2]
+    rest = service.paginate(limit=2, after=first.next_cursor)
+    assert [o.id for o in rest.items] == [3] and rest.next_cursor is None
+
+    queue = service.paginate(limit=2, prioritized=True)
+    assert [o.status for o in queue.items] == [OrderStatus.READY, OrderStatus.IN_PROGRESS]
+    tail = service.paginate(limit=2, after=queue.next_cursor, prioritized=True)
+    assert [o.status for o in tail.items] == [OrderStatus.RECEIVED]
+
+
+def test_update_status_lost_race():
+    class _RacingRepo(DummyRepo):
+        def update_status(self, order_id, expected_status, new_status):
+            return None  # outra requisição trocou o status entre a leitura e o UPDATE
+
+    repo = _RacingRepo()
+    order = repo.create(Order(status=OrderStatus.IN_PROGRESS))
+    with pytest.raises(ValueError, match="alterado por outra requisição"):
+        UpdateOrderStatusService(repo, DummyPayment()).execute(order.id, OrderStatus.READY)
+
+
+# --------------------------------------------------------------------- async
+class _Awaitable:
+    """Expõe os métodos de um dummy síncrono como corrotinas."""
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+
+        async def _call(*args, **kwargs):
+            return attr(*args, **kwargs)
+
+        return _call
+
+
+def test_async_create_order_success():
+    repo, catalog = DummyRepo(), DummyCatalog(stock=5, price=4)
+    service = AsyncCreateOrderService(
+        _Awaitable(repo), _Awaitable(catalog), _Awaitable(DummyPayment()), _Awaitable(DummyAuth())
+    )
+
+    order = Order(items=[OrderItem(product_id="SKU", quantity=2)])
+    created, qr = asyncio.run(service.execute(order, token="tok"))
+
+    assert created.amount == 8.0 and created.client_id == 99
+    assert qr == "QR" and catalog.reserved == 2
+
+
+def test_async_create_releases_reservations_when_persisting_fails():
+    class _BrokenRepo(DummyRepo):
+        def create(self, order):
+            raise RuntimeError("db down")
+
+    catalog = DummyCatalog()
+    service = AsyncCreateOrderService(
+        _Awaitable(_BrokenRepo()), _Awaitable(catalog), _Awaitable(DummyPayment()), _Awaitable(DummyAuth())
+    )
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.execute(_lines("A", "B"), token="tok"))
+    assert catalog.reserved == 0 and catalog.released == ["A", "B"]
+
+
+def test_async_list_and_update_services():
+    repo = DummyRepo()
+    repo.create(Order(client_id=1, status=OrderStatus.RECEIVED))
+    repo.create(Order(client_id=2, status=OrderStatus.READY))
+    async_repo = _Awaitable(repo)
+
+    async def scenario():
+        assert len(await AsyncListOrdersService(async_repo).execute()) == 2
+        queue = await AsyncListOrdersService(async_repo).execute(prioritized=True)
+        assert queue[0].status == OrderStatus.READY
+        assert (await AsyncGetOrderByIdService(async_repo).execute(1)).id == 1
+
+        service = AsyncUpdateOrderStatusService(async_repo, _Awaitable(DummyPayment()))
+        updated = await service.execute(1, OrderStatus.IN_PROGRESS)
+        assert updated.status == OrderStatus.IN_PROGRESS
+        with pytest.raises(ValueError, match="inválida"):
+            await service.execute(2, OrderStatus.RECEIVED)
+
+    asyncio.run(scenario())
@@ -0,0 +1,197 @@
+import asyncio
+from datetime import timedelta
+
+import anyio.to_thread
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import database
+from app.adapters.driven.repositories.order import OrderRepository
+from app.adapters.driven.repositories.order_async import AsyncOrderRepository
+from app.adapters.driven.repositories.payment_outbox import PaymentOutboxRepository
+from app.adapters.driven.repositories.payment_outbox_async import AsyncPaymentOutboxRepository
+from app.adapters.driver.workers.payment_outbox import (
+    PaymentOutboxDispatcher,
+    dispatch_due_payments,
+)
+from app.domain.entities.item import OrderItem
+from app.domain.entities.order import Order
+from app.domain.services.create_order_service import CreateOrderService
+from app.domain.services.payment_status_service import now_utc
+from app.shared.enums.outbox_status import OutboxStatus
+from app.shared.resilience import RetryPolicy
+from database import Base
+
+from tests.unit.test_order_services import DummyAuth, DummyCatalog, DummyRepo
+
+NO_BACKOFF = RetryPolicy(attempts=2, base_delay=0, max_delay=0)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False, future=True)
+    with Session() as s:
+        yield s
+
+
+def _order(session, with_payment=True) -> int:
+    order = Order(client_id=1, amount=10.0, items=[OrderItem(product_id="SKU", name="Burger", quantity=1, price=10.0)])
+    return OrderRepository(session).create(order, with_payment=with_payment).id
+
+
+class _Gateway:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    def create_payment(self, order_id, amount):
+        self.calls.append(order_id)
+        if order_id in self.fail:
+            raise RuntimeError("pagamento fora")
+        return f"QR-{order_id}", None
+
+
+# ------------------------------------------------------------------ repositório
+def test_order_and_outbox_entry_share_the_commit(session):
+    with_payment, without = _order(session), _order(session, with_payment=False)
+    repo = PaymentOutboxRepository(session)
+
+    entry = repo.find(with_payment)
+    assert (entry.status, entry.amount, entry.attempts) == (OutboxStatus.PENDING, 10.0, 0)
+    assert repo.find(without) is None
+
+
+def test_claim_leases_entries_until_they_are_settled(session):
+    first, second = _order(session), _order(session)
+    repo = PaymentOutboxRepository(session)
+    now = now_utc()
+
+    claimed = repo.claim_due(now, 10, now + timedelta(seconds=30))
+    assert [(e.order_id, e.attempts) for e in claimed] == [(first, 1), (second, 1)]
+    # em curso: outra rodada (ou instância) não pega de novo antes do lease
+    assert repo.claim_due(now, 10, now + timedelta(seconds=30)) == []
+
+    repo.mark_sent(first, "QR")
+    repo.mark_failed(second, "timeout", retry_at=now)
+    assert [e.order_id for e in repo.claim_due(now, 10, now)] == [second]
+    repo.mark_failed(second, "x" * 300, retry_at=None)
+
+    assert repo.find(first).qr_code == "QR"
+    gave_up = repo.find(second)
+    assert gave_up.status is OutboxStatus.FAILED and len(gave_up.last_error) == 255
+    assert repo.claim_due(now + timedelta(hours=1), 10, now) == []
+
+
+def test_dispatch_sends_and_retries_until_attempts_run_out(monkeypatch, session):
+    monkeypatch.setattr(database, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    ok, broken = _order(session), _order(session)
+    gateway = _Gateway(fail={broken})
+
+    assert dispatch_due_payments(gateway, 10, 30, NO_BACKOFF) == [(ok, f"QR-{ok}"), (broken, None)]
+    assert dispatch_due_payments(gateway, 10, 30, NO_BACKOFF) == [(broken, None)]
+    assert dispatch_due_payments(gateway, 10, 30, NO_BACKOFF) == []
+
+    repo = PaymentOutboxRepository(session)
+    assert repo.find(ok).status is OutboxStatus.SENT
+    assert repo.find(broken).status is OutboxStatus.FAILED
+    assert "pagamento fora" in repo.find(broken).last_error
+    assert gateway.calls == [ok, broken, broken]
+
+
+def test_async_repositories_write_and_claim_the_outbox():
+    async def scenario():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        try:
+            async with Session() as s:
+                order = Order(client_id=1, amount=5.0)
+                order_id = (await AsyncOrderRepository(s).create(order, with_payment=True)).id
+                repo = AsyncPaymentOutboxRepository(s)
+                now = now_utc()
+                assert [e.order_id for e in await repo.claim_due(now, 10, now)] == [order_id]
+                await repo.mark_sent(order_id, "QR")
+                assert (await repo.find(order_id)).status is OutboxStatus.SENT
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+# ------------------------------------------------------------------ dispatcher
+def test_waiter_gets_the_qr_code_as_soon_as_the_dispatcher_runs():
+    batches = []
+
+    async def dispatch_batch():
+        batches.append(1)
+        return [(7, "QR-7")] if len(batches) == 2 else []
+
+    async def scenario():
+        dispatcher = PaymentOutboxDispatcher(3600, 10, dispatch_batch)
+        assert await dispatcher.wait_for_async(7, 1) is None  # parado: não espera
+        await dispatcher.start()
+        try:
+            await asyncio.sleep(0)  # primeira rodada, vazia
+            # o aviso acorda o dispatcher sem esperar o intervalo
+            assert await dispatcher.wait_for_async(7, 1) == "QR-7"
+            # já enviado: quem chega depois recebe o QR guardado
+            assert await asyncio.to_thread(dispatcher.wait_for, 7, 0) == "QR-7"
+            assert await dispatcher.wait_for_async(8, 0.01) is None
+        finally:
+            await dispatcher.stop()
+        assert dispatcher.stats()["sent"] == 1 and dispatcher.stats()["wait_timeouts"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_sync_waiter_gets_its_qr_code_with_the_request_pool_full(monkeypatch):
+    engine = create_engine(
+        "sqlite://", future=True, connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False, future=True)
+    monkeypatch.setattr(database, "SessionLocal", Session)
+    with Session() as s:
+        order_id = _order(s)
+
+    async def scenario():
+        # pool das requisições com uma vaga, ocupada pelo POST /orders que espera o QR
+        anyio.to_thread.current_default_thread_limiter().total_tokens = 1
+        dispatcher = PaymentOutboxDispatcher.for_mode(_Gateway(), 3600, 10, 30, NO_BACKOFF, False)
+        await dispatcher.start()
+        try:
+            qr_code = await anyio.to_thread.run_sync(dispatcher.wait_for, order_id, 2)
+        finally:
+            await dispatcher.stop()
+        assert qr_code == f"QR-{order_id}" and dispatcher.stats()["wait_timeouts"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_create_order_does_not_call_the_gateway_with_outbox():
+    class _Repo(DummyRepo):
+        def create(self, order, with_payment=False):
+            self.with_payment = with_payment
+            return super().create(order)
+
+    class _Outbox:
+        def wait_for(self, order_id, timeout):
+            return None  # a cobrança ainda não saiu
+
+    class _NoGateway:
+        def create_payment(self, *_):
+            pytest.fail("a cobrança deveria sair pelo outbox")
+
+    repo = _Repo()
+    service = CreateOrderService(
+        repo, DummyCatalog(), _NoGateway(), DummyAuth(), payment_outbox=_Outbox(), payment_wait=1
+    )
+    order, qr_code = service.execute(Order(items=[OrderItem(product_id="A", quantity=1)]), token=None)
+    assert order.id == 1 and qr_code is None and repo.with_payment
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import hmac
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.adapters.driver.controllers.payment_webhook_controller as wc
+import database
+from app.adapters.driven.repositories.order import OrderRepository
+from app.adapters.driven.repositories.order_payment import OrderPaymentRepository
+from app.adapters.driver.workers.payment_projection import (
+    PaymentProjectionReconciler,
+    sync_pending_payments,
+)
+from app.domain.entities.order import Order
+from app.domain.services.payment_status_service import PaymentStatusReader
+from app.shared.enums.payment_source import PaymentSource
+from app.shared.enums.payment_status import PaymentStatus
+from database import Base
+
+T0 = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False, future=True)
+    with Session() as s:
+        yield s
+
+
+def _order_id(session) -> int:
+    return OrderRepository(session).create(Order(client_id=1, amount=10.0)).id
+
+
+class _Gateway:
+    def __init__(self, status=PaymentStatus.PAID):
+        self.status = status
+        self.calls = []
+
+    def get_status(self, order_id):
+        self.calls.append(order_id)
+        return self.status
+
+
+def test_record_ignores_out_of_order_events(session):
+    repo = OrderPaymentRepository(session)
+    order_id = _order_id(session)
+
+    assert repo.record(order_id, PaymentStatus.PENDING, T0)
+    assert repo.record(order_id, PaymentStatus.PAID, T0 + timedelta(seconds=5))
+    # webhook atrasado com o PENDING antigo
+    assert not repo.record(order_id, PaymentStatus.PENDING, T0 + timedelta(seconds=1))
+    assert repo.find(order_id).status is PaymentStatus.PAID
+
+    with pytest.raises(ValueError):
+        repo.record(999, PaymentStatus.PAID, T0)
+
+
+def test_webhook_wins_over_polled_status(session):
+    repo = OrderPaymentRepository(session)
+    order_id = _order_id(session)
+    polled_at = T0 + timedelta(seconds=5)
+
+    # a consulta foi carimbada pelo nosso relógio, depois do occurred_at do webhook
+    assert repo.record(order_id, PaymentStatus.PENDING, polled_at, PaymentSource.POLL)
+    assert repo.record(order_id, PaymentStatus.PAID, T0)
+    assert repo.find(order_id).status is PaymentStatus.PAID
+
+    # consulta não desfaz um webhook conclusivo...
+    assert not repo.record(order_id, PaymentStatus.PENDING, polled_at, PaymentSource.POLL)
+    assert repo.find(order_id).status is PaymentStatus.PAID
+
+    # ...mas atualiza um webhook que ainda dizia PENDING
+    other = _order_id(session)
+    assert repo.record(other, PaymentStatus.PENDING, polled_at)
+    assert repo.record(other, PaymentStatus.PAID, T0, PaymentSource.POLL)
+    assert repo.find(other).status is PaymentStatus.PAID
+
+
+def test_reader_prefers_projection_and_refreshes_stale_pending(session):
+    repo = OrderPaymentRepository(session)
+    paid, pending, missing = (_order_id(session) for _ in range(3))
+    repo.record(paid, PaymentStatus.PAID, T0)
+    repo.record(pending, PaymentStatus.PENDING, T0)
+
+    gateway = _Gateway()
+    reader = PaymentStatusReader(gateway, repo, max_age=0)
+    assert reader.get_status(paid) is PaymentStatus.PAID
+    assert reader.get_status(pending) is PaymentStatus.PAID
+    assert reader.get_status(missing) is PaymentStatus.PAID
+    assert gateway.calls == [pending, missing]
+    assert repo.find(missing).status is PaymentStatus.PAID
+
+
+def test_reconciler_fills_missing_projections(monkeypatch, session):
+    monkeypatch.setattr(database, "SessionLocal", lambda: session)
+    monkeypatch.setattr(session, "close", lambda: None)
+    first, second = _order_id(session), _order_id(session)
+    OrderPaymentRepository(session).record(first, PaymentStatus.PAID, T0)
+
+    gateway = _Gateway(PaymentStatus.CANCELED)
+    assert sync_pending_payments(gateway, batch_size=10, max_age=0) == (1, 0)
+    assert gateway.calls == [second]
+    assert sync_pending_payments(gateway, batch_size=10, max_age=0) == (0, 0)
+
+
+def test_reconciler_counts_runs_and_survives_errors():
+    results = iter([(2, 1), RuntimeError("banco fora")])
+
+    async def sync_batch():
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    reconciler = PaymentProjectionReconciler(60, sync_batch)
+    assert asyncio.run(reconciler.reconcile())
+    assert not asyncio.run(reconciler.reconcile())
+    assert reconciler.stats() == {"runs": 1, "synced": 2, "failed": 1}
+
+
+class _Recorder:
+    def __init__(self):
+        self.events = []
+
+    def execute(self, order_id, status, occurred_at=None):
+        if order_id == 404:
+            raise ValueError("Pedido não encontrado")
+        self.events.append((order_id, status))
+        return True
+
+
+def test_webhook_checks_signature(monkeypatch):
+    app = FastAPI()
+    app.include_router(wc.router)
+    recorder = _Recorder()
+    app.dependency_overrides[wc.get_record_payment_status_service] = lambda: recorder
+    client = TestClient(app)
+    monkeypatch.setattr(wc, "PAYMENT_WEBHOOK_SECRET", "s3cr3t")
+
+    body = b'{"order_id": 7, "status": "PAID"}'
+    signature = hmac.new(b"s3cr3t", body, hashlib.sha256).hexdigest()
+    headers = {"Content-Type": "application/json"}
+
+    resp = client.post("/payments/webhook", content=body, headers=headers)
+    assert resp.status_code == 401
+    resp = client.post(
+        "/payments/webhook", content=body, headers={**headers, wc.SIGNATURE_HEADER: signature}
+    )
+    assert resp.status_code == 204
+    assert recorder.events == [(7, PaymentStatus.PAID)]
+
+    # sem segredo o webhook fica fechado, salvo o opt-out explícito (local)
+    monkeypatch.setattr(wc, "PAYMENT_WEBHOOK_SECRET", None)
+    resp = client.post("/payments/webhook", json={"order_id": 7, "status": "PAID"})
+    assert resp.status_code == 503
+    monkeypatch.setattr(wc, "PAYMENT_WEBHOOK_ALLOW_UNSIGNED", True)
+    resp = client.post("/payments/webhook", json={"order_id": 404, "status": "PAID"})
+    assert resp.status_code == 404
+    assert recorder.events == [(7, PaymentStatus.PAID)]
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from app.adapters.driven.gateways.payment_status_http import (
+    AsyncPaymentGatewayHttp,
+    PaymentGatewayHttp,
+)
+from app.shared.enums.payment_status import PaymentStatus
+from app.shared.exceptions.resilience import (
+    BulkheadFullError,
+    CircuitOpenError,
+    DeadlineExceededError,
+)
+from app.shared.resilience import (
+    BreakerState,
+    Bulkhead,
+    CircuitBreaker,
+    Resilience,
+    RetryPolicy,
+    deadline,
+)
+
+FAST_RETRY = RetryPolicy(attempts=3, base_delay=0.001, max_delay=0.001)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _responses(*statuses):
+    """Transport que devolve os status em sequência e conta as chamadas."""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        return httpx.Response(status, json={"status": "PAID", "qr_data": "QR"})
+
+    return httpx.MockTransport(handler), calls
+
+
+def test_idempotent_calls_are_retried_and_posts_are_not():
+    transport, calls = _responses(503, 503, 200, 503)
+    policy = Resilience("payment", retry=FAST_RETRY)
+    gateway = PaymentGatewayHttp("http://pay", httpx.Client(transport=transport), policy)
+
+    assert gateway.get_status(1) is PaymentStatus.PAID
+    assert calls == ["GET"] * 3
+    with pytest.raises(httpx.HTTPStatusError):
+        gateway.create_payment(1, 10.0)
+    assert calls[3:] == ["POST"]
+    assert gateway.policy.stats()["retries"] == 2
+
+
+def test_breaker_opens_then_half_opens():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    policy = Resilience("payment", breaker=breaker)
+    transport, calls = _responses(500, 500, 200)
+    client = httpx.Client(transport=transport)
+    send = lambda t: client.get("http://pay/x", timeout=t)
+
+    policy.call(send)
+    policy.call(send)
+    assert breaker.state is BreakerState.OPEN
+    with pytest.raises(CircuitOpenError):
+        policy.call(send)
+    assert len(calls) == 2                     # recusada sem sair
+
+    clock.now = 10
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert policy.call(send).status_code == 200
+    assert breaker.state is BreakerState.CLOSED
+    assert policy.stats()["breaker"]["opened"] == 1
+
+
+def test_deadline_caps_timeout_and_blocks_late_calls():
+    seen = []
+    policy = Resilience("catalog", timeout=5)
+    with deadline(0.5):
+        policy.call(lambda t: seen.append(t) or httpx.Response(200))
+        with deadline(10):                      # aninhado não amplia o orçamento
+            policy.call(lambda t: seen.append(t) or httpx.Response(200))
+    assert all(t <= 0.5 for t in seen)
+
+    with deadline(0):
+        with pytest.raises(DeadlineExceededError):
+            policy.call(lambda t: httpx.Response(200))
+
+
+def test_bulkhead_rejects_when_full():
+    bulkhead = Bulkhead(1, max_wait=0.01)
+    policy = Resilience("payment", bulkhead=bulkhead)
+    entered, leave = threading.Event(), threading.Event()
+
+    def slow(t):
+        entered.set()
+        leave.wait(1)
+        return httpx.Response(200)
+
+    worker = threading.Thread(target=policy.call, args=(slow,))
+    worker.start()
+    entered.wait(1)
+    with pytest.raises(BulkheadFullError):
+        policy.call(lambda t: httpx.Response(200))
+    leave.set()
+    worker.join()
+    assert bulkhead.stats() == {"in_flight": 0, "max_concurrent": 1, "rejected": 1}
+
+
+def _half_open(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.state is BreakerState.HALF_OPEN
+    return breaker
+
+
+def test_half_open_trial_returns_when_bulkhead_is_full():
+    breaker, bulkhead = _half_open(_Clock()), Bulkhead(1, max_wait=0.01)
+    policy = Resilience("payment", breaker=breaker, bulkhead=bulkhead)
+
+    assert bulkhead.acquire(0)
+    with pytest.raises(BulkheadFullError):
+        policy.call(lambda t: httpx.Response(200))
+    bulkhead.release()
+
+    # a vaga de teste voltou: a próxima chamada sai e fecha o circuito
+    assert policy.call(lambda t: httpx.Response(200)).status_code == 200
+    assert breaker.state is BreakerState.CLOSED
+
+
+def test_half_open_trial_returns_when_async_call_is_cancelled():
+    breaker = _half_open(_Clock())
+    policy = Resilience("payment", breaker=breaker, bulkhead=Bulkhead(2, max_wait=0.01))
+
+    async def ok(t):
+        return httpx.Response(200)
+
+    async def scenario():
+        entered = asyncio.Event()
+
+        async def hang(t):
+            entered.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(policy.acall(hang))
+        await entered.wait()
+        task.cancel()                           # ex.: cópia perdedora do hedge
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert (await policy.acall(ok)).status_code == 200
+
+    asyncio.run(scenario())
+    assert breaker.state is BreakerState.CLOSED and policy.stats()["failures"] == 0
+
+
+def test_hedge_returns_the_faster_copy():
+    attempts = []
+
+    def send(t):
+        attempts.append(t)
+        if len(attempts) == 1:
+            time.sleep(0.3)                     # primeira cópia travada
+        return httpx.Response(200, json={"copy": len(attempts)})
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        policy = Resilience("catalog", hedge_after=0.02, executor=executor)
+        assert policy.call(send, idempotent=True, hedge=True).json() == {"copy": 2}
+    assert policy.stats()["hedges"] == 1
+
+
+def test_async_get_is_hedged():
+    state = {"calls": 0}
+
+    async def handler(request):
+        state["calls"] += 1
+        if state["calls"] == 1:
+            await asyncio.sleep(0.3)
+        return httpx.Response(200, json={"status": "PAID"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    gateway = AsyncPaymentGatewayHttp("http://pay", client, Resilience("payment", hedge_after=0.02))
+
+    started = time.monotonic()
+    assert asyncio.run(gateway.get_status(1)) is PaymentStatus.PAID
+    assert time.monotonic() - started < 0.25
+    assert gateway.policy.hedges == 1
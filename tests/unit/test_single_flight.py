@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from app.adapters.driven.gateways.product_catalog_gateway import (
+    CATALOG_BASE_URL,
+    AsyncProductCatalogGateway,
+)
+from app.shared.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_threads_share_one_call_and_its_error():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(1)
+        return {"id": "A"}
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        futures = [executor.submit(flights.do, "A", fetch) for _ in range(5)]
+        deadline = time.monotonic() + 1
+        while flights.stats()["coalesced"] < 4 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        release.set()
+        results = [f.result() for f in futures]
+
+    assert calls == [1] and all(r == {"id": "A"} for r in results)
+    assert flights.stats() == {"calls": 5, "coalesced": 4, "in_flight": 0}
+
+    def boom():
+        raise ValueError("catálogo fora")
+
+    with pytest.raises(ValueError):
+        flights.do("A", boom)
+    assert flights.do("A", lambda: "de novo") == "de novo"   # nada fica guardado
+
+
+def test_async_gateway_coalesces_identical_lookups():
+    hits = []
+
+    async def handler(request):
+        hits.append(str(request.url))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"id": request.url.path.rsplit("/", 1)[-1]})
+
+    gateway = AsyncProductCatalogGateway(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    async def scenario():
+        return await asyncio.gather(*[gateway.get_product(pid) for pid in "AAAB"])
+
+    products = asyncio.run(scenario())
+    assert [p["id"] for p in products] == ["A", "A", "A", "B"]
+    assert sorted(hits) == [f"{CATALOG_BASE_URL}/products/A", f"{CATALOG_BASE_URL}/products/B"]
+    assert gateway.flights.stats()["coalesced"] == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    flights = AsyncSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def scenario():
+        first = asyncio.ensure_future(flights.do("k", slow))
+        second = asyncio.ensure_future(flights.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == 42